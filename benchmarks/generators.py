@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Synthetic fishing diaries and sampleData.ts files for benchmarking the data tooling.
+
+Diaries are "date – anglers – stream, notes" lines in every date format
+parse_diary.py accepts (plus a share of malformed dates), with notes that
+name species, counts, lures and weather the way the real diary does; about
+one line in twenty carries a multi-kilobyte note. sampleData.ts files hold
+FormData entries shaped like src/data/sampleData.ts, voiced notes included.
+Output is deterministic for a given seed.
+
+Usage:
+    python benchmarks/generators.py diary --entries 100000 -o /tmp/diary.md
+    python benchmarks/generators.py sample-data --entries 1000000 -o /tmp/sampleData.ts
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from term_matcher import LURES, SPECIES_ALIASES, WEATHER  # noqa: E402
+from ts_literal import encode  # noqa: E402
+
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June', 'July',
+    'August', 'September', 'October', 'November', 'December',
+]
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun', 'Saturday']
+
+ANGLERS = ['Westfall', 'Scott', 'Mr. Scott', 'Boodrow', 'Teal', 'Sigman', 'WC', 'Clint Westfall', 'Shelby Rowland']
+STREAMS = {
+    'Spring River': ['Many Islands to SRV', 'Ravenden to Imboden', 'Hardy Beach to Ravenden', 'SRV upriver to the Trophy Hole'],
+    'Eleven Point River': ['Greer Crossing to Riverton', 'Ravenden Springs'],
+    'Strawberry River': ['Poughkeepsie to Evening Shade'],
+}
+SPECIES = sorted(set(SPECIES_ALIASES.values()))
+SPECIES_WORDS = list(SPECIES_ALIASES) + SPECIES
+ADJECTIVES = ['', '', 'good ', 'nice ', 'big ', 'small ']
+WIND_DIRECTIONS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+CLARITY = ['', '', 'Clear', 'Stained', 'Muddy']
+MOON_PHASES = ['New Moon', 'Waxing Crescent', 'First Quarter', 'Full Moon', 'Waning Gibbous', 'Waning Crescent']
+FILLER = [
+    "The river was {weather} and the current was steady below the shoals.",
+    "We floated down to the camp hole and fished the eddies until dark.",
+    "Saw Bald Eagles, King Fishers and a Great Blue Heron rookery.",
+    "The bite was slow in the morning but picked up after the {weather} front moved through.",
+    "Most fish were caught tight to cover on the {lure}.",
+    "Water levels were on the low side and the stretch below the bridge held fish.",
+]
+
+LONG_NOTE_SHARE = 0.05
+LONG_NOTE_SENTENCES = (30, 60)
+
+
+def synthetic_date(rng: random.Random) -> str:
+    """One diary-style date string; about 5% are malformed or impossible."""
+    year = rng.randint(1990, 2030)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    kind = rng.random()
+    if kind < 0.55:
+        return f"{month}/{day}/{year}"
+    if kind < 0.70:
+        return f"{month}/{day:02d}/{year}, {rng.choice(DAY_NAMES)}"
+    if kind < 0.80:
+        return f"{month:02d}-{day:02d}-{year}"
+    if kind < 0.88:
+        return f"{day:02d}-{day + 2:02d} {rng.choice(MONTH_NAMES)} {year}"
+    if kind < 0.95:
+        return f"{month}/{day}-{day + 3}/{year}"
+    return rng.choice([
+        f"{month}/31/{year}",
+        f"2/29/{year}",
+        f"13/{day}/{year}",
+        f"{day}-{day + 1} Smarch {year}",
+        f"Summer {year}",
+        f"{month}/{day}/{year % 100}",
+    ])
+
+
+def catch_sentence(rng: random.Random) -> str:
+    catches = [
+        f"{rng.randint(1, 45)} {rng.choice(ADJECTIVES)}{rng.choice(SPECIES_WORDS).lower()}"
+        for _ in range(rng.randint(1, 4))
+    ]
+    return f"We caught {', '.join(catches)} on the {rng.choice(list(LURES))}."
+
+
+def synthetic_notes(rng: random.Random) -> str:
+    """Notes of a few sentences, or a long voiced-style narrative for a share of entries."""
+    if rng.random() < LONG_NOTE_SHARE:
+        count = rng.randint(*LONG_NOTE_SENTENCES)
+    else:
+        count = rng.randint(2, 6)
+    sentences = [catch_sentence(rng)]
+    for _ in range(count - 1):
+        if rng.random() < 0.3:
+            sentences.append(catch_sentence(rng))
+        else:
+            sentences.append(rng.choice(FILLER).format(weather=rng.choice(list(WEATHER)), lure=rng.choice(list(LURES))))
+    return ' '.join(sentences)
+
+
+def diary_line(rng: random.Random) -> str:
+    stream = rng.choice(list(STREAMS))
+    anglers = '/'.join(rng.sample(ANGLERS, rng.randint(1, 3)))
+    return f"{synthetic_date(rng)} – {anglers} – {stream}, {rng.choice(STREAMS[stream])}. {synthetic_notes(rng)}"
+
+
+def write_diary(path: Path, entries: int, seed: int = 0):
+    """A markdown diary of `entries` dated lines, with headings and blank lines between."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write("# Synthetic River Fishing Diary\n\n")
+        for i in range(entries):
+            if i % 50 == 0:
+                f.write(f"## Page {i // 50 + 1}\n\n")
+            f.write(diary_line(rng))
+            f.write("\n\n")
+
+
+def sample_entry(rng: random.Random) -> dict:
+    stream = rng.choice(list(STREAMS))
+    year = rng.randint(1994, 2025)
+    species = rng.sample(SPECIES, rng.randint(1, 4))
+    return {
+        'date': f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        'streamName': stream,
+        'riverStretch': rng.choice(STREAMS[stream]),
+        'tripMembers': ', '.join(rng.sample(ANGLERS, rng.randint(1, 3))),
+        'windVelocity': str(rng.randint(0, 25)),
+        'windDirection': rng.choice(WIND_DIRECTIONS),
+        'weatherConditions': rng.choice(['', 'Sunny', 'Cloudy', 'Rain', 'Windy']),
+        'waterClarity': rng.choice(CLARITY),
+        'usgsGauge': '',
+        'flowRate': rng.choice(['', str(rng.randint(150, 3000))]),
+        'riverDepth': rng.choice(['', f"{rng.uniform(1.5, 9):.2f}"]),
+        'waterTemperature': '',
+        'fishSpecies': ', '.join(species),
+        'numberCaught': str(rng.randint(0, 90)),
+        'baitUsed': ', '.join(rng.sample(sorted(set(LURES.values())), rng.randint(1, 3))),
+        'wifesMood': '',
+        'notes': synthetic_notes(rng).replace('. ', '.\n\n', rng.randint(0, 3)) + " Found one that day in '94.",
+        'pictures': [],
+        'airTempHigh': str(rng.randint(40, 95)),
+        'airTempLow': str(rng.randint(20, 70)),
+        'barometricPressure': f"{rng.uniform(29.5, 30.5):.2f}",
+        'moonPhase': rng.choice(MOON_PHASES),
+        'precipitation': f"{rng.choice([0, 0, 0, rng.uniform(0, 2)]):.2f}",
+    }
+
+
+def format_entry(entry: dict) -> str:
+    """One entry in sampleData.ts layout (double quotes where the value holds an apostrophe)."""
+    lines = ['{']
+    for field, value in entry.items():
+        if isinstance(value, list):
+            lines.append(f"    {field}: [],")
+        else:
+            quote = '"' if "'" in value else "'"
+            lines.append(f"    {field}: {encode(value, quote)},")
+    lines.append('  },')
+    return '\n'.join(lines)
+
+
+def write_sample_data(path: Path, entries: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write("import { FormData } from '../types';\n\n")
+        f.write("// Synthetic entries generated by benchmarks/generators.py\n")
+        f.write("export const sampleEntries: FormData[] = [\n")
+        for _ in range(entries):
+            f.write(format_entry(sample_entry(rng)))
+            f.write('\n')
+        f.write("];\n")
+
+
+GENERATORS = {
+    'diary': write_diary,
+    'sample-data': write_sample_data,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic diaries and sampleData.ts files')
+    parser.add_argument('kind', choices=list(GENERATORS))
+    parser.add_argument('--entries', type=int, default=1000, help='Entries to generate (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', type=Path, required=True)
+    args = parser.parse_args()
+
+    GENERATORS[args.kind](args.output, args.entries, args.seed)
+    print(f"✨ Wrote {args.entries:,} {args.kind} entries to {args.output} "
+          f"({args.output.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: parse_diary.parse_date against the strptime-based version it replaced.
+
+Generates synthetic diary date strings in every accepted format (plus a
+share of malformed ones), checks that both implementations agree on all of
+them, then times per-call cost for the old function, the new one with its
+LRU memo bypassed, and the new one memoized.
+
+Usage:
+    python benchmarks/parse_date_bench.py
+    python benchmarks/parse_date_bench.py --count 200000 --distinct 5000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import synthetic_date  # noqa: E402
+from parse_diary import parse_date  # noqa: E402
+
+def parse_date_strptime(date_str):
+    """parse_date as it was before the compiled dispatch (the baseline)."""
+    date_str = date_str.strip()
+
+    match_full_text = re.match(r'(\d+)-(\d+)\s+([A-Za-z]+)\s+(\d{4})', date_str)
+    if match_full_text:
+        d1, d2, month, year = match_full_text.groups()
+        try:
+            dt1 = datetime.strptime(f"{d1} {month} {year}", "%d %B %Y")
+            dt2 = datetime.strptime(f"{d2} {month} {year}", "%d %B %Y")
+            return dt1.strftime("%Y-%m-%d"), dt2.strftime("%Y-%m-%d")
+        except:
+            pass
+
+    match_range_slashes = re.match(r'(\d+)/(\d+)-(\d+)/(\d{4})', date_str)
+    if match_range_slashes:
+        m, d1, d2, y = match_range_slashes.groups()
+        return f"{y}-{m.zfill(2)}-{d1.zfill(2)}", f"{y}-{m.zfill(2)}-{d2.zfill(2)}"
+
+    clean_date = re.sub(r',\s*[A-Za-z]+', '', date_str).strip()
+
+    try:
+        dt = datetime.strptime(clean_date, "%m/%d/%Y")
+        return dt.strftime("%Y-%m-%d"), None
+    except:
+        pass
+
+    try:
+        dt = datetime.strptime(clean_date, "%m-%d-%Y")
+        return dt.strftime("%Y-%m-%d"), None
+    except:
+        pass
+
+    return date_str, None
+
+
+def time_calls(func, dates: list[str]) -> float:
+    start = time.perf_counter()
+    for date_str in dates:
+        func(date_str)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parse_date against the strptime baseline')
+    parser.add_argument('--count', type=int, default=1_000_000, help='Calls per implementation')
+    parser.add_argument('--distinct', type=int, default=2_000,
+                        help='Distinct date strings the calls are drawn from (trip dates repeat)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [synthetic_date(rng) for _ in range(args.distinct)]
+    dates = [rng.choice(pool) for _ in range(args.count)]
+
+    mismatches = [d for d in pool if parse_date.__wrapped__(d) != parse_date_strptime(d)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} inputs disagree, e.g. {mismatches[:5]}")
+        sys.exit(1)
+    print(f"✓ Both implementations agree on all {len(pool):,} distinct inputs")
+
+    parse_date.cache_clear()
+    results = [
+        ('strptime (before)', time_calls(parse_date_strptime, dates)),
+        ('compiled, no memo', time_calls(parse_date.__wrapped__, dates)),
+        ('compiled + lru_cache', time_calls(parse_date, dates)),
+    ]
+
+    baseline = results[0][1]
+    print(f"\n{args.count:,} calls over {args.distinct:,} distinct dates:")
+    for name, seconds in results:
+        per_call = seconds / args.count * 1e9
+        print(f"  {name:<22} {seconds:7.3f}s  {per_call:8.0f} ns/call  {baseline / seconds:6.1f}x")
+
+    info = parse_date.cache_info()
+    print(f"\nlru_cache: {info.hits:,} hits, {info.misses:,} misses (maxsize {info.maxsize:,})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: pyramid resize_all against a direct LANCZOS resize per size.
+
+Decodes every icon in public/icons/full (or --input) once, then times
+producing the optimize_icons sizes both ways and reports the speedup and
+the worst PSNR of a pyramid size against its direct counterpart.
+
+Usage:
+    python benchmarks/resize_pyramid_bench.py
+    python benchmarks/resize_pyramid_bench.py --input public/images --sizes 64,128,256,512
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from optimize_images import PYRAMID_MIN_PSNR, resize_all  # noqa: E402
+
+DEFAULT_SIZES = '32,64,128'
+
+
+def load_images(directory: Path) -> list[Image.Image]:
+    images = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() in ('.png', '.jpg', '.jpeg', '.webp'):
+            with Image.open(path) as img:
+                images.append(img.convert('RGBA'))
+    return images
+
+
+def time_resize(images: list, sizes: dict, pyramid: bool, repeat: int, check: bool = False) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for img in images:
+            resize_all(img, sizes, pyramid, check)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time pyramid vs direct multi-size resizing')
+    parser.add_argument('--input', type=Path, default=ROOT / 'public' / 'icons' / 'full')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma-separated pixel sizes (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs; the best counts')
+    args = parser.parse_args()
+
+    sizes = {str(px): int(px) for px in args.sizes.split(',')}
+    images = load_images(args.input)
+    if not images:
+        sys.exit(f"No images in {args.input}")
+
+    direct = time_resize(images, sizes, False, args.repeat)
+    pyramid = time_resize(images, sizes, True, args.repeat)
+    checked = time_resize(images, sizes, True, args.repeat, check=True)
+    scores = [score for img in images for score in resize_all(img, sizes, pyramid=True, check=True)[1].values()]
+
+    print(f"{len(images)} images → sizes {args.sizes}")
+    print(f"  direct:  {direct:.3f}s ({direct / len(images) * 1000:.1f} ms/image)")
+    print(f"  pyramid: {pyramid:.3f}s ({pyramid / len(images) * 1000:.1f} ms/image)  {direct / pyramid:.1f}× faster")
+    print(f"  pyramid + PSNR check: {checked:.3f}s  {direct / checked:.1f}× direct")
+    print(f"  PSNR vs direct: min {min(scores):.1f} dB, mean {sum(scores) / len(scores):.1f} dB "
+          f"({len([s for s in scores if s < PYRAMID_MIN_PSNR])} below {PYRAMID_MIN_PSNR:g} dB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark the diary and journal tooling at scale against a versioned JSON baseline.
+
+Each case runs over synthetic inputs (see generators.py) at every requested
+size: parse_diary.iter_entries and find_items.py over a diary, and
+parse_sample_data / update_field from backfill_water_data.py over a
+sampleData.ts. Wall time is the best of --repeat runs; peak memory comes
+from one extra run under tracemalloc, so tracing does not skew the timing.
+Generated inputs are kept in .cache/benchmarks/ and reused.
+
+Results are compared with benchmarks/baseline.json. A case that is slower
+or uses more memory than its baseline by more than the tolerance is
+reported as a regression and the exit status is 1. --save records this
+run as the new baseline for the cases and sizes it covered.
+
+Usage:
+    python benchmarks/run_benchmarks.py                        # 1k and 100k entries
+    python benchmarks/run_benchmarks.py --sizes 1000,100000,1000000
+    python benchmarks/run_benchmarks.py --cases parse_diary,find_items --repeat 1
+    python benchmarks/run_benchmarks.py --save                 # record a new baseline
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import runpy
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from backfill_water_data import parse_sample_data, update_field  # noqa: E402
+from generators import write_diary, write_sample_data  # noqa: E402
+from parse_diary import iter_entries  # noqa: E402
+from ts_literal import splice  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+BASELINE_VERSION = 1
+DATA_DIR = ROOT / '.cache' / 'benchmarks'
+
+DEFAULT_SIZES = [1_000, 100_000]
+DEFAULT_REPEAT = 3
+DEFAULT_TIME_TOLERANCE = 0.25     # 25% slower
+DEFAULT_MEMORY_TOLERANCE = 0.25   # 25% more peak memory
+MIN_SECONDS = 0.01                # below this, timing differences are noise
+
+
+class Case(NamedTuple):
+    kind: str                         # input kind: 'diary' or 'sample-data'
+    setup: Callable[[Path], tuple]    # untimed; returns the arguments for run
+    run: Callable
+
+
+def run_parse_diary(path: Path) -> int:
+    with open(path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        return sum(1 for _ in iter_entries(f))
+
+
+def run_find_items(path: Path):
+    argv = sys.argv
+    sys.argv = ['find_items.py', str(path)]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(str(ROOT / 'find_items.py'), run_name='__main__')
+    finally:
+        sys.argv = argv
+
+
+def run_update_field(content: str, entries: list) -> str:
+    edits = [edit for entry in entries if (edit := update_field(entry, 'flowRate', '512'))]
+    return splice(content, edits)
+
+
+def read_text(path: Path) -> tuple:
+    return (path.read_text(encoding='utf-8'),)
+
+
+def parse_text(path: Path) -> tuple:
+    content = path.read_text(encoding='utf-8')
+    return content, parse_sample_data(content)
+
+
+CASES = {
+    'parse_diary': Case('diary', lambda path: (path,), run_parse_diary),
+    'find_items': Case('diary', lambda path: (path,), run_find_items),
+    'parse_sample_data': Case('sample-data', read_text, parse_sample_data),
+    'update_field': Case('sample-data', parse_text, run_update_field),
+}
+
+GENERATORS = {
+    'diary': (write_diary, '.md'),
+    'sample-data': (write_sample_data, '.ts'),
+}
+
+
+def input_path(kind: str, size: int, seed: int) -> Path:
+    """Synthetic input of a kind and size, generated on first use."""
+    write, suffix = GENERATORS[kind]
+    path = DATA_DIR / f'{kind}-{size}-seed{seed}{suffix}'
+    if not path.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        print(f"   generating {path.name}...", file=sys.stderr)
+        tmp = path.with_name(path.name + '.tmp')
+        write(tmp, size, seed)
+        os.replace(tmp, path)
+    return path
+
+
+def measure(case: Case, path: Path, repeat: int) -> dict:
+    """Best-of-repeat wall time and tracemalloc peak for one case on one input."""
+    args = case.setup(path)
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        case.run(*args)
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': round(best, 4), 'peak_mb': round(peak / 1e6, 2)}
+
+
+def result_key(name: str, size: int) -> str:
+    return f'{name}[{size}]'
+
+
+def load_baseline(path: Path) -> dict:
+    """Baseline results by key, or {} if missing or written by another harness version."""
+    if not path.exists():
+        return {}
+    baseline = json.loads(path.read_text())
+    if baseline.get('version') != BASELINE_VERSION:
+        print(f"⚠️  {path.name} is version {baseline.get('version')}, expected {BASELINE_VERSION}; not comparing")
+        return {}
+    return baseline.get('results', {})
+
+
+def save_baseline(path: Path, results: dict):
+    """Merge results into the baseline file (cases and sizes not run keep their values)."""
+    previous = {}
+    if path.exists():
+        existing = json.loads(path.read_text())
+        if existing.get('version') == BASELINE_VERSION:
+            previous = existing.get('results', {})
+    baseline = {
+        'version': BASELINE_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(terse=True),
+            'cpus': os.cpu_count(),
+        },
+        'results': dict(sorted({**previous, **results}.items())),
+    }
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(baseline, indent=2) + '\n')
+    os.replace(tmp, path)
+
+
+def regressions(result: dict, base: dict, time_tolerance: float, memory_tolerance: float) -> list[str]:
+    """Descriptions of the ways result is worse than base beyond tolerance."""
+    found = []
+    if result['seconds'] > max(base['seconds'] * (1 + time_tolerance), base['seconds'] + MIN_SECONDS):
+        found.append(f"time {base['seconds']:.3f}s → {result['seconds']:.3f}s")
+    if result['peak_mb'] > base['peak_mb'] * (1 + memory_tolerance):
+        found.append(f"memory {base['peak_mb']:.1f} → {result['peak_mb']:.1f} MB")
+    return found
+
+
+def format_change(value: float, base: float | None) -> str:
+    if not base:
+        return '      new'
+    return f"{(value - base) / base:+8.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data tooling against a JSON baseline')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated entry counts (default: %(default)s)')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated cases (default: all)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Timed runs per case; the best counts')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic inputs')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--time-tolerance', type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.cases.split(',')
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    flagged = []
+
+    print(f"{'case':<32} {'time':>10} {'Δ':>9} {'peak':>11} {'Δ':>9}")
+    for size in sizes:
+        for name in names:
+            case = CASES[name]
+            key = result_key(name, size)
+            result = measure(case, input_path(case.kind, size, args.seed), args.repeat)
+            results[key] = result
+
+            base = baseline.get(key)
+            problems = regressions(result, base, args.time_tolerance, args.memory_tolerance) if base else []
+            print(f"{key:<32} {result['seconds']:>9.3f}s {format_change(result['seconds'], base and base['seconds'])} "
+                  f"{result['peak_mb']:>8.1f} MB {format_change(result['peak_mb'], base and base['peak_mb'])}"
+                  f"{'  ❌ REGRESSION' if problems else ''}")
+            if problems:
+                flagged.append((key, problems))
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\n✨ Saved {len(results)} results to {args.baseline}")
+    if flagged:
+        print(f"\n❌ {len(flagged)} regression(s) against {args.baseline.name}:")
+        for key, problems in flagged:
+            print(f"   {key}: {'; '.join(problems)}")
+        if not args.save:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,51 +1,26 @@
-import re
+import sys
+from collections import Counter
 
-# Read the diary file
-with open('docs/spring_river_fishing_diary.md', 'r') as f:
-    content = f.read()
+from ingest_diaries import discover_files
+from term_matcher import diary_matcher
 
-# Common fish species list (simplified matching)
-species_list = [
-    "Smallmouth Bass", "Smallmouth", "Smallie", "Spotted Bass", "Spot", "Black Bass", "Black", 
-    "Largemouth Bass", "Largemouth", "Brownie", "Brown Trout", "Rainbow Trout", "Trout", 
-    "Walleye", "Sauger", "Saugeye", "Shadow Bass", "Rock Bass", "Rocker", "Goggle Eye",
-    "Bream", "Bluegill", "Sunfish", "Longear", "Green Sunfish", "Crappie", "White Crappie", 
-    "Catfish", "Channel Catfish", "Drum", "Carp", "Gar", "Striper", "Hybrid Striped Bass"
-]
+# Diary files, directories or globs (default: the Spring River diary)
+paths = discover_files(sys.argv[1:] or ['docs/spring_river_fishing_diary.md'])
 
-# Common lures list
-lure_list = [
-    "Shad Rap", "BSR", "BCW", "Flicker Shad", "Crankbait", "Square Bill", "Cranker",
-    "Jig", "Hair Jig", "Jig and Pig", "Jig and Peed", "GGO",
-    "Centipede", "Tube", "Crawler", "Nightcrawler", "Worm", "Plastic Worm", "Spoon", "Minnow"
-]
-
-found_species = set()
-found_lures = set()
-
-# Normalize and search
-content_lower = content.lower()
-
-for species in species_list:
-    if species.lower() in content_lower:
-        found_species.add(species)
-
-for lure in lure_list:
-    if lure.lower() in content_lower:
-        found_lures.add(lure)
+# One pass over each document for every species and lure term
+matcher = diary_matcher()
+species = Counter()
+lures = Counter()
+for path in paths:
+    with open(path, 'r') as f:
+        counts = matcher.count(f.read())
+    species.update(counts['species'])
+    lures.update(counts['lure'])
 
 print("--- SPECIES ---")
-for s in sorted(list(found_species)):
-    print(s)
+for s, n in sorted(species.items()):
+    print(f"{s} ({n})")
 
 print("\n--- LURES ---")
-for l in sorted(list(found_lures)):
-    print(l)
-
-
-
-
-
-
-
-
+for l, n in sorted(lures.items()):
+    print(f"{l} ({n})")
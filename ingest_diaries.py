@@ -0,0 +1,152 @@
+"""
+Ingest many diary files in parallel into one ordered NDJSON stream.
+
+Inputs may be files, directories (searched recursively for --pattern,
+which by default only takes *diary*.md so design docs under docs/plans/
+are not read as entries) or glob patterns. Files are spread across a process pool, largest first; each
+worker parses its file, runs extraction, and renders the records. The
+parent merges everything in (date, source file, line) order. Entry ids are
+content-addressed, so the output is byte-identical at any --jobs setting.
+
+Workers read the shared parse cache and only parse lines it does not hold;
+the parent stores the new entries, and --changed-ids lists them for the
+backfills' --ids option.
+
+Usage:
+    python ingest_diaries.py docs/                                  # every *diary*.md under docs/
+    python ingest_diaries.py 'diaries/**/*.md' -j 8 -o entries.ndjson
+    python ingest_diaries.py docs/spring_river_fishing_diary.md --array
+    python ingest_diaries.py docs/ --changed-ids changed.json -o entries.ndjson
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from parse_cache import CACHE_PATH, ParseCache
+from parse_diary import format_record, iter_entries, write_changed_ids, write_records
+
+# Diaries are named *diary*.md; other markdown (plans, prompts) would parse as bogus entries
+DEFAULT_PATTERN = "*diary*.md"
+
+
+def discover_files(inputs, pattern=DEFAULT_PATTERN):
+    """
+    Expand files, directories and glob patterns into a sorted, de-duplicated file list.
+
+    Raises:
+        FileNotFoundError: When an input matches nothing
+    """
+    files = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = [p for p in path.rglob(pattern) if p.is_file()]
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in glob.glob(item, recursive=True) if Path(p).is_file()]
+        if not matches:
+            raise FileNotFoundError(f"No diary files match {item}")
+        files.update(p.as_posix() for p in matches)
+    return sorted(files)
+
+
+def ingest_file(path, array=False, cache_path=None):
+    """
+    Parse and extract one diary file (runs in a worker process).
+
+    Args:
+        path: Diary file
+        array: Render records as JSON array items instead of NDJSON lines
+        cache_path: Parse cache to read (None to parse every line)
+
+    Returns:
+        ([((date, source, line), rendered record), ...] in file order,
+         {entry_id: entry} parsed because the cache did not hold them)
+    """
+    cache = ParseCache(cache_path, readonly=True) if cache_path else None
+    try:
+        with open(path, "r", encoding="utf-8", buffering=1 << 20) as f:
+            records = [
+                ((entry["date"], path, entry["line"]), format_record(entry, array))
+                for entry in iter_entries(f, source=path, cache=cache)
+            ]
+    finally:
+        if cache is not None:
+            cache.close()
+    return records, cache.pending if cache is not None else {}
+
+
+def ingest(files, jobs=1, array=False, cache=None):
+    """
+    Ingest files across `jobs` processes and return rendered records in merge order.
+
+    Entries the workers had to parse are added to cache (commit() is left to the caller).
+    """
+    cache_path = str(cache.path) if cache is not None else None
+    if jobs <= 1 or len(files) <= 1:
+        results = [ingest_file(path, array, cache_path) for path in files]
+    else:
+        # Largest files first so one big diary doesn't start last and run alone
+        by_size = sorted(files, key=lambda p: (-os.path.getsize(p), p))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                ingest_file, by_size, [array] * len(by_size), [cache_path] * len(by_size)
+            ))
+
+    records = []
+    for file_records, new_entries in results:
+        records.extend(file_records)
+        if cache is not None:
+            for entry in new_entries.values():
+                cache.add(entry)
+    records.sort(key=lambda record: record[0])
+    return [text for _, text in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse many diary files in parallel into one NDJSON stream")
+    parser.add_argument("inputs", nargs="+", help="Diary files, directories or glob patterns")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File pattern inside directories (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", help="Write records here instead of stdout")
+    parser.add_argument("--array", action="store_true", help="Emit one indented JSON array instead of NDJSON")
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="Parse cache of entries by content id")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every line and leave the cache alone")
+    parser.add_argument("--changed-ids", help="Write ids of entries parsed this run (new or edited) to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        files = discover_files(args.inputs, args.pattern)
+    except FileNotFoundError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    cache = None if args.no_cache else ParseCache(args.cache)
+    records = ingest(files, args.jobs, args.array, cache)
+
+    out = open(args.output, "w", buffering=1 << 20) if args.output else sys.stdout
+    try:
+        count = write_records(records, out, args.array)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    changed = []
+    if cache is not None:
+        changed = cache.changed_entries
+        cache.commit()
+        cache.close()
+    if args.changed_ids:
+        write_changed_ids(args.changed_ids, changed)
+
+    print(f"Ingested {count} entries from {len(files)} files with {args.jobs} jobs "
+          f"({len(changed)} new or changed)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
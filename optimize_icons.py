@@ -1,14 +1,38 @@
 """
 Optimize icons: Convert to WebP and generate multiple sizes.
 Creates small, crisp versions for fast loading.
+
+New PNGs dropped into public/icons/ are moved to full/ and sized; icons
+already in full/ are the sources of their sizes on later runs. A build
+manifest (scripts/build_manifest.py) records each icon's content hash and
+settings, so unchanged icons are skipped and the sizes of icons removed
+from full/ are deleted. public/icons/responsive.json lists every format
+and width of each icon for <picture>/srcset markup.
+
+Usage:
+    python optimize_icons.py
+    python optimize_icons.py --jobs 8    # spread icons across 8 worker processes
+    python optimize_icons.py --force     # rebuild every icon
+    python optimize_icons.py --avif      # AVIF sizes too
+    python optimize_icons.py --resize pyramid --check-pyramid   # faster sizes, PSNR-guarded
 """
 
+import argparse
 import os
-from PIL import Image
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, features
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from build_manifest import BuildManifest, file_digest  # noqa: E402
+from optimize_images import AVIF_QUALITY, PYRAMID_MIN_PSNR, resize_all  # noqa: E402
+from encoder_tuning import AVIF_SPEED  # noqa: E402
+from responsive_manifest import write_responsive_manifest  # noqa: E402
 
 # Directories
 SOURCE_DIR = "public/icons"
 OUTPUT_BASE = "public/icons"
+FULL_DIR = os.path.join(OUTPUT_BASE, "full")
 
 # Sizes to generate
 SIZES = {
@@ -17,64 +41,133 @@ SIZES = {
     "lg": 128,  # Dashboard, hero sections
 }
 
-def optimize_icons():
-    # Create output directories
-    for size_name in SIZES:
-        os.makedirs(os.path.join(OUTPUT_BASE, size_name), exist_ok=True)
-
-    # Also create full/ for originals backup
-    full_dir = os.path.join(OUTPUT_BASE, "full")
-    os.makedirs(full_dir, exist_ok=True)
-
-    # Get all PNG files in source (exclude subdirectories)
-    png_files = [f for f in os.listdir(SOURCE_DIR)
-                 if f.lower().endswith('.png')
-                 and os.path.isfile(os.path.join(SOURCE_DIR, f))]
+WEBP_QUALITY = 90
+WEBP_METHOD = 6
+
+def optimize_icon(filename, source_dir=SOURCE_DIR, avif=False, resize="direct", check_pyramid=False):
+    """
+    Write one icon's full/ original (unless it is the source) and its WebP + PNG (+ AVIF) sizes.
+
+    Returns:
+        {"filename": ..., "outputs": [...]}, or {"filename": ..., "error": ...}
+    """
+    source_path = os.path.join(source_dir, filename)
+    base_name = os.path.splitext(filename)[0]
+    outputs = []
+
+    try:
+        # Open original
+        with Image.open(source_path) as img:
+            # Ensure RGBA for transparency
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+
+            # Move original to full/
+            full_path = os.path.join(FULL_DIR, filename)
+            if source_dir != FULL_DIR:
+                img.save(full_path, 'PNG', optimize=True)
+            outputs.append(full_path)
 
-    print(f"Processing {len(png_files)} icons...")
+            # High-quality resizes with antialiasing, from the full image or one reduce() pyramid
+            resized_sizes, _ = resize_all(img, SIZES, resize == "pyramid", check_pyramid)
 
-    for filename in sorted(png_files):
-        source_path = os.path.join(SOURCE_DIR, filename)
-        base_name = os.path.splitext(filename)[0]
+            # Generate each size as WebP
+            for size_name, resized in resized_sizes.items():
+                # Save as WebP (smaller, good quality, supports transparency)
+                webp_filename = f"{base_name}.webp"
+                webp_path = os.path.join(OUTPUT_BASE, size_name, webp_filename)
+                resized.save(webp_path, 'WEBP', quality=WEBP_QUALITY, method=WEBP_METHOD)
 
-        try:
-            # Open original
-            with Image.open(source_path) as img:
-                # Ensure RGBA for transparency
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
+                # Also save PNG fallback for older browsers
+                png_path = os.path.join(OUTPUT_BASE, size_name, filename)
+                resized.save(png_path, 'PNG', optimize=True)
+                outputs += [webp_path, png_path]
 
-                print(f"  • {filename}")
+                # AVIF for browsers that support it (smallest at md/lg)
+                if avif:
+                    avif_path = os.path.join(OUTPUT_BASE, size_name, f"{base_name}.avif")
+                    resized.save(avif_path, 'AVIF', quality=AVIF_QUALITY, speed=AVIF_SPEED)
+                    outputs.append(avif_path)
 
-                # Move original to full/
-                full_path = os.path.join(full_dir, filename)
-                img.save(full_path, 'PNG', optimize=True)
+    except Exception as e:
+        return {"filename": filename, "error": str(e)}
 
-                # Generate each size as WebP
-                for size_name, size_px in SIZES.items():
-                    # High-quality resize with antialiasing
-                    resized = img.resize((size_px, size_px), Image.Resampling.LANCZOS)
+    return {"filename": filename, "outputs": outputs}
 
-                    # Save as WebP (smaller, good quality, supports transparency)
-                    webp_filename = f"{base_name}.webp"
-                    webp_path = os.path.join(OUTPUT_BASE, size_name, webp_filename)
-                    resized.save(webp_path, 'WEBP', quality=90, method=6)
+def list_pngs(directory):
+    return sorted(f for f in os.listdir(directory)
+                  if f.lower().endswith('.png')
+                  and os.path.isfile(os.path.join(directory, f)))
 
-                    # Also save PNG fallback for older browsers
-                    png_path = os.path.join(OUTPUT_BASE, size_name, filename)
-                    resized.save(png_path, 'PNG', optimize=True)
+def optimize_icons(jobs=1, force=False, avif=False, resize="direct", check_pyramid=False):
+    # Create output directories
+    for size_name in SIZES:
+        os.makedirs(os.path.join(OUTPUT_BASE, size_name), exist_ok=True)
 
-        except Exception as e:
-            print(f"  ❌ Error processing {filename}: {e}")
+    # Also create full/ for originals backup
+    full_dir = FULL_DIR
+    os.makedirs(full_dir, exist_ok=True)
 
-    # Remove original PNGs from root icons/ (now in full/)
+    # New icons in the source root (exclude subdirectories), then ones already in full/
+    new_files = list_pngs(SOURCE_DIR)
+    sources = {filename: FULL_DIR for filename in list_pngs(FULL_DIR)}
+    sources.update({filename: SOURCE_DIR for filename in new_files})
+
+    manifest = BuildManifest(OUTPUT_BASE, "optimize_icons", {
+        "sizes": SIZES, "quality": WEBP_QUALITY, "method": WEBP_METHOD,
+        "resize": resize + ("-checked" if resize == "pyramid" and check_pyramid else ""),
+        "avif": avif,
+    })
+    stale = [
+        filename for filename, source_dir in sorted(sources.items())
+        if force or source_dir == SOURCE_DIR
+        or not manifest.is_current(filename, file_digest(os.path.join(source_dir, filename)))
+    ]
+
+    print(f"Processing {len(stale)} icons ({len(sources) - len(stale)} up to date)...")
+
+    if jobs <= 1 or len(stale) <= 1:
+        results = []
+        for filename in stale:
+            print(f"  • {filename}")
+            results.append(optimize_icon(filename, sources[filename], avif, resize, check_pyramid))
+    else:
+        # Largest first so one big original doesn't start last and run alone
+        by_size = sorted(stale, key=lambda f: (-os.path.getsize(os.path.join(sources[f], f)), f))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            by_name = dict(zip(by_size, executor.map(
+                optimize_icon, by_size, [sources[f] for f in by_size],
+                [avif] * len(by_size), [resize] * len(by_size), [check_pyramid] * len(by_size)
+            )))
+        results = [by_name[filename] for filename in stale]
+        for result in results:
+            print(f"  • {result['filename']}")
+
+    failed = [result for result in results if "error" in result]
+    for result in failed:
+        print(f"  ❌ Error processing {result['filename']}: {result['error']}")
+
+    # Icons are recorded against their full/ copy, which is their source from now on
+    removed = []
+    for result in results:
+        if "error" not in result:
+            digest = file_digest(os.path.join(FULL_DIR, result["filename"]))
+            removed += manifest.record(result["filename"], digest, result["outputs"])
+    removed += manifest.prune(sources)
+    manifest.save()
+    for path in removed:
+        print(f"  🗑  {path}")
+    responsive_path = write_responsive_manifest(manifest)
+
+    # Remove original PNGs from root icons/ (now in full/); failed ones stay for a retry
     print("\nCleaning up root directory...")
-    for filename in png_files:
-        source_path = os.path.join(SOURCE_DIR, filename)
-        if os.path.exists(source_path):
+    for result in results:
+        source_path = os.path.join(SOURCE_DIR, result["filename"])
+        if "error" not in result and result["filename"] in new_files and os.path.exists(source_path):
             os.remove(source_path)
 
-    print("\n✨ Done!")
+    print(f"\n✨ Done! Processed {len(results) - len(failed)}/{len(results)} icons "
+          f"({len(sources) - len(stale)} up to date)")
     print(f"\nGenerated sizes:")
     for size_name, size_px in SIZES.items():
         dir_path = os.path.join(OUTPUT_BASE, size_name)
@@ -82,8 +175,26 @@ def optimize_icons():
         print(f"  • {size_name}/ ({size_px}px): {file_count} icons")
 
     print(f"\nOriginals backed up to: {full_dir}/")
+    print(f"Formats, widths and bytes per icon: {responsive_path}")
     print("\nUsage in code:")
     print('  <img src="/icons/sm/largemouth-bass-icon.webp" />')
+    print("  or <picture> sources from src/utils/responsiveImages.ts")
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize icons in public/icons into sm/md/lg WebP + PNG sizes")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes to spread icons across (default: 1)")
+    parser.add_argument("--force", action="store_true", help="Rebuild every icon, even unchanged ones")
+    parser.add_argument("--avif", action="store_true", help="Also write AVIF sizes (needs Pillow with AVIF support)")
+    parser.add_argument("--resize", choices=["direct", "pyramid"], default="direct",
+                        help="direct: LANCZOS from full size; pyramid: reduce() pyramid first, faster (default: direct)")
+    parser.add_argument("--check-pyramid", action="store_true",
+                        help=f"With --resize pyramid, fall back to a direct resize below {PYRAMID_MIN_PSNR:g} dB PSNR")
+    args = parser.parse_args()
+    if args.avif and not features.check("avif"):
+        parser.error("--avif needs a Pillow build with AVIF support")
+    optimize_icons(args.jobs, args.force, args.avif, args.resize, args.check_pyramid)
 
 if __name__ == "__main__":
-    optimize_icons()
+    main()
@@ -0,0 +1,140 @@
+"""
+Persistent cache of parsed diary entries, keyed by content-addressed entry id.
+
+Entry ids hash the normalized source line plus its date (see
+parse_diary.line_entry_id), so an unchanged line maps to the same cached
+record on every run and only new or edited lines are parsed and enriched
+again. Records also store a fingerprint of the parser sources; editing
+parse_diary.py, term_matcher.py or the species list invalidates every
+cached record.
+
+Usage:
+    cache = ParseCache()
+    for entry in iter_entries(f, cache=cache):
+        ...
+    cache.commit()           # store entries parsed this run
+    cache.changed_ids        # ids that were (re)parsed
+    cache.changed_entries    # the same with their dates and stream, for the backfills' --ids
+
+New entries are written through in batches of BATCH_SIZE inside one
+transaction, so a first run (or one after a parser change) holds at most a
+batch of records in memory; commit() makes them durable.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent / ".cache" / "diary_parse.sqlite3"
+
+# Modules whose code decides what a parsed record looks like
+PARSER_SOURCES = ("parse_diary.py", "term_matcher.py", "src/data/fishSpecies.ts")
+
+# Parsed records held before they are written to the open transaction
+BATCH_SIZE = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    record TEXT NOT NULL
+)
+"""
+
+
+def parser_fingerprint():
+    """Digest of the parser sources, so cached records expire when parsing changes."""
+    digest = hashlib.sha256()
+    for name in PARSER_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    Entry records by id, plus the ids of entries parsed (cache misses) during this run.
+
+    Args:
+        path: SQLite database file (parent directories are created)
+        readonly: Only read; used by ingestion workers, whose new entries
+            stay in pending to be handed back to the parent and stored with add()
+        batch_size: New entries held before they are written (not used when readonly)
+    """
+
+    def __init__(self, path=CACHE_PATH, readonly=False, batch_size=BATCH_SIZE):
+        self.path = Path(path)
+        self.fingerprint = parser_fingerprint()
+        self.readonly = readonly
+        self.batch_size = batch_size
+        self.hits = 0
+        self.pending = {}
+        self._changed = {}  # id -> (date, endDate, location); never the whole record
+
+        if readonly:
+            if self.path.exists():
+                self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            else:
+                self._conn = None
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+    @property
+    def changed_ids(self):
+        """Sorted ids of entries parsed this run (new, edited, or parser changed)."""
+        return sorted(self._changed)
+
+    @property
+    def changed_entries(self):
+        """{id, date, endDate, streamName} for each entry parsed this run, sorted by id."""
+        return [
+            {"id": entry_id, "date": start, "endDate": end, "streamName": location}
+            for entry_id, (start, end, location) in sorted(self._changed.items())
+        ]
+
+    def get(self, entry_id):
+        """Cached record for an id, or None if absent or from another parser version."""
+        if entry_id in self.pending:
+            return dict(self.pending[entry_id])
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT record FROM entries WHERE id = ? AND fingerprint = ?",
+            (entry_id, self.fingerprint)
+        ).fetchone()
+        if row is None:
+            return None
+        if entry_id not in self._changed:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def add(self, entry):
+        """Remember a freshly parsed entry; written once a batch fills up, durable on commit()."""
+        self.pending[entry["id"]] = entry
+        self._changed[entry["id"]] = (entry.get("date"), entry.get("endDate") or entry.get("date"), entry.get("location"))
+        if not self.readonly and len(self.pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        # Written into the open transaction; this connection reads them back before commit()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            [(entry_id, self.fingerprint, json.dumps(entry)) for entry_id, entry in self.pending.items()]
+        )
+        self.pending.clear()
+
+    def commit(self):
+        """Write the last batch and commit this run's new entries as one transaction."""
+        if self.readonly:
+            return
+        if self.pending:
+            self._flush()
+        self._conn.commit()
@@ -1,53 +1,111 @@
+"""
+Parse the fishing diary into journal entries, one NDJSON record per line.
+
+Lines are read lazily and each entry is written as soon as it is parsed,
+so memory stays flat however long the diary export is.
+
+Usage:
+    python parse_diary.py > entries.ndjson
+    python parse_diary.py path/to/diary.md -o entries.ndjson
+    python parse_diary.py --array > entries.json    # one indented JSON array
+    python parse_diary.py --debug                   # per-line trace on stderr
+    python parse_diary.py --changed-ids changed.json > entries.ndjson
+
+Entry ids are content-addressed (normalized line plus date), and parsed
+entries are kept in a parse cache (parse_cache.py), so a rerun over an
+edited diary only re-parses the lines that changed; --changed-ids lists
+them (id, dates, stream) for the backfills' --ids option, which limits
+re-enrichment to those entries.
+"""
+
+import argparse
+import calendar
 import re
 import json
+import sys
+import unicodedata
 import uuid
-from datetime import datetime
+from functools import lru_cache
+
+from parse_cache import CACHE_PATH, ParseCache
+from term_matcher import diary_matcher, species_caught
+
+DIARY_PATH = "docs/spring_river_fishing_diary.md"
+
+# Date – Anglers – Content, split on en-dash or hyphen
+LINE_SPLIT = re.compile(r'\s*[–-]\s*')
+
+# Every accepted date format in one pattern; the matching branch is
+# identified by match.lastgroup (the last group of each branch)
+DATE_FORMATS = re.compile(r'''
+    (?P<text_d1>\d{1,2})-(?P<text_d2>\d{1,2})\s+(?P<text_month>[A-Za-z]+)\s+(?P<text_year>\d{4})
+  | (?P<range_m>\d+)/(?P<range_d1>\d+)-(?P<range_d2>\d+)/(?P<range_year>\d{4})
+  | (?P<m>\d{1,2})(?P<sep>[/-])(?P<d>\d{1,2})(?P=sep)(?P<year>\d{4})
+    (?:\s*,\s*[A-Za-z]+)*\s*$        # trailing day names: ", Fri"
+''', re.VERBOSE)
+
+MONTHS = {calendar.month_name[i].lower(): i for i in range(1, 13)}
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+DATE_CACHE_SIZE = 4096
+
+# uuid5 namespace for content-addressed entry ids
+ENTRY_NAMESPACE = uuid.UUID("6f1c2a3e-5b7d-4e8f-9a0b-1c2d3e4f5a6b")
 
+
+def _is_valid_day(year, month, day):
+    if not 1 <= month <= 12 or day < 1:
+        return False
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= DAYS_IN_MONTH[month]
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def parse_date(date_str):
+    """
+    Parse a diary date into (start_iso, end_iso or None).
+
+    One precompiled DATE_FORMATS match picks the format; its fields are
+    range-checked as integers and zero-padded into ISO dates, so no
+    strptime call or exception is on the common path. Unrecognized strings come back stripped, with None.
+    Results are memoized since trip dates repeat across lines.
+    """
     # Normalize
     date_str = date_str.strip()
-    
-    # Handle "04-07 October 2018"
-    match_full_text = re.match(r'(\d+)-(\d+)\s+([A-Za-z]+)\s+(\d{4})', date_str)
-    if match_full_text:
-        d1, d2, month, year = match_full_text.groups()
-        try:
-            dt1 = datetime.strptime(f"{d1} {month} {year}", "%d %B %Y")
-            dt2 = datetime.strptime(f"{d2} {month} {year}", "%d %B %Y")
-            return dt1.strftime("%Y-%m-%d"), dt2.strftime("%Y-%m-%d")
-        except:
-            pass
-
-    # Handle "2/16-19/2014"
-    match_range_slashes = re.match(r'(\d+)/(\d+)-(\d+)/(\d{4})', date_str)
-    if match_range_slashes:
-        m, d1, d2, y = match_range_slashes.groups()
-        return f"{y}-{m.zfill(2)}-{d1.zfill(2)}", f"{y}-{m.zfill(2)}-{d2.zfill(2)}"
 
-    # Handle standard "10/7/1994" or "2/15/2002, Fri"
-    # Remove day names
-    clean_date = re.sub(r',\s*[A-Za-z]+', '', date_str).strip()
-    
-    try:
-        dt = datetime.strptime(clean_date, "%m/%d/%Y")
-        return dt.strftime("%Y-%m-%d"), None
-    except:
-        pass
-        
-    try:
-        dt = datetime.strptime(clean_date, "%m-%d-%Y") # if separators differ
-        return dt.strftime("%Y-%m-%d"), None
-    except:
-        pass
+    match = DATE_FORMATS.match(date_str)
+    if match is None:
+        return date_str, None
 
-    return date_str, None
+    # "04-07 October 2018"
+    if match.lastgroup == "text_year":
+        d1, d2, month_name, year = match.group("text_d1", "text_d2", "text_month", "text_year")
+        month = MONTHS.get(month_name.lower())
+        if month is None:
+            return date_str, None
+        y = int(year)
+        if not (_is_valid_day(y, month, int(d1)) and _is_valid_day(y, month, int(d2))):
+            return date_str, None
+        return f"{year}-{month:02d}-{d1.zfill(2)}", f"{year}-{month:02d}-{d2.zfill(2)}"
 
-def parse_line(line):
+    # "2/16-19/2014" (taken as written, without calendar checks)
+    if match.lastgroup == "range_year":
+        m, d1, d2, y = match.group("range_m", "range_d1", "range_d2", "range_year")
+        return f"{y}-{m.zfill(2)}-{d1.zfill(2)}", f"{y}-{m.zfill(2)}-{d2.zfill(2)}"
+
+    # "10/7/1994", "10-7-1994" or "2/15/2002, Fri"
+    year, month, day = match.group("year", "m", "d")
+    if not _is_valid_day(int(year), int(month), int(day)):
+        return date_str, None
+    return f"{year}-{month.zfill(2)}-{day.zfill(2)}", None
+
+def parse_line(line, debug=False, entry_id=None):
     # Regex to split: Date – Anglers – Content
     # Use en-dash or hyphen
-    print(f"Processing: {line[:50]}...")
-    parts = re.split(r'\s*[–-]\s*', line, maxsplit=2)
-    print(f"Parts found: {len(parts)}")
+    if debug:
+        print(f"Processing: {line[:50]}...", file=sys.stderr)
+    parts = LINE_SPLIT.split(line, maxsplit=2)
+    if debug:
+        print(f"Parts found: {len(parts)}", file=sys.stderr)
     
     if len(parts) < 3:
         # Try finding date another way or skip
@@ -72,22 +130,14 @@ def parse_line(line):
     elif content_str.startswith("Strawberry River"):
         location = "Strawberry River"
     
-    # Extract some details
-    lures = []
-    if "Shad Rap" in content_str: lures.append("Shad Rap")
-    if "jig" in content_str.lower(): lures.append("Jig")
-    if "spoon" in content_str.lower(): lures.append("Spoon")
-    
-    weather = []
-    if "sunny" in content_str.lower(): weather.append("Sunny")
-    if "cloudy" in content_str.lower(): weather.append("Cloudy")
-    if "rain" in content_str.lower(): weather.append("Rain")
-    if "wind" in content_str.lower(): weather.append("Windy")
-    if "cool" in content_str.lower(): weather.append("Cool")
-    if "warm" in content_str.lower(): weather.append("Warm")
+    # Extract species, lures and weather in one pass over the notes
+    matcher = diary_matcher()
+    matches = matcher.find(content_str)
+    lures = matcher.labels(matches, "lure")
+    weather = matcher.labels(matches, "weather")
     
     entry = {
-        "id": str(uuid.uuid4()),
+        "id": entry_id or line_entry_id(line),
         "originalText": line,
         "date": date_iso,
         "anglers": anglers,
@@ -96,7 +146,7 @@ def parse_line(line):
         "details": {
             "lures": lures,
             "weather": ", ".join(weather) if weather else None,
-            "speciesCaught": [] # Placeholder
+            "speciesCaught": species_caught(content_str, matches)
         }
     }
     
@@ -105,19 +155,123 @@ def parse_line(line):
         
     return entry
 
-entries = []
-with open("docs/spring_river_fishing_diary.md", "r") as f:
-    for line in f:
-        print(f"Read line: '{line.strip()}'")
+def normalize_line(line):
+    """Canonical form of a diary line for hashing: NFC, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", line).split())
+
+def line_entry_id(line):
+    """
+    Content-addressed id: uuid5 of the line's date plus its normalized text.
+
+    The same trip line gets the same id on every run and in every file,
+    wherever it sits. Returns None for lines parse_line would reject.
+    """
+    normalized = normalize_line(line)
+    parts = LINE_SPLIT.split(normalized, maxsplit=2)
+    if len(parts) < 3:
+        return None
+    date_iso, _ = parse_date(parts[0])
+    return str(uuid.uuid5(ENTRY_NAMESPACE, f"{date_iso}\n{normalized}"))
+
+def iter_entry_lines(lines, debug=False):
+    """Yield (line_number, stripped line) for diary lines that start with a date."""
+    for line_number, line in enumerate(lines, 1):
+        if debug:
+            print(f"Read line: '{line.strip()}'", file=sys.stderr)
         line = line.strip()
         if not line:
             continue
         if not line[0].isdigit():
-            print("Skipping non-digit start")
+            if debug:
+                print("Skipping non-digit start", file=sys.stderr)
             continue
-        entry = parse_line(line)
+        yield line_number, line
+
+def iter_entries(lines, debug=False, source=None, cache=None):
+    """
+    Lazily parse an iterable of diary lines into entry dicts.
+
+    With a ParseCache, lines whose id is cached are not parsed again and
+    freshly parsed entries are added to it. With a source name, each entry
+    records its "source" file and "line" number.
+    """
+    for line_number, line in iter_entry_lines(lines, debug):
+        if cache is None:
+            entry = parse_line(line, debug)
+        else:
+            entry_id = line_entry_id(line)
+            entry = cache.get(entry_id) if entry_id else None
+            if entry is None:
+                entry = parse_line(line, debug, entry_id)
+                if entry:
+                    cache.add(dict(entry))
         if entry:
-            entries.append(entry)
+            if source:
+                entry["source"] = source
+                entry["line"] = line_number
+            yield entry
+
+def format_record(entry, array=False):
+    """Render one entry as output text: a compact NDJSON line or an indented array item."""
+    if array:
+        return json.dumps(entry, indent=2).replace("\n", "\n  ")
+    return json.dumps(entry)
+
+def write_records(records, out, array=False):
+    """Write rendered records as NDJSON, or as one indented JSON array. Returns the number written."""
+    count = 0
+    if array:
+        out.write("[")
+    for record in records:
+        if array:
+            out.write(",\n  " if count else "\n  ")
+            out.write(record)
+        else:
+            out.write(record)
+            out.write("\n")
+        count += 1
+    if array:
+        out.write("\n]\n" if count else "]\n")
+    return count
+
+def write_changed_ids(path, changed):
+    """Write ParseCache.changed_entries as the JSON file the backfills read with --ids."""
+    with open(path, "w") as f:
+        json.dump(changed, f, indent=2)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the fishing diary into journal entries")
+    parser.add_argument("diary", nargs="?", default=DIARY_PATH, help=f"Diary file (default: {DIARY_PATH})")
+    parser.add_argument("--output", "-o", help="Write records here instead of stdout")
+    parser.add_argument("--array", action="store_true", help="Emit one indented JSON array instead of NDJSON")
+    parser.add_argument("--debug", action="store_true", help="Trace every input line on stderr")
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="Parse cache of entries by content id")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every line and leave the cache alone")
+    parser.add_argument("--changed-ids", help="Write ids of entries parsed this run (new or edited) to this JSON file")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ParseCache(args.cache)
+
+    out = open(args.output, "w", buffering=1 << 20) if args.output else sys.stdout
+    try:
+        with open(args.diary, "r", buffering=1 << 20) as f:
+            entries = iter_entries(f, args.debug, cache=cache)
+            count = write_records((format_record(entry, args.array) for entry in entries), out, args.array)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    changed = []
+    if cache is not None:
+        changed = cache.changed_entries
+        cache.commit()
+        cache.close()
+    if args.changed_ids:
+        write_changed_ids(args.changed_ids, changed)
 
-print(json.dumps(entries, indent=2))
+    if args.debug or args.output:
+        print(f"Parsed {count} entries ({len(changed)} new or changed)", file=sys.stderr)
 
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,50 @@
 """
 Backfill USGS water data (discharge and gage height) for fishing journal entries.
 
+Entries are grouped by station and their dates merged into a few contiguous
+startDT/endDT windows, so each window is fetched once and joined back to
+entries locally.
+
+Usage:
+    python scripts/backfill_water_data.py
+    python scripts/backfill_water_data.py --max-gap-days 30
+    python scripts/backfill_water_data.py --concurrency 8 --rate 6
+    python scripts/backfill_water_data.py --offline       # replay from the response cache
+    python scripts/backfill_water_data.py --incremental   # only empty or stale entries
+    python scripts/backfill_water_data.py --resume        # continue an interrupted run
+    python scripts/backfill_water_data.py --ids changed.json  # only entries parse_diary.py re-parsed
+    python scripts/backfill_water_data.py --offline --history scripts/.cache/water_history
+    python scripts/backfill_water_data.py --prometheus scripts/.cache/water_backfill.prom
+
 Station Mapping:
+Streams resolve to the best discharge station in src/data/usgsStations.ts
+(see station_resolver.py), with these defaults when the stretch is ambiguous:
 - Spring River → 07069305 (Spring Street Bridge at Hardy, AR)
 - Eleven Point River → 07072000 (Near Ravenden Springs, AR)
 """
 
+import argparse
 import json
-import re
-import requests
+import os
 import shutil
+import sys
 import time
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import date as Date, datetime, timedelta
 from pathlib import Path
 
-# USGS Station IDs
+try:
+    import ijson
+except ImportError:  # pip install ijson to stream responses; falls back to json.load
+    ijson = None
+
+from http_pool import PooledClient
+from response_cache import CacheMiss, ResponseCache
+from run_metrics import RunMetrics
+from station_resolver import StationResolver
+from ts_literal import ObjectLiteral, parse_export, splice
+
+# Preferred USGS Station IDs (the full catalog is resolved by station_resolver)
 STATIONS = {
     'Spring River': '07069305',
     'Eleven Point River': '07072000',
@@ -25,145 +55,600 @@ STATIONS = {
 PARAM_DISCHARGE = '00060'  # Discharge (cfs)
 PARAM_GAGE_HEIGHT = '00065'  # Gage height (ft)
 
+# Dates closer together than this share one startDT/endDT request
+DEFAULT_MAX_GAP_DAYS = 14
+
+USGS_BASE_URL = 'https://waterservices.usgs.gov/nwis/'
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 4.0  # requests per second
+
+# parameterCd sent to each USGS service (part of the response cache key)
+SERVICE_PARAMETERS = {
+    'dv': f'{PARAM_DISCHARGE},{PARAM_GAGE_HEIGHT}',
+    'iv': PARAM_GAGE_HEIGHT,
+}
+
+# ijson event prefixes inside a USGS WaterML-JSON response
+VAR_CODE_PREFIX = 'value.timeSeries.item.variable.variableCode.item.value'
+READING_PREFIX = 'value.timeSeries.item.values.item.value.item'
+
+NOON_MINUTES = 12 * 60
+
+_resolver = None
+
 SAMPLE_DATA_PATH = Path(__file__).parent.parent / 'src' / 'data' / 'sampleData.ts'
+CACHE_PATH = Path(__file__).parent / '.cache' / 'water_responses.sqlite3'
+CHECKPOINT_PATH = Path(__file__).parent / '.cache' / 'water_backfill.checkpoint.jsonl'
+METRICS_PATH = Path(__file__).parent / '.cache' / 'water_backfill.metrics.json'
 
+DEFAULT_BATCH_SIZE = 50
+# Entries this recent may hold provisional USGS values and are refetched
+DEFAULT_STALE_DAYS = 30
 
-def fetch_usgs_data(station_id: str, date: str) -> dict:
-    """Fetch daily values from USGS for a specific date."""
-    result = {'discharge': None, 'gage_height': None}
 
-    # First try daily values for discharge
+def plan_fetch_windows(dates: list[str], max_gap_days: int = DEFAULT_MAX_GAP_DAYS) -> list[tuple[str, str]]:
+    """
+    Merge a set of ISO dates into a small number of contiguous fetch windows.
+
+    Dates closer together than max_gap_days share a window, so one
+    startDT/endDT request covers them all. Unparseable dates are ignored.
+
+    Args:
+        dates: ISO dates (YYYY-MM-DD), in any order and possibly repeated
+        max_gap_days: Largest gap (in days) bridged inside a single window
+
+    Returns:
+        Sorted list of (start_date, end_date) tuples
+    """
+    days = set()
+    for date in dates:
+        try:
+            days.add(datetime.strptime(date, '%Y-%m-%d').date())
+        except (TypeError, ValueError):
+            continue
+
+    windows = []
+    for day in sorted(days):
+        if windows and (day - windows[-1][1]).days <= max_gap_days:
+            windows[-1][1] = day
+        else:
+            windows.append([day, day])
+
+    return [(start.isoformat(), end.isoformat()) for start, end in windows]
+
+
+def plan_station_windows(
+    entries: list[tuple[str, str | None]],
+    max_gap_days: int = DEFAULT_MAX_GAP_DAYS
+) -> dict[str, list[tuple[str, str]]]:
+    """
+    Group (date, station_id) pairs by station and plan windows per station.
+
+    Entries without a station (None) are skipped.
+
+    Returns:
+        Dict of {station_id: [(start_date, end_date), ...]}
+    """
+    dates_by_station = {}
+    for date, station_id in entries:
+        if station_id is not None:
+            dates_by_station.setdefault(station_id, set()).add(date)
+
+    return {
+        station_id: plan_fetch_windows(dates, max_gap_days)
+        for station_id, dates in dates_by_station.items()
+    }
+
+
+def iter_series_values(data: dict):
+    """Yield (parameter_code, date, value) for every valid reading in a USGS JSON response."""
+    time_series = data.get('value', {}).get('timeSeries', [])
+    for series in time_series:
+        var_code = series.get('variable', {}).get('variableCode', [{}])[0].get('value', '')
+        values = series.get('values', [{}])[0].get('value', [])
+
+        for v in values:
+            value = v.get('value')
+            if value and value != '-999999':
+                yield var_code, v.get('dateTime', ''), value
+
+
+def iter_stream_values(stream):
+    """
+    Yield (parameter_code, dateTime, value) for every valid reading in a USGS JSON byte stream.
+
+    With ijson installed the document is decoded incrementally and never
+    held in memory; otherwise it is loaded with json.load.
+    """
+    if ijson is None:
+        yield from iter_series_values(json.load(stream))
+        return
+
+    var_code = ''
+    value = dt = None
+    for prefix, event, data in ijson.parse(stream):
+        if prefix == VAR_CODE_PREFIX:
+            var_code = data
+        elif prefix == READING_PREFIX + '.value':
+            value = data
+        elif prefix == READING_PREFIX + '.dateTime':
+            dt = data
+        elif prefix == READING_PREFIX and event == 'end_map':
+            if value and value != '-999999':
+                yield var_code, dt or '', value
+            value = dt = None
+
+
+def fetch_readings(client: PooledClient, service: str, params: dict):
+    """
+    Stream (parameter_code, dateTime, value) readings from a USGS service.
+
+    When the client has metrics attached, the request is recorded once the
+    body is fully consumed (latency, wire bytes, retries, empty result).
+    """
+    metrics = client.metrics
+    start = time.perf_counter()
+    count = 0
+    response = None
     try:
-        url = 'https://waterservices.usgs.gov/nwis/dv/'
-        params = {
-            'sites': station_id,
-            'startDT': date,
-            'endDT': date,
-            'parameterCd': f'{PARAM_DISCHARGE},{PARAM_GAGE_HEIGHT}',
-            'format': 'json',
-        }
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        time_series = data.get('value', {}).get('timeSeries', [])
-        for series in time_series:
-            var_code = series.get('variable', {}).get('variableCode', [{}])[0].get('value', '')
-            values = series.get('values', [{}])[0].get('value', [])
-
-            if values:
-                value = values[0].get('value')
-                if value and value != '-999999':
-                    if var_code == PARAM_DISCHARGE:
-                        result['discharge'] = value
-                    elif var_code == PARAM_GAGE_HEIGHT:
-                        result['gage_height'] = value
-    except Exception as e:
-        print(f"  Error fetching daily values: {e}")
+        with client.get(f'{service}/', params, stream=True) as response:
+            response.raw.decode_content = True
+            for reading in iter_stream_values(response.raw):
+                count += 1
+                yield reading
+    except Exception:
+        if metrics is not None:
+            metrics.record_request(service, params['sites'], time.perf_counter() - start, error=True)
+        raise
+    if metrics is not None:
+        metrics.record_request(
+            service, params['sites'], time.perf_counter() - start,
+            nbytes=response.raw.tell(), retries=response.retries, empty=count == 0
+        )
+
+
+def pick_midday_readings(readings) -> dict[str, str]:
+    """
+    Reduce (dateTime, value) readings to one value per local day, keeping only O(days) state.
+
+    The reading closest to local noon wins; days without a reading inside
+    the 10:00-14:00 window still get their closest reading.
+    """
+    best = {}
+    for dt, value in readings:
+        try:
+            timestamp = datetime.fromisoformat(dt)
+        except ValueError:
+            continue
+        date = timestamp.date().isoformat()
+        distance = abs(timestamp.hour * 60 + timestamp.minute - NOON_MINUTES)
+        current = best.get(date)
+        if current is None or distance < current[0]:
+            best[date] = (distance, value)
+
+    return {date: value for date, (_, value) in best.items()}
+
+
+def fetch_daily_values(client: PooledClient, station_id: str, start_date: str, end_date: str) -> dict[str, dict]:
+    """
+    Fetch daily discharge and gage height for a date window in one request.
+
+    Returns:
+        Dict of {date: {'discharge': str|None, 'gage_height': str|None}}
+    """
+    results = {}
+
+    params = {
+        'sites': station_id,
+        'startDT': start_date,
+        'endDT': end_date,
+        'parameterCd': SERVICE_PARAMETERS['dv'],
+        'format': 'json',
+    }
+    for var_code, dt, value in fetch_readings(client, 'dv', params):
+        day = results.setdefault(dt[:10], {'discharge': None, 'gage_height': None})
+        if var_code == PARAM_DISCHARGE:
+            day['discharge'] = value
+        elif var_code == PARAM_GAGE_HEIGHT:
+            day['gage_height'] = value
+
+    return results
+
+
+def fetch_midday_gage_heights(client: PooledClient, station_id: str, start_date: str, end_date: str) -> dict[str, str]:
+    """
+    Fetch instantaneous gage height for a date window and pick one reading per day.
+
+    Readings are streamed and reduced while decoding, so memory stays flat
+    however long the window is.
+
+    Returns:
+        Dict of {date: gage_height}
+    """
+    params = {
+        'sites': station_id,
+        'startDT': f'{start_date}T00:00-06:00',
+        'endDT': f'{end_date}T23:59-06:00',
+        'parameterCd': SERVICE_PARAMETERS['iv'],
+        'format': 'json',
+    }
+    readings = fetch_readings(client, 'iv', params)
+    return pick_midday_readings(
+        (dt, value) for var_code, dt, value in readings if var_code == PARAM_GAGE_HEIGHT
+    )
+
+
+def fetch_window(
+    client: PooledClient,
+    cache: ResponseCache,
+    service: str,
+    station_id: str,
+    start_date: str,
+    end_date: str
+) -> dict:
+    """Fetch one DV or IV window, going through the month-keyed response cache when one is given."""
+    fetch = fetch_daily_values if service == 'dv' else fetch_midday_gage_heights
+    if cache is None:
+        return fetch(client, station_id, start_date, end_date)
+    return cache.fetch_months(
+        station_id, SERVICE_PARAMETERS[service], service, start_date, end_date,
+        lambda start, end: fetch(client, station_id, start, end)
+    )
+
+
+def run_tasks(client: PooledClient, func, tasks: list) -> list:
+    """Run tasks on the client's pool, or serially when offline (no client)."""
+    if client is None:
+        return [func(task) for task in tasks]
+    return client.map(func, tasks)
+
+
+def fetch_water_data(
+    client: PooledClient,
+    plan: dict[str, list[tuple[str, str]]],
+    wanted_dates: dict[str, set[str]],
+    max_gap_days: int = DEFAULT_MAX_GAP_DAYS,
+    cache: ResponseCache = None,
+    metrics: RunMetrics = None
+) -> dict[str, dict[str, dict]]:
+    """
+    Fetch every planned window and join readings to the wanted dates.
+
+    Daily-value windows for all stations are fetched concurrently. Dates
+    still missing a gage height are then re-planned into windows and filled
+    from instantaneous values in a second concurrent pass.
+
+    Args:
+        client: Pooled USGS client (None to serve from an offline cache only)
+        plan: Dict of {station_id: [(start_date, end_date), ...]}
+        wanted_dates: Dict of {station_id: {date, ...}}
+        max_gap_days: Gap threshold used when re-planning the IV fallback
+        cache: Optional persistent response cache
+        metrics: Optional RunMetrics timing the fetch_dv and fetch_iv phases
+
+    Raises:
+        CacheMiss: When the cache is offline and a window is not cached
+
+    Returns:
+        Dict of {station_id: {date: {'discharge': str|None, 'gage_height': str|None}}}
+    """
+    results = {
+        station_id: {date: {'discharge': None, 'gage_height': None} for date in dates}
+        for station_id, dates in wanted_dates.items()
+    }
+
+    dv_tasks = [(station_id, start, end) for station_id, windows in plan.items() for start, end in windows]
+    with metrics.phase('fetch_dv') if metrics else nullcontext():
+        dv_results = run_tasks(client, lambda task: fetch_window(client, cache, 'dv', *task), dv_tasks)
+
+    for (station_id, start_date, end_date), daily in zip(dv_tasks, dv_results):
+        print(f"  DV {station_id} {start_date} → {end_date}")
+        if isinstance(daily, CacheMiss):
+            raise daily
+        if isinstance(daily, Exception):
+            print(f"  Error fetching daily values: {daily}")
+            continue
+        station_results = results[station_id]
+        for date, values in daily.items():
+            if date in station_results:
+                station_results[date].update({k: v for k, v in values.items() if v})
 
     # If no gage height from daily values, try instantaneous values (noon reading)
-    if not result['gage_height']:
+    iv_tasks = []
+    for station_id, station_results in results.items():
+        missing = [date for date, values in station_results.items() if not values['gage_height']]
+        iv_tasks.extend((station_id, start, end) for start, end in plan_fetch_windows(missing, max_gap_days))
+    with metrics.phase('fetch_iv') if metrics else nullcontext():
+        iv_results = run_tasks(client, lambda task: fetch_window(client, cache, 'iv', *task), iv_tasks)
+
+    for (station_id, start_date, end_date), gage_heights in zip(iv_tasks, iv_results):
+        print(f"  IV {station_id} {start_date} → {end_date}")
+        if isinstance(gage_heights, CacheMiss):
+            raise gage_heights
+        if isinstance(gage_heights, Exception):
+            print(f"  Error fetching instantaneous values: {gage_heights}")
+            continue
+        station_results = results[station_id]
+        for date, value in gage_heights.items():
+            if date in station_results and not station_results[date]['gage_height']:
+                station_results[date]['gage_height'] = value
+
+    return results
+
+
+def fetch_usgs_data(station_id: str, date: str, client: PooledClient = None) -> dict:
+    """Fetch daily values from USGS for a specific date."""
+    if client is None:
+        with PooledClient(USGS_BASE_URL, concurrency=1) as client:
+            return fetch_usgs_data(station_id, date, client)
+    return fetch_water_data(client, {station_id: [(date, date)]}, {station_id: {date}})[station_id][date]
+
+
+def parse_sample_data(content: str) -> list[ObjectLiteral]:
+    """Extract entry objects (with field offsets) from sampleData.ts content."""
+    return parse_export(content, 'sampleEntries')
+
+
+def extract_field(entry: ObjectLiteral, field: str) -> str:
+    """Extract a field value from a parsed entry."""
+    value = entry.get(field)
+    return value if isinstance(value, str) else ''
+
+
+def update_field(entry: ObjectLiteral, field: str, value: str) -> tuple[int, int, str] | None:
+    """Splice edit that sets a field's value, or None if the entry lacks the field."""
+    if field not in entry:
+        return None
+    return entry.edit(field, value)
+
+
+def get_station_for_stream(stream_name: str, river_stretch: str = '') -> str | None:
+    """
+    Determine which USGS station to use for a given stream.
+
+    Uses the station catalog in src/data/usgsStations.ts, preferring the
+    STATIONS defaults unless the river stretch names another station's
+    locality. Returns None for streams with no discharge station.
+    """
+    global _resolver
+    if _resolver is None:
+        _resolver = StationResolver.load(defaults=STATIONS)
+    return _resolver.resolve(stream_name, river_stretch)
+
+
+def select_entries(keys: list[tuple[str, str]], fields: list[tuple[str, str]], stale_days: int) -> list[int]:
+    """
+    Pick the entries an incremental run needs to (re)fetch.
+
+    An entry is selected when its flowRate or riverDepth is empty, or when
+    its date falls within the last stale_days days (provisional data).
+
+    Args:
+        keys: (date, streamName) per entry
+        fields: (flowRate, riverDepth) per entry
+        stale_days: Age in days below which populated values are refreshed
+
+    Returns:
+        Indices of the selected entries, in file order
+    """
+    cutoff = (Date.today() - timedelta(days=stale_days)).isoformat()
+    return [
+        i for i, ((date, _), (flow_rate, river_depth)) in enumerate(zip(keys, fields))
+        if not flow_rate or not river_depth or date >= cutoff
+    ]
+
+
+def load_changed_keys(path: str) -> set[tuple[str, str]]:
+    """
+    Read a parse_diary.py / ingest_diaries.py --changed-ids file.
+
+    sampleData.ts entries carry no diary id, so changed entries are matched
+    by (date, streamName); a multi-day entry covers every date in its range.
+
+    Returns:
+        Set of (date, streamName)
+    """
+    with open(path) as f:
+        changed = json.load(f)
+
+    keys = set()
+    for entry in changed:
         try:
-            url = 'https://waterservices.usgs.gov/nwis/iv/'
-            # Fetch the whole day and we'll pick a midday value
-            params = {
-                'sites': station_id,
-                'startDT': f'{date}T00:00-06:00',
-                'endDT': f'{date}T23:59-06:00',
-                'parameterCd': PARAM_GAGE_HEIGHT,
-                'format': 'json',
-            }
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            time_series = data.get('value', {}).get('timeSeries', [])
-            for series in time_series:
-                var_code = series.get('variable', {}).get('variableCode', [{}])[0].get('value', '')
-                values = series.get('values', [{}])[0].get('value', [])
-
-                if var_code == PARAM_GAGE_HEIGHT and values:
-                    # Pick a midday value (around noon) or first available
-                    midday_value = None
-                    for v in values:
-                        val = v.get('value')
-                        dt = v.get('dateTime', '')
-                        if val and val != '-999999':
-                            # Prefer readings around noon (10:00-14:00)
-                            if 'T10:' in dt or 'T11:' in dt or 'T12:' in dt or 'T13:' in dt or 'T14:' in dt:
-                                midday_value = val
-                                break
-                            elif not midday_value:
-                                midday_value = val
-                    if midday_value:
-                        result['gage_height'] = midday_value
-        except Exception as e:
-            print(f"  Error fetching instantaneous values: {e}")
-
-    return result
-
-
-def parse_sample_data(content: str) -> list:
-    """Extract entry objects from sampleData.ts content."""
-    # Find the array content between sampleEntries: FormData[] = [ and ];
-    match = re.search(r'export const sampleEntries:\s*FormData\[\]\s*=\s*\[(.*?)\];', content, re.DOTALL)
-    if not match:
-        raise ValueError("Could not find sampleEntries array in file")
-
-    array_content = match.group(1)
-
-    # Parse each entry object
-    entries = []
-    # Match each { ... } block
-    brace_depth = 0
-    current_entry = ""
-
-    for char in array_content:
-        if char == '{':
-            brace_depth += 1
-            current_entry += char
-        elif char == '}':
-            brace_depth -= 1
-            current_entry += char
-            if brace_depth == 0 and current_entry.strip():
-                entries.append(current_entry.strip())
-                current_entry = ""
-        elif brace_depth > 0:
-            current_entry += char
-
-    return entries
-
-
-def extract_field(entry: str, field: str) -> str:
-    """Extract a field value from an entry string."""
-    # Match field: 'value' or field: "value"
-    pattern = rf"{field}:\s*['\"]([^'\"]*)['\"]"
-    match = re.search(pattern, entry)
-    return match.group(1) if match else ""
-
-
-def update_field(entry: str, field: str, value: str) -> str:
-    """Update a field value in an entry string."""
-    pattern = rf"({field}:\s*)['\"][^'\"]*['\"]"
-    replacement = rf"\1'{value}'"
-    return re.sub(pattern, replacement, entry)
-
-
-def get_station_for_stream(stream_name: str) -> str:
-    """Determine which USGS station to use for a given stream."""
-    stream_lower = stream_name.lower()
-    if 'eleven point' in stream_lower:
-        return STATIONS['Eleven Point River']
-    else:
-        # Default to Spring River
-        return STATIONS['Spring River']
+            day = Date.fromisoformat(entry['date'])
+            end = Date.fromisoformat(entry.get('endDate') or entry['date'])
+        except (TypeError, ValueError):
+            continue
+        while day <= end:
+            keys.add((day.isoformat(), entry['streamName']))
+            day += timedelta(days=1)
+    return keys
+
+
+def load_checkpoint(path: Path, keys: list[tuple[str, str]]) -> dict[int, dict]:
+    """
+    Read committed results from a checkpoint journal.
+
+    Records only count once the batch's commit marker follows them, so a
+    batch cut short by a crash is fetched again. Records whose entry no
+    longer has the same date and stream are dropped.
+
+    Returns:
+        Dict of {entry_index: {'discharge': str|None, 'gage_height': str|None}}
+    """
+    committed = {}
+    pending = {}
+    if not path.exists():
+        return committed
+
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn write at the tail of the journal
+            if 'commit' in record:
+                committed.update(pending)
+                pending = {}
+                continue
+            i = record['index']
+            if i < len(keys) and list(keys[i]) == [record['date'], record['streamName']]:
+                pending[i] = {'discharge': record['discharge'], 'gage_height': record['gage_height']}
+
+    return committed
+
+
+def append_checkpoint(path: Path, batch_number: int, results: dict[int, dict], keys: list[tuple[str, str]]):
+    """Append one batch of results plus its commit marker and flush it to disk."""
+    with open(path, 'a') as f:
+        for i, values in sorted(results.items()):
+            date, stream = keys[i]
+            f.write(json.dumps({'index': i, 'date': date, 'streamName': stream, **values}) + '\n')
+        f.write(json.dumps({'commit': batch_number, 'through': max(results)}) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def fetch_batch(
+    client: PooledClient,
+    cache: ResponseCache,
+    batch: list[int],
+    keys: list[tuple[str, str]],
+    stations: list[str | None],
+    max_gap_days: int,
+    history=None,
+    accept_partial: bool = False,
+    metrics: RunMetrics = None
+) -> dict[int, dict]:
+    """
+    Plan, fetch and join one batch of entries. Returns {entry_index: values}.
+
+    With a water_history.HistoryStore, entries it fully answers (or partly,
+    when accept_partial is set) are served from it and never fetched.
+    """
+    results = {}
+    if history is not None:
+        with metrics.phase('history') if metrics else nullcontext():
+            for i in batch:
+                values = history.lookup(stations[i], keys[i][0])
+                if all(values.values()) or (accept_partial and any(values.values())):
+                    results[i] = values
+        batch = [i for i in batch if i not in results]
+
+    batch_keys = [(keys[i][0], stations[i]) for i in batch]
+    plan = plan_station_windows(batch_keys, max_gap_days)
+
+    wanted_dates = {}
+    for date, station_id in batch_keys:
+        if station_id is not None:
+            wanted_dates.setdefault(station_id, set()).add(date)
+
+    station_data = fetch_water_data(client, plan, wanted_dates, max_gap_days, cache, metrics)
+
+    empty = {'discharge': None, 'gage_height': None}
+    for i in batch:
+        results[i] = station_data.get(stations[i], {}).get(keys[i][0], empty)
+    return results
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description='Backfill USGS discharge and gage height into sampleData.ts'
+    )
+    parser.add_argument(
+        '--max-gap-days',
+        type=int,
+        default=DEFAULT_MAX_GAP_DAYS,
+        help=f'Merge entry dates closer than this into one request (default: {DEFAULT_MAX_GAP_DAYS})'
+    )
+    parser.add_argument(
+        '--concurrency', '-j',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Max USGS requests in flight (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE,
+        help=f'Max USGS requests per second (default: {DEFAULT_RATE})'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=USGS_BASE_URL,
+        help='USGS water services base URL (point at a local stand-in for testing)'
+    )
+    parser.add_argument(
+        '--cache',
+        default=str(CACHE_PATH),
+        help=f'SQLite response cache (default: {CACHE_PATH.relative_to(Path(__file__).parent.parent)})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always fetch from USGS and do not record responses'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Serve only from the response cache and fail on the first miss'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch entries whose flowRate/riverDepth are empty or stale'
+    )
+    parser.add_argument(
+        '--ids',
+        metavar='FILE',
+        help='Only fetch entries listed in a parse_diary.py --changed-ids file'
+    )
+    parser.add_argument(
+        '--stale-days',
+        type=int,
+        default=DEFAULT_STALE_DAYS,
+        help=f'With --incremental, also refresh entries newer than this (default: {DEFAULT_STALE_DAYS})'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Entries fetched and checkpointed per batch (default: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=str(CHECKPOINT_PATH),
+        help='Checkpoint journal written after every batch'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the last committed batch in the checkpoint journal'
+    )
+    parser.add_argument(
+        '--history',
+        help='Answer dates from a water_history.py store first (needs numpy)'
+    )
+    parser.add_argument(
+        '--metrics',
+        default=str(METRICS_PATH),
+        help='JSON run report: phase timings and per-station request stats'
+    )
+    parser.add_argument(
+        '--prometheus',
+        help='Also write the run report in Prometheus text format to this file'
+    )
+    args = parser.parse_args()
+
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the response cache')
+
     print("=" * 60)
     print("USGS Water Data Backfill Script")
     print("=" * 60)
 
+    metrics = RunMetrics()
+
     # Read original file
     print(f"\nReading {SAMPLE_DATA_PATH}...")
     content = SAMPLE_DATA_PATH.read_text()
@@ -174,75 +659,143 @@ def main():
     shutil.copy(SAMPLE_DATA_PATH, backup_path)
 
     # Parse entries
-    entries = parse_sample_data(content)
+    with metrics.phase('parse'):
+        entries = parse_sample_data(content)
     print(f"Found {len(entries)} entries to process\n")
 
-    updated_count = 0
-    no_data_count = 0
-
-    updated_entries = []
-
-    for i, entry in enumerate(entries):
-        date = extract_field(entry, 'date')
-        stream = extract_field(entry, 'streamName')
-
-        print(f"[{i+1}/{len(entries)}] {date} - {stream}")
-
-        station_id = get_station_for_stream(stream)
-
-        # Fetch USGS data
-        usgs_data = fetch_usgs_data(station_id, date)
-
-        updated_entry = entry
-        entry_updated = False
-
-        if usgs_data['discharge']:
-            updated_entry = update_field(updated_entry, 'flowRate', usgs_data['discharge'])
-            print(f"  Discharge: {usgs_data['discharge']} cfs")
-            entry_updated = True
-        else:
-            print(f"  Discharge: No data available")
+    with metrics.phase('resolve'):
+        keys = [(extract_field(entry, 'date'), extract_field(entry, 'streamName')) for entry in entries]
+        stations = [
+            get_station_for_stream(stream, extract_field(entry, 'riverStretch'))
+            for entry, (_, stream) in zip(entries, keys)
+        ]
+    unresolved = sorted({stream for (_, stream), station_id in zip(keys, stations) if station_id is None})
+    if unresolved:
+        print(f"No USGS discharge station for: {', '.join(unresolved)}")
+
+    if args.incremental:
+        fields = [(extract_field(entry, 'flowRate'), extract_field(entry, 'riverDepth')) for entry in entries]
+        selected = select_entries(keys, fields, args.stale_days)
+        print(f"Incremental: {len(selected)} entries with empty or stale water fields")
+    else:
+        selected = list(range(len(entries)))
+
+    if args.ids:
+        changed_keys = load_changed_keys(args.ids)
+        selected = [i for i in selected if keys[i] in changed_keys]
+        print(f"--ids: {len(selected)} entries changed in {args.ids}")
+
+    if not selected:
+        print("\nNothing to backfill.")
+        return
+
+    checkpoint_path = Path(args.checkpoint)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    if args.resume:
+        committed = load_checkpoint(checkpoint_path, keys)
+        print(f"Resuming: {len(committed)} entries already committed in {checkpoint_path}")
+    else:
+        committed = {}
+        checkpoint_path.write_text('')
 
-        if usgs_data['gage_height']:
-            updated_entry = update_field(updated_entry, 'riverDepth', usgs_data['gage_height'])
-            print(f"  Gage Height: {usgs_data['gage_height']} ft")
-            entry_updated = True
-        else:
-            print(f"  Gage Height: No data available")
+    pending = [i for i in selected if i not in committed]
+    batches = [pending[n:n + args.batch_size] for n in range(0, len(pending), args.batch_size)]
+    print(f"Fetching {len(pending)} entries in {len(batches)} batches\n")
 
-        if entry_updated:
-            updated_count += 1
-        else:
-            no_data_count += 1
+    cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    history = None
+    if args.history:
+        from water_history import HistoryStore
+        history = HistoryStore(args.history)
 
-        updated_entries.append(updated_entry)
+    client = None if args.offline else PooledClient(
+        args.base_url, concurrency=args.concurrency, rate=args.rate, metrics=metrics
+    )
+    try:
+        for batch_number, batch in enumerate(batches, 1):
+            print(f"Batch {batch_number}/{len(batches)}: entries {batch[0]+1}-{batch[-1]+1}")
+            results = fetch_batch(
+                client, cache, batch, keys, stations, args.max_gap_days,
+                history=history, accept_partial=args.offline, metrics=metrics
+            )
+            with metrics.phase('checkpoint'):
+                append_checkpoint(checkpoint_path, batch_number, results, keys)
+            committed.update(results)
+    except CacheMiss as e:
+        print(f"\n❌ Offline cache miss: {e}")
+        print(f"Committed progress kept in {checkpoint_path}; rerun with --resume")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Committed progress kept in {checkpoint_path}; rerun with --resume")
+        sys.exit(130)
+    finally:
+        if client is not None:
+            client.close()
+        if cache is not None:
+            cache.close()
+
+    if cache is not None:
+        print(f"\nResponse cache: {cache.hits} hits, {cache.misses} misses")
+        for service, counts in cache.stats.items():
+            metrics.record_cache(service, counts['hits'], counts['misses'])
 
-        # Rate limiting
-        time.sleep(0.5)
+    updated_count = 0
+    no_data_count = 0
 
-    # Rebuild the file content
+    edits = []
+
+    print()
+    with metrics.phase('join'):
+        for i in selected:
+            date, stream = keys[i]
+            print(f"[{i+1}/{len(entries)}] {date} - {stream}")
+
+            usgs_data = committed[i]
+            entry_updated = False
+
+            if usgs_data['discharge']:
+                edits.append(update_field(entries[i], 'flowRate', usgs_data['discharge']))
+                print(f"  Discharge: {usgs_data['discharge']} cfs")
+                entry_updated = True
+            else:
+                print(f"  Discharge: No data available")
+
+            if usgs_data['gage_height']:
+                edits.append(update_field(entries[i], 'riverDepth', usgs_data['gage_height']))
+                print(f"  Gage Height: {usgs_data['gage_height']} ft")
+                entry_updated = True
+            else:
+                print(f"  Gage Height: No data available")
+
+            if entry_updated:
+                updated_count += 1
+            else:
+                no_data_count += 1
+
+    # Splice the new values into the original text in one pass
     print("\nWriting updated data...")
+    with metrics.phase('write'):
+        new_content = splice(content, [edit for edit in edits if edit is not None])
+        SAMPLE_DATA_PATH.write_text(new_content)
+    checkpoint_path.unlink()
 
-    # Find the original array and replace it
-    new_array_content = ',\n'.join(updated_entries)
-    new_content = re.sub(
-        r'(export const sampleEntries:\s*FormData\[\]\s*=\s*\[).*?(\];)',
-        rf'\1\n{new_array_content}\n\2',
-        content,
-        flags=re.DOTALL
-    )
-
-    SAMPLE_DATA_PATH.write_text(new_content)
+    metrics.write_json(args.metrics)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus, prefix='water_backfill')
 
     # Summary
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print(f"Total entries processed: {len(entries)}")
+    print(f"Total entries processed: {len(selected)} of {len(entries)}")
     print(f"Entries updated with USGS data: {updated_count}")
     print(f"Entries with no USGS data: {no_data_count}")
     print(f"\nBackup saved to: {backup_path}")
     print(f"Updated file: {SAMPLE_DATA_PATH}")
+    print(f"Run report: {args.metrics}")
+
+    phases = metrics.summary()['phases_seconds']
+    print("Phases: " + ', '.join(f"{name} {seconds:.2f}s" for name, seconds in phases.items()))
     print("\nDone!")
 
 
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Backfill historical weather for fishing journal entries from the Open-Meteo archive.
+
+Implements docs/plans/2025-12-03-weather-backfill-design.md as a script:
+entries are grouped by location and their dates merged into a few
+start_date/end_date archive requests, unit conversions and moon phases are
+computed for whole windows at once with NumPy, and only empty fields are
+filled in sampleData.ts (--overwrite also replaces existing values that
+differ from the archive).
+
+Fields: airTempHigh, airTempLow, barometricPressure, precipitation,
+windVelocity, windDirection, moonPhase
+
+Usage:
+    python scripts/backfill_weather_data.py
+    python scripts/backfill_weather_data.py --overwrite
+    python scripts/backfill_weather_data.py --offline
+    python scripts/backfill_weather_data.py --ids changed.json   # only entries parse_diary.py re-parsed
+    python scripts/backfill_weather_data.py --base-url http://127.0.0.1:8000/v1/
+"""
+
+import argparse
+import shutil
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from backfill_water_data import (
+    SAMPLE_DATA_PATH,
+    extract_field,
+    load_changed_keys,
+    parse_sample_data,
+    plan_fetch_windows,
+    run_tasks,
+)
+from http_pool import PooledClient
+from response_cache import CacheMiss, ResponseCache
+from ts_literal import splice
+
+ARCHIVE_BASE_URL = 'https://archive-api.open-meteo.com/v1/'
+CACHE_PATH = Path(__file__).parent / '.cache' / 'weather_responses.sqlite3'
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 4.0  # requests per second
+# The archive API is cheap per day, so bridge wider gaps than the USGS planner
+DEFAULT_MAX_GAP_DAYS = 60
+
+# (latitude, longitude) per stream; anything else uses DEFAULT_LOCATION
+LOCATIONS = {
+    'Spring River': (36.3, -91.5),         # Hardy, AR
+    'Eleven Point River': (36.3, -91.1),   # Ravenden Springs, AR
+}
+DEFAULT_LOCATION = LOCATIONS['Spring River']
+
+DAILY_VARIABLES = [
+    'temperature_2m_max',
+    'temperature_2m_min',
+    'precipitation_sum',
+    'surface_pressure_mean',
+    'wind_speed_10m_max',
+    'wind_direction_10m_dominant',
+]
+
+HPA_TO_INHG = 0.02953
+CARDINALS = np.array(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW'])
+
+# Synodic month from a reference new moon (2000-01-06)
+SYNODIC_MONTH = 29.53059
+REFERENCE_NEW_MOON = date(2000, 1, 6).toordinal()
+MOON_PHASE_EDGES = np.array([1.85, 7.38, 9.23, 14.77, 16.61, 22.15, 24.00])
+MOON_PHASES = np.array([
+    'New Moon', 'Waxing Crescent', 'First Quarter', 'Waxing Gibbous',
+    'Full Moon', 'Waning Gibbous', 'Last Quarter', 'Waning Crescent',
+])
+
+WEATHER_FIELDS = [
+    'airTempHigh', 'airTempLow', 'barometricPressure', 'precipitation',
+    'windVelocity', 'windDirection', 'moonPhase',
+]
+
+
+def location_for_stream(stream_name: str) -> tuple[float, float]:
+    return LOCATIONS.get(stream_name, DEFAULT_LOCATION)
+
+
+def fetch_archive(client: PooledClient, location: tuple[float, float], start_date: str, end_date: str) -> dict:
+    """
+    Fetch daily weather for one location and date window.
+
+    Returns:
+        The response's 'daily' block: {'time': [...], variable: [...], ...}
+    """
+    latitude, longitude = location
+    params = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'start_date': start_date,
+        'end_date': end_date,
+        'daily': ','.join(DAILY_VARIABLES),
+        'temperature_unit': 'fahrenheit',
+        'precipitation_unit': 'inch',
+        'wind_speed_unit': 'mph',
+        'timezone': 'America/Chicago',
+    }
+    return client.get_json('archive', params).get('daily', {})
+
+
+def daily_rows(daily: dict) -> dict[str, dict]:
+    """Split an archive 'daily' block into {date: {variable: value}} rows (the cached form)."""
+    return {
+        day: {name: (daily.get(name) or [None] * len(daily['time']))[i] for name in DAILY_VARIABLES}
+        for i, day in enumerate(daily.get('time', []))
+    }
+
+
+def daily_block(rows: dict[str, dict]) -> dict:
+    """Reassemble daily_rows() output into a 'daily' block."""
+    days = sorted(rows)
+    return {'time': days, **{name: [rows[day][name] for day in days] for name in DAILY_VARIABLES}}
+
+
+def format_column(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Round a float column and render it as strings, '' where missing."""
+    text = np.char.mod(f'%.{decimals}f', np.nan_to_num(np.round(values, decimals)))
+    return np.where(np.isnan(values), '', text)
+
+
+def moon_phases(days: list[str]) -> np.ndarray:
+    """Moon phase names for ISO dates, from the synodic-month formula."""
+    ordinals = np.array([date.fromisoformat(day).toordinal() for day in days], dtype=float)
+    age = np.mod(ordinals - REFERENCE_NEW_MOON, SYNODIC_MONTH)
+    return MOON_PHASES[np.searchsorted(MOON_PHASE_EDGES, age, side='right')]
+
+
+def convert_daily(daily: dict) -> dict[str, dict[str, str]]:
+    """
+    Convert an archive 'daily' block into journal field strings for every day at once.
+
+    Returns:
+        Dict of {date: {field: value}}
+    """
+    days = daily.get('time', [])
+    if not days:
+        return {}
+
+    def column(name: str) -> np.ndarray:
+        values = daily.get(name) or [None] * len(days)
+        return np.array(values, dtype=float)
+
+    direction = column('wind_direction_10m_dominant')
+    cardinal = CARDINALS[np.mod(np.round(np.nan_to_num(direction) / 45).astype(int), 8)]
+
+    fields = {
+        'airTempHigh': format_column(column('temperature_2m_max'), 0),
+        'airTempLow': format_column(column('temperature_2m_min'), 0),
+        'barometricPressure': format_column(column('surface_pressure_mean') * HPA_TO_INHG, 2),
+        'precipitation': format_column(column('precipitation_sum'), 2),
+        'windVelocity': format_column(column('wind_speed_10m_max'), 0),
+        'windDirection': np.where(np.isnan(direction), '', cardinal),
+        'moonPhase': moon_phases(days),
+    }
+    return {
+        day: {field: str(values[i]) for field, values in fields.items()}
+        for i, day in enumerate(days)
+    }
+
+
+def fetch_weather(
+    client: PooledClient,
+    cache: ResponseCache,
+    plan: dict[tuple[float, float], list[tuple[str, str]]]
+) -> dict[tuple[float, float], dict[str, dict[str, str]]]:
+    """
+    Fetch every planned window and convert it.
+
+    Raises:
+        CacheMiss: When the cache is offline and a window is not cached
+
+    Returns:
+        Dict of {location: {date: {field: value}}}
+    """
+    tasks = [(location, start, end) for location, windows in plan.items() for start, end in windows]
+
+    def fetch(task):
+        location, start_date, end_date = task
+        if cache is None:
+            return fetch_archive(client, location, start_date, end_date)
+        rows = cache.fetch_months(
+            f'{location[0]},{location[1]}', ','.join(DAILY_VARIABLES), 'archive', start_date, end_date,
+            lambda start, end: daily_rows(fetch_archive(client, location, start, end))
+        )
+        return daily_block(rows)
+
+    results = {location: {} for location in plan}
+    for (location, start_date, end_date), daily in zip(tasks, run_tasks(client, fetch, tasks)):
+        print(f"  Archive {location} {start_date} → {end_date}")
+        if isinstance(daily, CacheMiss):
+            raise daily
+        if isinstance(daily, Exception):
+            print(f"  Error fetching weather: {daily}")
+            continue
+        results[location].update(convert_daily(daily))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Backfill Open-Meteo historical weather into sampleData.ts'
+    )
+    parser.add_argument(
+        '--max-gap-days',
+        type=int,
+        default=DEFAULT_MAX_GAP_DAYS,
+        help=f'Merge entry dates closer than this into one request (default: {DEFAULT_MAX_GAP_DAYS})'
+    )
+    parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='Replace existing weather values with archive values (default: only fill empty fields)'
+    )
+    parser.add_argument(
+        '--ids',
+        metavar='FILE',
+        help='Only backfill entries listed in a parse_diary.py --changed-ids file'
+    )
+    parser.add_argument(
+        '--concurrency', '-j',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Max archive requests in flight (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE,
+        help=f'Max archive requests per second (default: {DEFAULT_RATE})'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=ARCHIVE_BASE_URL,
+        help='Open-Meteo archive base URL (point at a local fixture server for testing)'
+    )
+    parser.add_argument(
+        '--cache',
+        default=str(CACHE_PATH),
+        help='SQLite response cache'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always fetch and do not record responses'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Serve only from the response cache and fail on the first miss'
+    )
+    args = parser.parse_args()
+
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the response cache')
+
+    print("=" * 60)
+    print("Open-Meteo Weather Backfill Script")
+    print("=" * 60)
+
+    print(f"\nReading {SAMPLE_DATA_PATH}...")
+    content = SAMPLE_DATA_PATH.read_text()
+    entries = parse_sample_data(content)
+    print(f"Found {len(entries)} entries")
+
+    if args.ids:
+        changed_keys = load_changed_keys(args.ids)
+        entries = [
+            entry for entry in entries
+            if (extract_field(entry, 'date'), extract_field(entry, 'streamName')) in changed_keys
+        ]
+        print(f"--ids: {len(entries)} entries changed in {args.ids}")
+
+    keys = [(extract_field(entry, 'date'), location_for_stream(extract_field(entry, 'streamName'))) for entry in entries]
+
+    dates_by_location = {}
+    for entry_date, location in keys:
+        dates_by_location.setdefault(location, set()).add(entry_date)
+    plan = {
+        location: plan_fetch_windows(dates, args.max_gap_days)
+        for location, dates in dates_by_location.items()
+    }
+    request_count = sum(len(windows) for windows in plan.values())
+    print(f"Planned {request_count} archive requests across {len(plan)} locations\n")
+
+    cache = None if args.no_cache else ResponseCache(args.cache, offline=args.offline)
+    try:
+        if args.offline:
+            weather = fetch_weather(None, cache, plan)
+        else:
+            with PooledClient(args.base_url, concurrency=args.concurrency, rate=args.rate) as client:
+                weather = fetch_weather(client, cache, plan)
+    except CacheMiss as e:
+        print(f"\n❌ Offline cache miss: {e}")
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    edits = []
+    updated_count = 0
+    no_data_count = 0
+
+    print()
+    for i, (entry, (entry_date, location)) in enumerate(zip(entries, keys)):
+        values = weather.get(location, {}).get(entry_date)
+        if not values:
+            print(f"[{i+1}/{len(entries)}] {entry_date}: No weather data available")
+            no_data_count += 1
+            continue
+
+        changed = []
+        for field in WEATHER_FIELDS:
+            new_value = values[field]
+            current = extract_field(entry, field)
+            if field not in entry or not new_value or new_value == current:
+                continue
+            if current and not args.overwrite:
+                continue
+            edits.append(entry.edit(field, new_value))
+            changed.append(f"{field}={new_value}")
+
+        if changed:
+            updated_count += 1
+            print(f"[{i+1}/{len(entries)}] {entry_date}: {', '.join(changed)}")
+
+    if not edits:
+        print("\nNothing to update.")
+        return
+
+    backup_path = SAMPLE_DATA_PATH.with_suffix('.ts.backup')
+    print(f"\nCreating backup at {backup_path}...")
+    shutil.copy(SAMPLE_DATA_PATH, backup_path)
+
+    print("Writing updated data...")
+    SAMPLE_DATA_PATH.write_text(splice(content, edits))
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"Total entries: {len(entries)}")
+    print(f"Entries with changed weather fields: {updated_count}")
+    print(f"Entries with no weather data: {no_data_count}")
+    print(f"Archive requests: {request_count}")
+    print("\nDone!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Content-hash build manifest for the image optimizers.
+
+Each output directory holds one .build-manifest.json with a section per
+tool (optimize_images, optimize_icons, optimize_with_bg_removal). A
+section maps every source to the sha256 of its bytes, a digest of the
+settings it was built with (sizes, quality, method, model, ...), the
+output files it produced, and optionally the per-source parameters a tool
+chose while building it (e.g. tuned encoder settings), so a rebuild of the
+same bytes can reuse them. A source whose hash and settings are unchanged
+and whose outputs all exist is skipped. Outputs of sources that are gone,
+and outputs a rebuilt source no longer produces, are deleted, unless
+another tool's section still lists them.
+
+Usage:
+    manifest = BuildManifest(output_dir, 'optimize_images', settings)
+    digest = file_digest(source)
+    if not manifest.is_current(source.name, digest):
+        outputs = build(source)
+        manifest.record(source.name, digest, outputs)
+    manifest.prune(current_source_names)
+    manifest.save()
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = '.build-manifest.json'
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path) -> str:
+    """sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_digest(settings: dict) -> str:
+    """Stable digest of JSON-serializable build settings."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class BuildManifest:
+    """
+    One tool's record of what it built in an output directory.
+
+    Args:
+        output_dir: Directory the tool writes into (and where the manifest lives)
+        tool: Section name, so tools sharing a directory keep separate records
+        settings: Effective build settings; changing any of them rebuilds every source
+    """
+
+    def __init__(self, output_dir, tool: str, settings: dict):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.tool = tool
+        self.settings = settings_digest(settings)
+
+        self._data = {'version': MANIFEST_VERSION, 'tools': {}}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except ValueError:
+                data = {}
+            if data.get('version') == MANIFEST_VERSION:
+                self._data = data
+        self.sources = self._data['tools'].setdefault(tool, {})
+
+    def _relative(self, output) -> str:
+        return Path(output).resolve().relative_to(self.output_dir.resolve()).as_posix()
+
+    def is_current(self, source: str, digest: str) -> bool:
+        """Whether source was built from these bytes, with these settings, and its outputs still exist."""
+        entry = self.sources.get(source)
+        return (
+            entry is not None
+            and entry['hash'] == digest
+            and entry['settings'] == self.settings
+            and all((self.output_dir / output).exists() for output in entry['outputs'])
+        )
+
+    def params(self, source: str, digest: str) -> dict | None:
+        """Parameters recorded for source if it was built from these bytes with these settings."""
+        entry = self.sources.get(source)
+        if entry is None or entry['hash'] != digest or entry['settings'] != self.settings:
+            return None
+        return entry.get('params')
+
+    def record(self, source: str, digest: str, outputs: list, params: dict | None = None) -> list[Path]:
+        """
+        Remember what source was built into; delete outputs it produced before but not now.
+
+        Args:
+            params: JSON-serializable parameters chosen for this source, returned
+                by params() until its bytes or the settings change
+
+        Returns:
+            Deleted output paths
+        """
+        outputs = sorted({self._relative(output) for output in outputs})
+        previous = self.sources.get(source, {}).get('outputs', [])
+        self.sources[source] = {'hash': digest, 'settings': self.settings, 'outputs': outputs}
+        if params is not None:
+            self.sources[source]['params'] = params
+        return self._delete(set(previous) - set(outputs))
+
+    def prune(self, sources) -> list[Path]:
+        """
+        Forget sources not in `sources` and delete their outputs.
+
+        Returns:
+            Deleted output paths
+        """
+        sources = set(sources)
+        gone = [source for source in self.sources if source not in sources]
+        orphaned = set()
+        for source in gone:
+            orphaned.update(self.sources.pop(source)['outputs'])
+        return self._delete(orphaned)
+
+    def all_outputs(self) -> dict[str, list[str]]:
+        """Outputs of every tool's sources in this directory (relative paths), by source name."""
+        outputs = {}
+        for entries in self._data['tools'].values():
+            for source, entry in entries.items():
+                outputs.setdefault(source, set()).update(entry['outputs'])
+        return {source: sorted(paths) for source, paths in sorted(outputs.items())}
+
+    def _delete(self, outputs: set[str]) -> list[Path]:
+        claimed = {
+            output
+            for entries in self._data['tools'].values()
+            for entry in entries.values()
+            for output in entry['outputs']
+        }
+        deleted = []
+        for output in sorted(outputs - claimed):
+            path = self.output_dir / output
+            if path.exists():
+                path.unlink()
+                deleted.append(path)
+        return deleted
+
+    def save(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(json.dumps(self._data, indent=2, sort_keys=True) + '\n')
+        os.replace(tmp, self.path)
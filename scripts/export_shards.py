@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Export the journal entries in src/data/sampleData.ts as lazily loadable JSON shards.
+
+Writes into public/data/journal/ (served at /data/journal/):
+    manifest.json                  shard list with content hashes (fetched first)
+    summary.<hash>.json            one small row per entry - key, shard, the fields
+                                   the entry list shows and a notes excerpt
+    entries-<shard>.<hash>.json    full entries, voiced notes included, per year
+                                   (or per --per-shard entries)
+
+Shard file names carry the first 12 hex digits of their sha256, so they can be
+cached forever and an unchanged shard keeps its name (and is not rewritten)
+across exports. The app starts from the summary and fetches a shard only when
+an entry's notes are opened. Entry keys match the journal search index
+(journal:<date>:<stream>:<stretch>).
+
+Usage:
+    python scripts/export_shards.py                   # one shard per year
+    python scripts/export_shards.py --per-shard 50    # fixed-size shards
+    python scripts/export_shards.py --output dist/data/journal
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from journal_index import unique_key
+from ts_literal import parse_export, to_python
+
+ROOT = Path(__file__).parent.parent
+SAMPLE_DATA_PATH = ROOT / 'src' / 'data' / 'sampleData.ts'
+OUTPUT_DIR = ROOT / 'public' / 'data' / 'journal'
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 2
+HASH_LENGTH = 12
+SHARD_PREFIXES = ('entries-', 'summary.')
+
+# Fields copied into the summary shard (what the entry list and stats show)
+SUMMARY_FIELDS = {
+    'date': 'date',
+    'stream': 'streamName',
+    'stretch': 'riverStretch',
+    'species': 'fishSpecies',
+    'count': 'numberCaught',
+    'bait': 'baitUsed',
+    'weather': 'weatherConditions',
+    'windSpeed': 'windVelocity',
+    'windDirection': 'windDirection',
+    'flow': 'flowRate',
+    'waterTemp': 'waterTemperature',
+    'clarity': 'waterClarity',
+}
+# Characters of notes kept in the summary for list previews
+EXCERPT_LENGTH = 150
+
+
+def load_entries(path: Path) -> list[dict]:
+    """sampleEntries as plain dicts, each with its stable key, sorted by date."""
+    entries = []
+    seen = {}
+    for literal in parse_export(path.read_text(), 'sampleEntries'):
+        entry = to_python(literal)
+        key = f"journal:{entry.get('date', '')}:{entry.get('streamName', '')}:{entry.get('riverStretch', '')}"
+        entries.append({'key': unique_key(seen, key), **entry})
+    entries.sort(key=lambda entry: entry.get('date', ''))
+    return entries
+
+
+def shard_entries(entries: list[dict], per_shard: int = 0) -> dict[str, list[dict]]:
+    """Group entries by year, or into consecutive shards of per_shard entries."""
+    shards = {}
+    for i, entry in enumerate(entries):
+        if per_shard:
+            name = f'{i // per_shard:04d}'
+        else:
+            name = entry.get('date', '')[:4] or 'undated'
+        shards.setdefault(name, []).append(entry)
+    return shards
+
+
+def encode_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_hashed(output_dir: Path, stem: str, data) -> dict:
+    """
+    Write data as <stem>.<hash>.json unless that exact file already exists.
+
+    Returns:
+        Manifest record: {"file", "hash", "bytes"}
+    """
+    body = encode_json(data)
+    digest = hashlib.sha256(body).hexdigest()
+    name = f'{stem}.{digest[:HASH_LENGTH]}.json'
+    path = output_dir / name
+    if not path.exists():
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+    return {'file': name, 'hash': f'sha256-{digest}', 'bytes': len(body)}
+
+
+def export(entries: list[dict], output_dir: Path, per_shard: int = 0) -> dict:
+    """
+    Write the shards, the summary and then the manifest; remove shards no manifest lists.
+
+    Returns:
+        The manifest
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = []
+    summary = []
+    for name, shard in shard_entries(entries, per_shard).items():
+        record = write_hashed(output_dir, f'entries-{name}', shard)
+        shards.append({
+            'name': name,
+            **record,
+            'entries': len(shard),
+            'firstDate': shard[0].get('date', ''),
+            'lastDate': shard[-1].get('date', ''),
+        })
+        for entry in shard:
+            row = {'key': entry['key']}
+            row.update({field: entry.get(source, '') for field, source in SUMMARY_FIELDS.items()})
+            row['excerpt'] = (entry.get('notes') or '')[:EXCERPT_LENGTH]
+            row['shard'] = name
+            summary.append(row)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'entries': len(entries),
+        'summary': write_hashed(output_dir, 'summary', summary),
+        'shards': shards,
+    }
+    tmp = output_dir / (MANIFEST_NAME + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2) + '\n')
+    os.replace(tmp, output_dir / MANIFEST_NAME)
+
+    # Stale shards from earlier exports (the manifest no longer points at them)
+    current = {manifest['summary']['file'], *(shard['file'] for shard in shards)}
+    for path in output_dir.glob('*.json'):
+        if path.name.startswith(SHARD_PREFIXES) and path.name not in current:
+            path.unlink()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export journal entries as lazily loadable JSON shards')
+    parser.add_argument('--input', type=Path, default=SAMPLE_DATA_PATH, help='sampleData.ts to export')
+    parser.add_argument('--output', type=Path, default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR.relative_to(ROOT)})')
+    parser.add_argument('--per-shard', type=int, default=0, help='Entries per shard instead of one shard per year')
+    args = parser.parse_args()
+
+    entries = load_entries(args.input)
+    manifest = export(entries, args.output, args.per_shard)
+
+    shard_bytes = sum(shard['bytes'] for shard in manifest['shards'])
+    print(f"✨ Exported {manifest['entries']} entries into {len(manifest['shards'])} shards "
+          f"({shard_bytes / 1024:.1f} KB) and a {manifest['summary']['bytes'] / 1024:.1f} KB summary")
+    print(f"   {args.output / MANIFEST_NAME}")
+
+
+if __name__ == '__main__':
+    main()
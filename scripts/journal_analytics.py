@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Vectorized catch analytics over the journal entries in src/data/sampleData.ts.
+
+Entries are loaded once into typed NumPy columns: float32 values plus a
+validity mask for the numeric fields (stored as strings in the TS source),
+integer category codes for stream, water clarity and wind direction, and
+exploded (row, code) pairs for the multi-valued species and lure lists.
+Every group-by is then a handful of bincount calls with no Python loop per
+entry, so it recomputes in milliseconds on hundreds of thousands of entries.
+
+List items are grouped case- and plural-insensitively ("Shad Raps" and
+"shad rap" are one lure). Entries record one catch count per trip, so the
+species and lure reports give the whole catch of the trips that included
+each one, not the fish of that species.
+
+Usage:
+    python scripts/journal_analytics.py                     # every report
+    python scripts/journal_analytics.py species-year
+    python scripts/journal_analytics.py flow --flow-bands 0,400,800,1600
+    python scripts/journal_analytics.py all --tile 10000    # time on 10,000x the entries
+"""
+
+import argparse
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from ts_literal import parse_export
+
+SAMPLE_DATA_PATH = Path(__file__).parent.parent / 'src' / 'data' / 'sampleData.ts'
+
+NUMERIC_FIELDS = [
+    'numberCaught', 'flowRate', 'riverDepth', 'windVelocity', 'waterTemperature',
+    'airTempHigh', 'airTempLow', 'barometricPressure', 'precipitation',
+]
+CATEGORY_FIELDS = {
+    'stream': 'streamName',
+    'clarity': 'waterClarity',
+    'wind_direction': 'windDirection',
+}
+# Comma-separated lists, exploded into one (row, code) pair per item
+MULTI_FIELDS = {
+    'species': 'fishSpecies',
+    'lure': 'baitUsed',
+}
+
+DEFAULT_FLOW_BANDS = [0, 300, 600, 1000, 2000]  # cfs band edges
+WIND_DIRECTIONS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+
+NUMBER = re.compile(r'^\s*-?(?:\d+(?:\.\d*)?|\.\d+)\s*$')
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+LIST_SEPARATOR = re.compile(r'\s*,\s*')
+
+
+class NumericColumn(NamedTuple):
+    values: np.ndarray   # float32, NaN where missing
+    valid: np.ndarray    # bool
+
+
+class CategoryColumn(NamedTuple):
+    codes: np.ndarray    # int32 index into labels, -1 where missing
+    labels: np.ndarray
+
+
+class MultiCategoryColumn(NamedTuple):
+    rows: np.ndarray     # int32 entry row of each item
+    codes: np.ndarray    # int32 index into labels
+    labels: np.ndarray
+
+
+class Grouped(NamedTuple):
+    keys: list           # group label, or tuple of labels for multi-key group-bys
+    trips: np.ndarray    # trips in the group with a known catch
+    caught: np.ndarray   # fish caught on those trips (all species)
+    per_trip: np.ndarray
+
+
+def numeric_column(raw: list[str]) -> NumericColumn:
+    """Parse numeric strings ('402', '3.01', '') into float32 with a validity mask."""
+    valid = np.fromiter((bool(NUMBER.match(s)) for s in raw), dtype=bool, count=len(raw))
+    values = np.full(len(raw), np.nan, dtype=np.float32)
+    if valid.any():
+        values[valid] = np.array(raw, dtype=object)[valid].astype(np.float32)
+    return NumericColumn(values, valid)
+
+
+def category_column(raw: list[str], labels: list[str] = None) -> CategoryColumn:
+    """Encode strings as category codes; '' (or a label not in a fixed vocabulary) is -1."""
+    array = np.array(raw, dtype=object)
+    present = array != ''
+    if labels is None:
+        label_array, codes = np.unique(array[present].astype(str), return_inverse=True)
+    else:
+        label_array = np.array(labels)
+        lookup = {label: i for i, label in enumerate(labels)}
+        codes = np.fromiter((lookup.get(s, -1) for s in array[present]), dtype=np.int32)
+    full = np.full(len(raw), -1, dtype=np.int32)
+    full[present] = codes
+    return CategoryColumn(full, label_array)
+
+
+def day_column(raw: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Days since 1970-01-01 for 'YYYY-MM-DD' strings.
+
+    Returns:
+        (int32 days, -1 where missing or not a valid ISO date; bool validity mask)
+    """
+    unique, inverse = np.unique(np.array(raw, dtype=str), return_inverse=True)
+    days = np.full(len(unique), -1, dtype=np.int32)
+    valid = np.zeros(len(unique), dtype=bool)
+    for i, value in enumerate(unique):
+        if ISO_DATE.match(value):
+            try:
+                days[i] = np.datetime64(value, 'D').astype(np.int32)
+                valid[i] = True
+            except ValueError:     # '2011-02-30'
+                pass
+    return days[inverse], valid[inverse]
+
+
+def label_key(item: str) -> str:
+    """Grouping key for a list item: case-folded, single-spaced, plain '-s' plural dropped."""
+    key = ' '.join(item.casefold().split())
+    if len(key) > 3 and key.endswith('s') and not key.endswith('ss'):
+        key = key[:-1]
+    return key
+
+
+def multi_category_column(raw: list[str]) -> MultiCategoryColumn:
+    """
+    Explode comma-separated lists into (row, code) pairs.
+
+    Items with the same label_key share a code (once per row) and are
+    labelled by their commonest spelling.
+    """
+    rows = []
+    keys = []
+    spellings = Counter()
+    for row, value in enumerate(raw):
+        seen = set()
+        for item in LIST_SEPARATOR.split(value.strip()):
+            key = label_key(item)
+            if item and key not in seen:
+                seen.add(key)
+                rows.append(row)
+                keys.append(key)
+                spellings[key, ' '.join(item.split())] += 1
+    unique, codes = np.unique(np.array(keys, dtype=str), return_inverse=True) if keys else (np.array([]), [])
+    best = {}
+    for (key, spelling), count in sorted(spellings.items()):
+        if count > best.get(key, ('', 0))[1]:
+            best[key] = (spelling, count)
+    labels = np.array([best[key][0] for key in unique], dtype=str)
+    return MultiCategoryColumn(np.array(rows, dtype=np.int32), np.asarray(codes, dtype=np.int32), labels)
+
+
+class EntryTable:
+    """Columnar view of journal entries."""
+
+    def __init__(self, records: list[dict]):
+        def field(name):
+            return [value if isinstance(value := record.get(name, ''), str) else '' for record in records]
+
+        self.size = len(records)
+        self.day, valid_dates = day_column(field('date'))
+        years = self.day.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int32) + 1970
+        self.year = np.where(valid_dates, years, 0).astype(np.int16)
+
+        self.numeric = {name: numeric_column(field(name)) for name in NUMERIC_FIELDS}
+        self.categories = {
+            name: category_column(field(source), WIND_DIRECTIONS if name == 'wind_direction' else None)
+            for name, source in CATEGORY_FIELDS.items()
+        }
+        self.multi = {name: multi_category_column(field(source)) for name, source in MULTI_FIELDS.items()}
+
+    @classmethod
+    def from_sample_data(cls, path: Path = SAMPLE_DATA_PATH) -> 'EntryTable':
+        entries = parse_export(path.read_text(), 'sampleEntries')
+        return cls([{name: entry.get(name) for name in entry.fields} for entry in entries])
+
+    def tile(self, times: int) -> 'EntryTable':
+        """This table repeated `times` times (for timing the group-bys at scale)."""
+        tiled = object.__new__(EntryTable)
+        tiled.size = self.size * times
+        tiled.day = np.tile(self.day, times)
+        tiled.year = np.tile(self.year, times)
+        tiled.numeric = {
+            name: NumericColumn(np.tile(col.values, times), np.tile(col.valid, times))
+            for name, col in self.numeric.items()
+        }
+        tiled.categories = {
+            name: CategoryColumn(np.tile(col.codes, times), col.labels)
+            for name, col in self.categories.items()
+        }
+        tiled.multi = {}
+        for name, col in self.multi.items():
+            offsets = np.repeat(np.arange(times, dtype=np.int32) * self.size, len(col.rows))
+            tiled.multi[name] = MultiCategoryColumn(np.tile(col.rows, times) + offsets, np.tile(col.codes, times), col.labels)
+        return tiled
+
+
+def aggregate(table: EntryTable, rows: np.ndarray, codes: np.ndarray, keys: list) -> Grouped:
+    """
+    Trips, fish caught and catch per trip for each group code.
+
+    Args:
+        rows: Entry row per item (an entry may appear in several groups)
+        codes: Group code per item, -1 to leave the item out
+        keys: Label for each group code; empty groups are dropped
+    """
+    catch = table.numeric['numberCaught']
+    keep = (codes >= 0) & catch.valid[rows]
+    codes = codes[keep]
+    trips = np.bincount(codes, minlength=len(keys))
+    caught = np.bincount(codes, weights=catch.values[rows[keep]].astype(np.float64), minlength=len(keys))
+    present = np.flatnonzero(trips)
+    trips, caught = trips[present], caught[present]
+    return Grouped([keys[i] for i in present], trips, caught, caught / trips)
+
+
+def catch_by_species_year(table: EntryTable) -> Grouped:
+    """Trips including each species, per year, with those trips' whole catch (not split by species)."""
+    species = table.multi['species']
+    years, year_codes = np.unique(table.year, return_inverse=True)
+    item_years = year_codes[species.rows]
+    codes = species.codes * len(years) + item_years
+    keys = [(label, int(year)) for label in species.labels for year in years]
+    return aggregate(table, species.rows, codes, keys)
+
+
+def catch_by_lure(table: EntryTable) -> Grouped:
+    """Trips using each lure, with those trips' whole catch."""
+    lure = table.multi['lure']
+    return aggregate(table, lure.rows, lure.codes, list(lure.labels))
+
+
+def catch_by_flow_band(table: EntryTable, edges: list[float] = DEFAULT_FLOW_BANDS) -> Grouped:
+    flow = table.numeric['flowRate']
+    codes = np.digitize(flow.values, edges).astype(np.int32) - 1
+    codes[~flow.valid] = -1
+    keys = [f'{lo:g}-{hi:g} cfs' for lo, hi in zip(edges, edges[1:])] + [f'{edges[-1]:g}+ cfs']
+    return aggregate(table, np.arange(table.size), codes, keys)
+
+
+def catch_by_wind_direction(table: EntryTable) -> Grouped:
+    wind = table.categories['wind_direction']
+    return aggregate(table, np.arange(table.size), wind.codes, list(wind.labels))
+
+
+REPORTS = {
+    'species-year': ('Catch per trip, trips including species, by year', catch_by_species_year),
+    'lure': ('Catch per trip, trips using lure', catch_by_lure),
+    'flow': ('Catch per trip by flow band', catch_by_flow_band),
+    'wind': ('Catch per trip by wind direction', catch_by_wind_direction),
+}
+
+
+def print_grouped(title: str, grouped: Grouped, limit: int):
+    print(f"\n{title}")
+    print("-" * 60)
+    order = np.argsort(-grouped.per_trip, kind='stable')[:limit]
+    for i in order:
+        key = grouped.keys[i]
+        label = ' '.join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+        print(f"  {label:<40} {grouped.trips[i]:>6} trips {grouped.per_trip[i]:>7.1f}/trip")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catch analytics over sampleData.ts entries')
+    parser.add_argument('report', nargs='?', default='all', choices=['all', *REPORTS])
+    parser.add_argument('--flow-bands', help=f'Comma-separated flow band edges in cfs (default: {DEFAULT_FLOW_BANDS})')
+    parser.add_argument('--limit', type=int, default=15, help='Rows per report (default: 15)')
+    parser.add_argument('--tile', type=int, default=1, help='Repeat the entries N times to time the group-bys at scale')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = EntryTable.from_sample_data()
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"Loaded {table.size:,} entries in {load_ms:.0f} ms")
+    if args.tile > 1:
+        # Only the columns are repeated; parsing above ran once over the source entries
+        started = time.perf_counter()
+        table = table.tile(args.tile)
+        tile_ms = (time.perf_counter() - started) * 1000
+        print(f"Tiled to {table.size:,} entries in {tile_ms:.0f} ms")
+
+    reports = REPORTS if args.report == 'all' else {args.report: REPORTS[args.report]}
+    for name, (title, func) in reports.items():
+        started = time.perf_counter()
+        if name == 'flow' and args.flow_bands:
+            grouped = func(table, [float(edge) for edge in args.flow_bands.split(',')])
+        else:
+            grouped = func(table)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print_grouped(f"{title} ({elapsed_ms:.1f} ms)", grouped, args.limit)
+
+
+if __name__ == '__main__':
+    main()
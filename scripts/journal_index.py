@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Persistent full-text index over journal notes and the voiced diary.
+
+Indexes every section of docs/spring_river_fishing_diary_voiced.md and the
+`notes` of every entry in src/data/sampleData.ts into an inverted index of
+positional posting lists. Each index segment is one file that is
+memory-mapped at query time: a sorted term table is binary-searched in
+place, and only the posting lists a query touches are decoded (varint
+delta-coded, decoded with NumPy). Phrases are matched on positions.
+
+Updates are incremental. A build only indexes documents that are new or
+whose text changed, writing them to a new segment. Superseded versions
+are tombstoned. `build --rebuild` compacts everything into one segment.
+
+Layout:
+    <index>/manifest.json     segments, tombstoned doc numbers
+    <index>/documents.json    doc key → (doc number, content digest), used by builds
+    <index>/seg-0001.idx      header | doc days | doc sources | term table | terms | postings | doc metadata
+
+Query syntax: words are ANDed, "quoted words" are phrases, OR separates
+alternatives:  trophy "jig and pig"   |   walleye OR sauger
+
+Usage:
+    python scripts/journal_index.py build
+    python scripts/journal_index.py build --rebuild
+    python scripts/journal_index.py query '"Trophy Hole"'
+    python scripts/journal_index.py query '"jig and pig" OR centipede' --from 2010-01-01 --to 2019-12-31
+    python scripts/journal_index.py query walleye --source voiced --count
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from ts_literal import parse_export
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from parse_diary import parse_date  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+VOICED_PATH = ROOT / 'docs' / 'spring_river_fishing_diary_voiced.md'
+SAMPLE_DATA_PATH = ROOT / 'src' / 'data' / 'sampleData.ts'
+INDEX_PATH = Path(__file__).parent / '.cache' / 'journal_index'
+
+TOKEN = re.compile(r'\w+')
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+# "## 10/7/1994 – First Time on the Spring River"
+VOICED_HEADING = re.compile(r'^##\s+(\d[^–]*?)\s+–\s+(.*)$')
+
+MAGIC = b'JIX1'
+# magic, version, documents, terms, then (offset, length) for each section
+HEADER = struct.Struct('<4sIII' + 'QQ' * 7)
+SECTIONS = ('days', 'sources', 'term_table', 'term_blob', 'postings', 'meta_offsets', 'meta')
+SOURCES = ('voiced', 'journal')
+TERM_DTYPE = np.dtype([
+    ('term_end', '<u8'),    # end of the term's bytes in term_blob
+    ('offset', '<u8'),      # start of the doc stream in postings; positions follow it
+    ('docs_len', '<u4'),
+    ('pos_len', '<u4'),
+    ('df', '<u4'),
+])
+NO_DAY = -(2 ** 31)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_number(iso_date: str) -> int:
+    try:
+        return date.fromisoformat(iso_date).toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return NO_DAY
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128-style unsigned varints for a whole array at once."""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b''
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    ends = np.cumsum(nbytes)
+    shifts = (np.arange(ends[-1]) - np.repeat(ends - nbytes, nbytes)) * 7
+    out = ((np.repeat(values, nbytes) >> shifts.astype(np.uint64)) & np.uint64(0x7F)).astype(np.uint8)
+    out |= 0x80
+    out[ends - 1] &= 0x7F
+    return out.tobytes()
+
+
+def decode_varints(buf) -> np.ndarray:
+    """Inverse of encode_varints over a bytes-like buffer."""
+    data = np.frombuffer(buf, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    parts = (data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def content_digest(*fields: str) -> str:
+    return hashlib.sha1('\x00'.join(fields).encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Sources
+
+def unique_key(seen: dict[str, int], key: str) -> str:
+    """Suffix repeated document keys (':2', ':3', ...) so each stays distinct."""
+    seen[key] = seen.get(key, 0) + 1
+    return key if seen[key] == 1 else f'{key}:{seen[key]}'
+
+
+def voiced_documents(path: Path) -> list[dict]:
+    """One document per '## date – title' section of the voiced diary."""
+    documents = []
+    current = None
+    seen = {}
+    for line in path.read_text().splitlines():
+        heading = VOICED_HEADING.match(line)
+        if heading:
+            date_iso, _ = parse_date(heading.group(1))
+            title = heading.group(2).strip()
+            key = unique_key(seen, f'voiced:{date_iso}:{title}')
+            current = {'key': key, 'source': 'voiced', 'date': date_iso, 'title': title, 'lines': []}
+            documents.append(current)
+        elif line.startswith('#'):
+            current = None  # title block or another heading ends the section
+        elif current is not None and line.strip() != '---':
+            current['lines'].append(line)
+
+    for doc in documents:
+        doc['text'] = '\n'.join(doc.pop('lines')).strip()
+    return documents
+
+
+def journal_documents(path: Path) -> list[dict]:
+    """One document per sampleData.ts entry, over its notes (keyed by date and stretch)."""
+    documents = []
+    seen = {}
+    for entry in parse_export(path.read_text(), 'sampleEntries'):
+        notes = entry.get('notes')
+        if not isinstance(notes, str):
+            continue
+        date_iso = entry.get('date') if isinstance(entry.get('date'), str) else ''
+        stream = entry.get('streamName') or ''
+        stretch = entry.get('riverStretch') or ''
+        documents.append({
+            'key': unique_key(seen, f'journal:{date_iso}:{stream}:{stretch}'),
+            'source': 'journal',
+            'date': date_iso,
+            'title': f'{stream} - {stretch}' if stretch else stream,
+            'text': notes,
+        })
+    return documents
+
+
+# ---------------------------------------------------------------------------
+# Segments
+
+def write_segment(path: Path, documents: list[dict]):
+    """Index documents (numbered 0..n-1 within the segment) into one segment file."""
+    postings = {}
+    for doc_number, doc in enumerate(documents):
+        for position, token in enumerate(tokenize(doc['text'])):
+            by_doc = postings.get(token)
+            if by_doc is None:
+                by_doc = postings[token] = {}
+            positions = by_doc.get(doc_number)
+            if positions is None:
+                by_doc[doc_number] = [position]
+            else:
+                positions.append(position)
+
+    terms = sorted(postings)
+    term_table = np.zeros(len(terms), dtype=TERM_DTYPE)
+    term_blob = bytearray()
+    chunks = []
+    offset = 0
+    for i, term in enumerate(terms):
+        by_doc = postings[term]
+        docs = np.fromiter(by_doc, dtype=np.int64, count=len(by_doc))
+        counts = np.fromiter((len(p) for p in by_doc.values()), dtype=np.int64, count=len(by_doc))
+        positions = np.fromiter((p for ps in by_doc.values() for p in ps), dtype=np.int64, count=int(counts.sum()))
+
+        doc_deltas = np.diff(docs, prepend=0)
+        pos_deltas = np.diff(positions, prepend=0)
+        pos_deltas[np.cumsum(counts) - counts] = positions[np.cumsum(counts) - counts]
+
+        doc_stream = encode_varints(np.column_stack((doc_deltas, counts)).ravel())
+        pos_stream = encode_varints(pos_deltas)
+        chunks.append(doc_stream)
+        chunks.append(pos_stream)
+
+        term_blob += term.encode()
+        term_table[i] = (len(term_blob), offset, len(doc_stream), len(pos_stream), len(docs))
+        offset += len(doc_stream) + len(pos_stream)
+
+    days = np.array([day_number(doc['date']) for doc in documents], dtype='<i4')
+    sources = np.array([SOURCES.index(doc['source']) for doc in documents], dtype=np.uint8)
+    meta_records = [
+        json.dumps({k: doc[k] for k in ('key', 'source', 'date', 'title', 'text')}).encode()
+        for doc in documents
+    ]
+    meta_offsets = np.cumsum([0] + [len(r) for r in meta_records]).astype('<u8')
+
+    sections = [days.tobytes(), sources.tobytes(), term_table.tobytes(), bytes(term_blob), b''.join(chunks),
+                meta_offsets.tobytes(), b''.join(meta_records)]
+    layout = []
+    position = HEADER.size
+    for section in sections:
+        layout += [position, len(section)]
+        position += len(section)
+
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 1, len(documents), len(terms), *layout))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """A memory-mapped segment; doc numbers are global (base + local)."""
+
+    def __init__(self, path: Path, base: int):
+        self.path = path
+        self.base = base
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, self.doc_count, self.term_count, *layout = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a journal index segment")
+        self._sections = {name: (layout[2 * i], layout[2 * i + 1]) for i, name in enumerate(SECTIONS)}
+
+        self.days = self._array('days', '<i4')
+        self.sources = self._array('sources', np.uint8)
+        self.term_table = self._array('term_table', TERM_DTYPE)
+        self.meta_offsets = self._array('meta_offsets', '<u8')
+        self._term_blob_start = self._sections['term_blob'][0]
+        self._postings_start = self._sections['postings'][0]
+        self._meta_start = self._sections['meta'][0]
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        offset, length = self._sections[name]
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self._mm, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    def close(self):
+        self.days = self.sources = self.term_table = self.meta_offsets = None
+        self._mm.close()
+
+    def _find(self, term: str) -> int | None:
+        """Binary search of the sorted term table, reading term bytes from the map."""
+        target = term.encode()
+        ends = self.term_table['term_end']
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(ends[mid - 1]) if mid else 0
+            candidate = self._mm[self._term_blob_start + start:self._term_blob_start + int(ends[mid])]
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def docs(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """(global doc numbers, term counts) for a term."""
+        i = self._find(term)
+        if i is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        row = self.term_table[i]
+        start = self._postings_start + int(row['offset'])
+        pairs = decode_varints(self._mm[start:start + int(row['docs_len'])]).astype(np.int64).reshape(-1, 2)
+        return np.cumsum(pairs[:, 0]) + self.base, pairs[:, 1]
+
+    def positions(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """(global doc number, position) pairs for every occurrence of a term."""
+        docs, counts = self.docs(term)
+        if not len(docs):
+            return docs, docs
+        row = self.term_table[self._find(term)]
+        start = self._postings_start + int(row['offset']) + int(row['docs_len'])
+        deltas = decode_varints(self._mm[start:start + int(row['pos_len'])]).astype(np.int64)
+        # Positions restart at each document: cumulative sum minus the running total before it
+        totals = np.cumsum(deltas)
+        firsts = np.cumsum(counts) - counts
+        restart = np.repeat(totals[firsts] - deltas[firsts], counts)
+        return np.repeat(docs, counts), totals - restart
+
+    def document(self, doc_number: int) -> dict:
+        local = doc_number - self.base
+        start = self._meta_start + int(self.meta_offsets[local])
+        end = self._meta_start + int(self.meta_offsets[local + 1])
+        return json.loads(self._mm[start:end])
+
+
+# ---------------------------------------------------------------------------
+# Index
+
+class JournalIndex:
+    """All segments of an index directory, minus tombstoned documents."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = Path(path)
+        manifest_path = self.path / 'manifest.json'
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No index at {self.path}; run `journal_index.py build` first")
+        manifest = json.loads(manifest_path.read_text())
+        self.segments = [Segment(self.path / s['file'], s['base']) for s in manifest['segments']]
+        self.deleted = np.array(sorted(manifest['deleted']), dtype=np.int64)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+    def _live(self, docs: np.ndarray) -> np.ndarray:
+        if len(self.deleted) and len(docs):
+            return docs[~np.isin(docs, self.deleted)]
+        return docs
+
+    def term_docs(self, tokens: list[str]) -> np.ndarray:
+        """Global doc numbers containing the tokens as a phrase (one token: as a word)."""
+        found = []
+        for segment in self.segments:
+            if len(tokens) == 1:
+                found.append(segment.docs(tokens[0])[0])
+                continue
+            keys = None
+            for offset, token in enumerate(tokens):
+                docs, positions = segment.positions(token)
+                # A phrase starts at the same (doc, position - offset) for every token
+                at = positions >= offset
+                token_keys = (docs[at] << 32) | (positions[at] - offset)
+                keys = token_keys if keys is None else np.intersect1d(keys, token_keys, assume_unique=True)
+                if not len(keys):
+                    break
+            found.append(np.unique(keys >> 32) if keys is not None and len(keys) else np.empty(0, dtype=np.int64))
+        return self._live(np.concatenate(found) if found else np.empty(0, dtype=np.int64))
+
+    def search(self, query: str, start_date: str = None, end_date: str = None, source: str = None) -> np.ndarray:
+        """
+        Evaluate a query; returns matching global doc numbers sorted by date.
+
+        Args:
+            query: Words (AND), "phrases", and OR between alternatives
+            start_date, end_date: Inclusive ISO date bounds
+            source: 'voiced' or 'journal' to restrict the results
+        """
+        matches = np.empty(0, dtype=np.int64)
+        for clause in parse_query(query):
+            clause_docs = None
+            for tokens in clause:
+                docs = self.term_docs(tokens)
+                clause_docs = docs if clause_docs is None else np.intersect1d(clause_docs, docs)
+                if not len(clause_docs):
+                    break
+            if clause_docs is not None:
+                matches = np.union1d(matches, clause_docs)
+
+        days, sources = self.doc_columns(matches)
+        keep = np.ones(len(matches), dtype=bool)
+        if start_date:
+            keep &= days >= day_number(start_date)
+        if end_date:
+            keep &= (days <= day_number(end_date)) & (days != NO_DAY)
+        if source:
+            keep &= sources == SOURCES.index(source)
+        matches, days = matches[keep], days[keep]
+        return matches[np.argsort(days, kind='stable')]
+
+    def _segment_for(self, doc_number: int) -> Segment:
+        for segment in reversed(self.segments):
+            if doc_number >= segment.base:
+                return segment
+        raise KeyError(doc_number)
+
+    def doc_columns(self, docs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(day numbers, source codes) for global doc numbers."""
+        days = np.full(len(docs), NO_DAY, dtype=np.int64)
+        sources = np.zeros(len(docs), dtype=np.uint8)
+        for segment in self.segments:
+            in_segment = (docs >= segment.base) & (docs < segment.base + segment.doc_count)
+            local = docs[in_segment] - segment.base
+            days[in_segment] = segment.days[local]
+            sources[in_segment] = segment.sources[local]
+        return days, sources
+
+    def document(self, doc_number: int) -> dict:
+        return self._segment_for(int(doc_number)).document(int(doc_number))
+
+
+def parse_query(query: str) -> list[list[list[str]]]:
+    """'a "b c" OR d' → [[['a'], ['b', 'c']], [['d']]] (OR of ANDs of phrases)."""
+    clauses = [[]]
+    for phrase, word in QUERY_TOKEN.findall(query):
+        if word == 'OR':
+            clauses.append([])
+            continue
+        tokens = tokenize(phrase or word)
+        if tokens:
+            clauses[-1].append(tokens)
+    return [clause for clause in clauses if clause]
+
+
+def build(index_path: Path, documents: list[dict], rebuild: bool = False) -> dict:
+    """
+    Bring the index up to date with documents, writing at most one new segment.
+
+    Returns:
+        Counts of added, changed, removed and unchanged documents
+    """
+    index_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = index_path / 'manifest.json'
+    known_path = index_path / 'documents.json'
+
+    if rebuild or not manifest_path.exists():
+        for old in index_path.glob('seg-*.idx'):
+            old.unlink()
+        manifest = {'segments': [], 'deleted': [], 'next_doc': 0}
+        known = {}
+    else:
+        manifest = json.loads(manifest_path.read_text())
+        known = json.loads(known_path.read_text())
+
+    current = {doc['key']: doc for doc in documents}
+    stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    deleted = set(manifest['deleted'])
+    fresh = []
+    for key, doc in current.items():
+        digest = content_digest(doc['date'], doc['title'], doc['text'])
+        if key in known and known[key][1] == digest:
+            stats['unchanged'] += 1
+            continue
+        if key in known:
+            deleted.add(known[key][0])
+            stats['changed'] += 1
+        else:
+            stats['added'] += 1
+        known[key] = [manifest['next_doc'] + len(fresh), digest]
+        fresh.append(doc)
+    for key in [key for key in known if key not in current]:
+        deleted.add(known.pop(key)[0])
+        stats['removed'] += 1
+
+    if fresh:
+        name = f"seg-{len(manifest['segments']) + 1:04d}.idx"
+        while (index_path / name).exists():
+            name = f"seg-{int(name[4:8]) + 1:04d}.idx"
+        write_segment(index_path / name, fresh)
+        manifest['segments'].append({'file': name, 'base': manifest['next_doc'], 'count': len(fresh)})
+        manifest['next_doc'] += len(fresh)
+    manifest['deleted'] = sorted(deleted)
+
+    for path, data in ((known_path, known), (manifest_path, manifest)):
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+    return stats
+
+
+def snippet(text: str, query: str, width: int = 100) -> str:
+    """A line of text around the first query word it contains."""
+    lowered = text.lower()
+    hits = [lowered.find(t) for clause in parse_query(query) for tokens in clause for t in tokens[:1]]
+    hits = [h for h in hits if h >= 0]
+    start = max(0, min(hits) - width // 3) if hits else 0
+    return ' '.join(text[start:start + width].split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text index over journal notes and the voiced diary')
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('query', nargs='?', help='query: words, "phrases", OR')
+    parser.add_argument('--index', default=str(INDEX_PATH), help='Index directory')
+    parser.add_argument('--voiced', default=str(VOICED_PATH), help='Voiced diary markdown to index')
+    parser.add_argument('--sample-data', default=str(SAMPLE_DATA_PATH), help='sampleData.ts to index')
+    parser.add_argument('--rebuild', action='store_true', help='build: discard segments and index everything into one')
+    parser.add_argument('--from', dest='start_date', help='query: earliest date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end_date', help='query: latest date (YYYY-MM-DD)')
+    parser.add_argument('--source', choices=['voiced', 'journal'], help='query: only this source')
+    parser.add_argument('--limit', type=int, default=20, help='query: results to print (default: 20)')
+    parser.add_argument('--count', action='store_true', help='query: print only the number of matches')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        documents = voiced_documents(Path(args.voiced)) + journal_documents(Path(args.sample_data))
+        stats = build(Path(args.index), documents, args.rebuild)
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {len(documents)} documents in {elapsed:.2f}s: "
+              f"{stats['added']} added, {stats['changed']} changed, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+        return
+
+    if not args.query:
+        parser.error('query needs a query string')
+
+    started = time.perf_counter()
+    try:
+        index = JournalIndex(args.index)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    matches = index.search(args.query, args.start_date, args.end_date, args.source)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{len(matches)} matches in {elapsed_ms:.1f} ms")
+    if not args.count:
+        for doc_number in matches[:args.limit]:
+            doc = index.document(doc_number)
+            print(f"  {doc['date']}  {doc['source']:<7}  {doc['title']}")
+            print(f"      {snippet(doc['text'], args.query)}")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -16,13 +16,54 @@ Examples:
 
     # Blog images
     python optimize_images.py -i ./content -o ./public/blog -s 320,640,1024,1920 -q 80
+
+    # Spread images across 8 worker processes
+    python optimize_images.py -i ./raw-icons -o ./public/icons --jobs 8
+
+    # Smallest outputs that keep SSIM >= 0.98, or that fit per-size byte budgets
+    python optimize_images.py -i ./raw-icons -o ./public/icons --target-ssim
+    python optimize_images.py -i ./raw-icons -o ./public/icons --byte-budget 1500,3000,6000,12000
+
+    # Quick encodes while iterating
+    python optimize_images.py -i ./raw-icons -o ./public/icons --fast
+
+    # AVIF too, for <picture> sources
+    python optimize_images.py -i ./raw-icons -o ./public/icons --avif
+
+Only new or changed sources are processed: a build manifest in the output
+directory (see build_manifest.py) records each source's content hash and
+the settings its outputs were made with. Outputs of deleted sources are
+removed. Use --force to rebuild everything.
+
+Encoding is fixed (-q, WebP method 6) unless tuned: --target-ssim or
+--byte-budget search quality and method per image and size (see
+encoder_tuning.py), and the chosen parameters are cached in the build
+manifest. --fast is a quick, larger-output profile for development. A
+report of bytes per size bucket, and bytes saved by tuning, ends each run.
+
+--avif adds AVIF versions of every size. After each run, responsive.json
+in the output directory lists every format and width of each image, with
+byte sizes and intrinsic dimensions (see responsive_manifest.py).
+
+Each source is decoded once and every size is a LANCZOS resize of it.
+--resize pyramid derives the sizes from a reduce() pyramid instead (see
+resize_all), several times faster but not pixel-identical; add
+--check-pyramid to compare each size with the direct resize and fall back
+to it below PYRAMID_MIN_PSNR. The check costs more than the direct resize
+it guards, which is why the pyramid is opt-in.
 """
 
 import os
 import argparse
-from PIL import Image
+import math
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops, ImageStat, features
 from pathlib import Path
 
+from build_manifest import BuildManifest, file_digest
+from encoder_tuning import AVIF_SPEED, DEFAULT_TARGET_SSIM, WEBP_METHODS, encode, tune
+from responsive_manifest import RESPONSIVE_NAME, write_responsive_manifest
+
 # Default sizes to generate
 DEFAULT_SIZES = {
     'sm': 32,    # Icons, thumbnails
@@ -31,13 +72,124 @@ DEFAULT_SIZES = {
     'xl': 256,   # Full-size previews
 }
 
+WEBP_METHOD = 6  # Slowest, smallest WebP encode
+
+# Encoder settings per profile; --fast trades bytes for encode speed while iterating
+PNG_SETTINGS = {'optimize': True, 'compress_level': 9}
+FAST_WEBP_METHOD = 1
+FAST_PNG_SETTINGS = {'optimize': False, 'compress_level': 1}
+AVIF_QUALITY = 60  # AVIF's scale runs lower than WebP's for the same look
+FAST_AVIF_SPEED = 10
+
+# Pyramid resizing: halve with Image.reduce while the level stays at least
+# PYRAMID_MARGIN times the target, then LANCZOS the rest of the way
+PYRAMID_MARGIN = 2
+PYRAMID_MIN_PSNR = 40.0  # dB against a direct LANCZOS resize, checked with --check-pyramid
+
+
+def psnr(a: Image.Image, b: Image.Image) -> float:
+    """
+    Peak signal-to-noise ratio between two same-size images, in dB (inf if identical).
+
+    RGBA images are compared premultiplied, so the colour of fully
+    transparent pixels (which resizers are free to change) doesn't count.
+    """
+    if a.mode == 'RGBA':
+        a, b = a.convert('RGBa'), b.convert('RGBa')
+    stat = ImageStat.Stat(ImageChops.difference(a, b))
+    mse = sum(stat.sum2) / (a.width * a.height * len(stat.sum2))
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def resize_all(
+    img: Image.Image,
+    sizes: dict[str, int],
+    pyramid: bool = False,
+    check: bool = False
+) -> tuple[dict[str, Image.Image], dict[str, float]]:
+    """
+    Resize an image to every square size.
+
+    With pyramid, the image is premultiplied once and halved with
+    Image.reduce(2) into a pyramid of levels; each size is a LANCZOS
+    resize of the smallest level still PYRAMID_MARGIN times larger than
+    it, instead of a full-resolution LANCZOS per size.
+
+    Args:
+        img: RGBA image
+        sizes: Dict of {name: pixel_size}
+        pyramid: Resize from the reduce() pyramid instead of the full image each time
+            (faster; not pixel-identical unless check falls back)
+        check: Compare each pyramid result with a direct resize; sizes below
+            PYRAMID_MIN_PSNR use the direct resize instead
+
+    Returns:
+        ({name: resized image}, {name: PSNR in dB} when checking)
+    """
+    if not pyramid:
+        return {name: img.resize((px, px), Image.Resampling.LANCZOS) for name, px in sizes.items()}, {}
+
+    levels = [img.convert('RGBa')]
+    resized = {}
+    scores = {}
+    for name, px in sorted(sizes.items(), key=lambda item: -item[1]):
+        while min(levels[-1].size) // 2 >= px * PYRAMID_MARGIN:
+            levels.append(levels[-1].reduce(2))
+        resized[name] = levels[-1].resize((px, px), Image.Resampling.LANCZOS).convert('RGBA')
+        if check:
+            direct = img.resize((px, px), Image.Resampling.LANCZOS)
+            scores[name] = psnr(resized[name], direct)
+            if scores[name] < PYRAMID_MIN_PSNR:
+                resized[name] = direct
+    return {name: resized[name] for name in sizes}, scores
+
+
+def encode_output(
+    img: Image.Image,
+    format: str,
+    fixed: dict,
+    cached: dict | None = None,
+    target_ssim: float | None = None,
+    max_bytes: int | None = None
+) -> tuple[bytes, dict]:
+    """
+    Encode one resized output with cached, tuned, or fixed parameters.
+
+    Args:
+        img: Resized RGBA image
+        format: 'WEBP' or 'PNG'
+        fixed: Encoder parameters when not tuning (also the reference for bytes saved)
+        cached: Parameters tuned by an earlier build of the same source and settings
+        target_ssim: Tune to this SSIM (see encoder_tuning.tune)
+        max_bytes: Tune to this byte budget instead
+
+    Returns:
+        (encoded bytes, params with 'bytes' and, when tuned, 'reference_bytes')
+    """
+    if cached:
+        data = encode(img, format, cached)
+        return data, {**cached, 'bytes': len(data)}
+    if target_ssim is None and max_bytes is None:
+        data = encode(img, format, fixed)
+        return data, {**fixed, 'bytes': len(data)}
+    data, params = tune(format, img, target_ssim, max_bytes)
+    params['reference_bytes'] = len(encode(img, format, fixed))
+    return data, params
+
 
 def optimize_image(
     input_path: str,
     output_dir: str,
     sizes: dict[str, int],
     quality: int = 90,
-    keep_originals: bool = True
+    keep_originals: bool = True,
+    pyramid: bool = False,
+    check_pyramid: bool = False,
+    fast: bool = False,
+    target_ssim: float | None = None,
+    byte_budget: dict[str, int] | None = None,
+    tuned: dict | None = None,
+    avif: bool = False
 ) -> dict:
     """
     Optimize a single image: resize and convert to WebP.
@@ -48,19 +200,47 @@ def optimize_image(
         sizes: Dict of {name: pixel_size}
         quality: WebP quality (1-100)
         keep_originals: Whether to copy originals to full/ subdirectory
+        pyramid: Derive sizes from a decode-once reduce() pyramid (see resize_all)
+        check_pyramid: Verify pyramid sizes against direct resizes (PSNR in results)
+        fast: Quick, larger encodes for development (WebP method 1, light PNG compression)
+        target_ssim: Tune each output's encoder parameters to this SSIM
+        byte_budget: Tune each output to fit {size_name: bytes} instead
+        tuned: results['encoding'] of an earlier build of this source, whose
+            parameters are reused instead of searching again
+        avif: Also write an AVIF of each size
 
     Returns:
-        Dict with paths to generated files
+        Dict with paths to generated files, and 'encoding' with the parameters
+        and byte counts of each output: {size_name: {'avif': ..., 'webp': ..., 'png': ...}}
     """
+    if fast and (target_ssim is not None or byte_budget):
+        raise ValueError('fast profile cannot be combined with encoder tuning')
+
     input_path = Path(input_path)
     output_dir = Path(output_dir)
 
     # Get base filename without extension
     base_name = input_path.stem
 
-    results = {'original': str(input_path), 'generated': {}}
+    results = {'original': str(input_path), 'generated': {}, 'encoding': {}}
+    png_settings = FAST_PNG_SETTINGS if fast else PNG_SETTINGS
+    if fast:
+        webp_settings = {'quality': quality, 'method': FAST_WEBP_METHOD}
+    elif target_ssim is not None or byte_budget:
+        # Reference for bytes saved; method 6 would cost more than the search itself
+        webp_settings = {'quality': quality, 'method': WEBP_METHODS[-1]}
+    else:
+        webp_settings = {'quality': quality, 'method': WEBP_METHOD}
+    formats = [('WEBP', webp_settings), ('PNG', png_settings)]
+    if avif:
+        formats.insert(0, ('AVIF', {'quality': AVIF_QUALITY, 'speed': FAST_AVIF_SPEED if fast else AVIF_SPEED}))
 
     with Image.open(input_path) as img:
+        # JPEGs can decode straight at a reduced scale when no full-size copy is kept
+        if pyramid and not keep_originals and img.format == 'JPEG':
+            largest = max(sizes.values()) * PYRAMID_MARGIN
+            img.draft('RGB', (largest, largest))
+
         # Convert to RGBA for transparency support
         if img.mode != 'RGBA':
             img = img.convert('RGBA')
@@ -70,28 +250,42 @@ def optimize_image(
             full_dir = output_dir / 'full'
             full_dir.mkdir(parents=True, exist_ok=True)
             original_path = full_dir / f"{base_name}.png"
-            img.save(original_path, 'PNG', optimize=True)
+            original_path.write_bytes(encode(img, 'PNG', png_settings))
             results['generated']['full'] = str(original_path)
 
+        # Resize with high-quality resampling
+        resized_sizes, scores = resize_all(img, sizes, pyramid, check_pyramid)
+        if scores:
+            results['pyramid_psnr'] = scores
+
         # Generate each size
-        for size_name, size_px in sizes.items():
+        for size_name, resized in resized_sizes.items():
             size_dir = output_dir / size_name
             size_dir.mkdir(parents=True, exist_ok=True)
 
-            # Resize with high-quality resampling
-            resized = img.resize((size_px, size_px), Image.Resampling.LANCZOS)
+            # AVIF (if asked for), WebP (primary), then PNG (fallback for older browsers)
+            cached = (tuned or {}).get(size_name, {})
+            max_bytes = byte_budget.get(size_name) if byte_budget else None
+            results['encoding'][size_name] = {}
+            for format, fixed in formats:
+                suffix = format.lower()
+                data, params = encode_output(
+                    resized, format, fixed, cached.get(suffix), target_ssim, max_bytes
+                )
+                path = size_dir / f"{base_name}.{suffix}"
+                path.write_bytes(data)
+                results['generated'][f'{size_name}_{suffix}'] = str(path)
+                results['encoding'][size_name][suffix] = params
 
-            # Save as WebP (primary)
-            webp_path = size_dir / f"{base_name}.webp"
-            resized.save(webp_path, 'WEBP', quality=quality, method=6)
-            results['generated'][f'{size_name}_webp'] = str(webp_path)
+    return results
 
-            # Save as PNG (fallback for older browsers)
-            png_path = size_dir / f"{base_name}.png"
-            resized.save(png_path, 'PNG', optimize=True)
-            results['generated'][f'{size_name}_png'] = str(png_path)
 
-    return results
+def optimize_image_safe(input_path: str, *args, **kwargs) -> dict:
+    """optimize_image() that reports a failure as {'original', 'error'} instead of raising."""
+    try:
+        return optimize_image(input_path, *args, **kwargs)
+    except Exception as e:
+        return {'original': str(input_path), 'error': str(e)}
 
 
 def optimize_directory(
@@ -99,7 +293,17 @@ def optimize_directory(
     output_dir: str,
     sizes: dict[str, int] = None,
     quality: int = 90,
-    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp', '.gif'),
+    jobs: int = 1,
+    force: bool = False,
+    pyramid: bool = False,
+    check_pyramid: bool = False,
+    fast: bool = False,
+    target_ssim: float | None = None,
+    byte_budget: dict[str, int] | None = None,
+    avif: bool = False,
+    base_url: str | None = None,
+    keep_originals: bool = True
 ) -> list[dict]:
     """
     Optimize all images in a directory.
@@ -110,15 +314,29 @@ def optimize_directory(
         sizes: Dict of {name: pixel_size}, uses DEFAULT_SIZES if None
         quality: WebP quality (1-100)
         extensions: File extensions to process
+        jobs: Worker processes; images are spread across them, largest first
+        force: Rebuild images the build manifest says are up to date
+        pyramid: Derive sizes from a reduce() pyramid instead of full-size resizes
+        check_pyramid: Check pyramid sizes against direct resizes (PSNR guard)
+        fast: Development profile: quick, larger encodes
+        target_ssim: Tune encoder parameters per output to this SSIM
+        byte_budget: Tune encoder parameters per output to {size_name: bytes}
+        avif: Also write AVIF sizes
+        base_url: URL output_dir is served at, for responsive.json
+            (default: its path under public/)
+        keep_originals: Copy originals to full/; without them JPEGs decode
+            at a reduced scale (see optimize_image)
 
     Returns:
-        List of results from optimize_image()
+        List of results from optimize_image(), in sorted filename order
+        whatever the number of jobs; failed images have an 'error' key and
+        up-to-date ones are {'original', 'skipped': True, 'encoding'}, with
+        the encoding recorded when they were built
     """
     if sizes is None:
         sizes = DEFAULT_SIZES
 
     input_dir = Path(input_dir)
-    results = []
 
     # Find all image files
     image_files = [
@@ -126,23 +344,105 @@ def optimize_directory(
         if f.is_file() and f.suffix.lower() in extensions
     ]
 
-    print(f"Processing {len(image_files)} images...")
-
-    for img_path in sorted(image_files):
-        try:
+    image_files = sorted(image_files)
+    manifest = BuildManifest(output_dir, 'optimize_images', {
+        'sizes': sizes, 'quality': quality, 'method': WEBP_METHOD,
+        'resize': ('pyramid-checked' if check_pyramid else 'pyramid') if pyramid else 'direct',
+        'encoder': {
+            'profile': 'fast' if fast else 'default',
+            'target_ssim': target_ssim,
+            'byte_budget': byte_budget,
+        },
+        'avif': avif,
+        'originals': keep_originals,
+    })
+    digests = {img_path: file_digest(img_path) for img_path in image_files}
+    stale = [
+        img_path for img_path in image_files
+        if force or not manifest.is_current(img_path.name, digests[img_path])
+    ]
+    print(f"Processing {len(stale)} images ({len(image_files) - len(stale)} up to date)...")
+
+    # Parameters tuned for the same bytes and settings (rebuilt by --force or
+    # because an output went missing) are reused instead of searched again
+    tuned = {img_path: manifest.params(img_path.name, digests[img_path]) for img_path in image_files}
+    encoding = {
+        'fast': fast, 'target_ssim': target_ssim, 'byte_budget': byte_budget, 'avif': avif,
+    }
+    by_path = {
+        img_path: {'original': str(img_path), 'skipped': True, 'encoding': tuned[img_path] or {}}
+        for img_path in image_files
+    }
+    if jobs <= 1 or len(stale) <= 1:
+        for img_path in stale:
             print(f"  • {img_path.name}")
-            result = optimize_image(
-                str(img_path),
-                output_dir,
-                sizes,
-                quality
+            result = optimize_image_safe(
+                str(img_path), output_dir, sizes, quality, keep_originals,
+                pyramid=pyramid, check_pyramid=check_pyramid, tuned=tuned[img_path], **encoding
+            )
+            if 'error' in result:
+                print(f"  ❌ Error: {result['error']}")
+            by_path[img_path] = result
+    else:
+        # Largest first so one big original doesn't start last and run alone
+        by_size = sorted(stale, key=lambda p: (-p.stat().st_size, p))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    optimize_image_safe, str(img_path), output_dir, sizes, quality, keep_originals,
+                    pyramid=pyramid, check_pyramid=check_pyramid, tuned=tuned[img_path], **encoding
+                )
+                for img_path in by_size
+            ]
+            for img_path, future in zip(by_size, futures):
+                result = future.result()
+                if 'error' in result:
+                    print(f"  ❌ {img_path.name}: {result['error']}")
+                else:
+                    print(f"  • {img_path.name}")
+                by_path[img_path] = result
+
+    removed = []
+    for img_path in stale:
+        result = by_path[img_path]
+        if 'error' not in result:
+            removed += manifest.record(
+                img_path.name, digests[img_path], result['generated'].values(), result['encoding']
             )
-            results.append(result)
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            results.append({'original': str(img_path), 'error': str(e)})
+    removed += manifest.prune(img_path.name for img_path in image_files)
+    manifest.save()
+    for path in removed:
+        print(f"  🗑  {path}")
+    write_responsive_manifest(manifest, base_url)
 
-    return results
+    return [by_path[img_path] for img_path in image_files]
+
+
+def print_bytes_report(results: list[dict], sizes: dict[str, int], quality: int):
+    """Bytes shipped per size bucket and format, and what tuning saved against fixed -q encodes."""
+    print(f"\nBytes per size bucket:")
+    for size_name, size_px in sizes.items():
+        columns = []
+        for suffix in ('avif', 'webp', 'png'):
+            outputs = [
+                r['encoding'][size_name][suffix] for r in results
+                if suffix in r.get('encoding', {}).get(size_name, {})
+            ]
+            if not outputs:
+                continue
+            total = sum(params['bytes'] for params in outputs)
+            column = f"{suffix} {total / 1024:8.1f} KB"
+            references = [params['reference_bytes'] for params in outputs if 'reference_bytes' in params]
+            if len(references) == len(outputs):
+                reference = sum(references)
+                column += f" (saved {(reference - total) / 1024:.1f} KB, {(reference - total) / reference:.0%})"
+            columns.append(column)
+        if columns:
+            bucket = f"{size_name} ({size_px}px):"
+            print(f"  • {bucket:<14} {'   '.join(columns)}")
+    if any('reference_bytes' in params for r in results for by_format in r.get('encoding', {}).values()
+           for params in by_format.values()):
+        print(f"  (saved = against fixed -q {quality} encodes of the same sizes)")
 
 
 def main():
@@ -175,8 +475,58 @@ def main():
         action='store_true',
         help='Do not keep original files in full/ directory'
     )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes to spread images across (default: 1)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild every image, even those the build manifest says are up to date'
+    )
+    parser.add_argument(
+        '--avif',
+        action='store_true',
+        help='Also write AVIF versions of every size (needs Pillow built with AVIF support)'
+    )
+    parser.add_argument(
+        '--base-url',
+        help=f'URL the output directory is served at, for {RESPONSIVE_NAME} (default: its path under public/)'
+    )
+    parser.add_argument(
+        '--resize',
+        choices=['direct', 'pyramid'],
+        default='direct',
+        help='direct: LANCZOS from full size; pyramid: halve with reduce() before each LANCZOS, faster (default: direct)'
+    )
+    parser.add_argument(
+        '--check-pyramid',
+        action='store_true',
+        help=f'With --resize pyramid, compare each size with a direct resize and fall back below {PYRAMID_MIN_PSNR:g} dB PSNR'
+    )
+    encoder = parser.add_mutually_exclusive_group()
+    encoder.add_argument(
+        '--fast',
+        action='store_true',
+        help='Development profile: quick encodes (WebP method 1, light PNG compression), larger files'
+    )
+    encoder.add_argument(
+        '--target-ssim',
+        type=float,
+        nargs='?',
+        const=DEFAULT_TARGET_SSIM,
+        help=f'Tune quality/method per image and size to reach this SSIM (default when given: {DEFAULT_TARGET_SSIM})'
+    )
+    encoder.add_argument(
+        '--byte-budget',
+        help='Tune quality/method per image to fit these byte budgets, one per size or one for all (e.g. 1500,3000,6000,12000)'
+    )
 
     args = parser.parse_args()
+    if args.avif and not features.check('avif'):
+        parser.error('--avif needs a Pillow build with AVIF support')
 
     # Parse sizes into named dict
     size_list = [int(s.strip()) for s in args.sizes.split(',')]
@@ -186,22 +536,48 @@ def main():
         name = size_names[i] if i < len(size_names) else f's{size_px}'
         sizes[name] = size_px
 
+    byte_budget = None
+    if args.byte_budget:
+        budgets = [int(b.strip()) for b in args.byte_budget.split(',')]
+        if len(budgets) == 1:
+            budgets *= len(sizes)
+        if len(budgets) != len(sizes):
+            parser.error(f'--byte-budget needs 1 or {len(sizes)} values, got {len(budgets)}')
+        byte_budget = dict(zip(sizes, budgets))
+
     # Run optimization
     results = optimize_directory(
         args.input,
         args.output,
         sizes,
-        args.quality
+        args.quality,
+        jobs=args.jobs,
+        force=args.force,
+        pyramid=args.resize == 'pyramid',
+        check_pyramid=args.check_pyramid,
+        fast=args.fast,
+        target_ssim=args.target_ssim,
+        byte_budget=byte_budget,
+        avif=args.avif,
+        base_url=args.base_url,
+        keep_originals=not args.no_originals
     )
 
     # Summary
-    successful = len([r for r in results if 'error' not in r])
-    print(f"\n✨ Done! Processed {successful}/{len(results)} images")
+    skipped = len([r for r in results if r.get('skipped')])
+    successful = len([r for r in results if 'error' not in r]) - skipped
+    print(f"\n✨ Done! Processed {successful}/{len(results) - skipped} images ({skipped} up to date)")
+    scores = [psnr for r in results for psnr in r.get('pyramid_psnr', {}).values()]
+    if scores:
+        below = len([score for score in scores if score < PYRAMID_MIN_PSNR])
+        print(f"   Pyramid PSNR vs direct resize: min {min(scores):.1f} dB, {below} size(s) fell back to direct")
+    print_bytes_report(results, sizes, args.quality)
     print(f"\nOutput structure:")
     for size_name, size_px in sizes.items():
         print(f"  • {args.output}/{size_name}/ ({size_px}px)")
     if not args.no_originals:
         print(f"  • {args.output}/full/ (originals)")
+    print(f"  • {args.output}/{RESPONSIVE_NAME} (formats, widths and bytes per image)")
 
 
 if __name__ == '__main__':
@@ -8,21 +8,35 @@ and generates multiple sizes.
 Usage:
     python optimize_with_bg_removal.py <input_dir> <output_dir>
     python optimize_with_bg_removal.py ./raw-icons ./public/icons
+    python optimize_with_bg_removal.py ./raw-icons ./public/icons --avif   # AVIF sizes too
 
 Requires:
     pip install pillow rembg[cpu]
 
 For GPU acceleration (much faster):
     pip install pillow rembg[gpu]
+
+Unchanged sources are skipped: the build manifest in the output directory
+(see build_manifest.py) records each source's content hash together with
+the sizes, quality, encoder method, background-removal model and AVIF
+setting used. --avif adds an AVIF of every size (AVIF_QUALITY from
+optimize_images.py; needs a Pillow build with AVIF support).
+responsive.json in the output directory is refreshed after each run (see
+responsive_manifest.py).
 """
 
 import os
 import sys
-from PIL import Image
+from PIL import Image, features
 from pathlib import Path
 
+from build_manifest import BuildManifest, file_digest
+from encoder_tuning import AVIF_SPEED
+from optimize_images import AVIF_QUALITY
+from responsive_manifest import RESPONSIVE_NAME, write_responsive_manifest
+
 try:
-    from rembg import remove
+    from rembg import new_session, remove
 except ImportError:
     print("Error: rembg not installed. Run: pip install rembg[cpu]")
     sys.exit(1)
@@ -34,13 +48,17 @@ DEFAULT_SIZES = {
     'lg': 128,   # Modals, hero sections
 }
 
+BG_MODEL = 'u2net'  # rembg's default model
+WEBP_METHOD = 6
 
-def remove_background(input_path: str) -> Image.Image:
+
+def remove_background(input_path: str, session=None) -> Image.Image:
     """
     Remove background from an image using AI.
 
     Args:
         input_path: Path to the input image
+        session: rembg session for the model to use (rembg's default if None)
 
     Returns:
         PIL Image with transparent background
@@ -48,7 +66,7 @@ def remove_background(input_path: str) -> Image.Image:
     with open(input_path, 'rb') as f:
         input_data = f.read()
 
-    output_data = remove(input_data)
+    output_data = remove(input_data, session=session)
 
     from io import BytesIO
     return Image.open(BytesIO(output_data))
@@ -59,7 +77,9 @@ def optimize_with_bg_removal(
     output_dir: str,
     sizes: dict[str, int] = None,
     quality: int = 90,
-    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp')
+    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp'),
+    model: str = BG_MODEL,
+    avif: bool = False
 ):
     """
     Remove backgrounds and optimize images.
@@ -70,6 +90,8 @@ def optimize_with_bg_removal(
         sizes: Dict of {name: pixel_size}
         quality: WebP quality (1-100)
         extensions: File extensions to process
+        model: rembg background-removal model
+        avif: Also write an AVIF of each size
     """
     if sizes is None:
         sizes = DEFAULT_SIZES
@@ -88,18 +110,27 @@ def optimize_with_bg_removal(
         if f.is_file() and f.suffix.lower() in extensions
     ]
 
-    print(f"Processing {len(image_files)} images with background removal...")
-    print(f"This may take a while on first run (downloading AI model)...\n")
+    manifest = BuildManifest(output_dir, 'optimize_with_bg_removal', {
+        'sizes': sizes, 'quality': quality, 'method': WEBP_METHOD, 'model': model, 'avif': avif,
+    })
+    digests = {img_path: file_digest(img_path) for img_path in image_files}
+    stale = [img_path for img_path in sorted(image_files) if not manifest.is_current(img_path.name, digests[img_path])]
+
+    print(f"Processing {len(stale)} images with background removal ({len(image_files) - len(stale)} up to date)...")
+    if stale:
+        print(f"This may take a while on first run (downloading AI model)...\n")
+        session = new_session(model)
 
     processed = 0
     errors = 0
+    removed = []
 
-    for img_path in sorted(image_files):
+    for img_path in stale:
         try:
             print(f"  • {img_path.name}")
 
             # Remove background using AI
-            img = remove_background(str(img_path))
+            img = remove_background(str(img_path), session)
 
             # Ensure RGBA for transparency
             if img.mode != 'RGBA':
@@ -110,6 +141,7 @@ def optimize_with_bg_removal(
             # Save original (with background removed) to full/
             full_path = output_dir / 'full' / f"{base_name}.png"
             img.save(full_path, 'PNG', optimize=True)
+            outputs = [full_path]
 
             # Generate each size
             for size_name, size_px in sizes.items():
@@ -118,46 +150,68 @@ def optimize_with_bg_removal(
 
                 # Save WebP (primary - small and fast)
                 webp_path = output_dir / size_name / f"{base_name}.webp"
-                resized.save(webp_path, 'WEBP', quality=quality, method=6)
+                resized.save(webp_path, 'WEBP', quality=quality, method=WEBP_METHOD)
 
                 # Save PNG (fallback for older browsers)
                 png_path = output_dir / size_name / f"{base_name}.png"
                 resized.save(png_path, 'PNG', optimize=True)
+                outputs += [webp_path, png_path]
 
+                # AVIF (smallest, for browsers that support it)
+                if avif:
+                    avif_path = output_dir / size_name / f"{base_name}.avif"
+                    resized.save(avif_path, 'AVIF', quality=AVIF_QUALITY, speed=AVIF_SPEED)
+                    outputs.append(avif_path)
+
+            removed += manifest.record(img_path.name, digests[img_path], outputs)
             processed += 1
 
         except Exception as e:
             print(f"  ❌ Error: {e}")
             errors += 1
 
+    removed += manifest.prune(img_path.name for img_path in image_files)
+    manifest.save()
+    for path in removed:
+        print(f"  🗑  {path}")
+    write_responsive_manifest(manifest)
+
     # Summary
     print(f"\n✨ Done!")
     print(f"   Processed: {processed}")
+    print(f"   Up to date: {len(image_files) - len(stale)}")
     if errors > 0:
         print(f"   Errors: {errors}")
 
     print(f"\nOutput structure:")
     for size_name, size_px in sizes.items():
-        print(f"  • {output_dir}/{size_name}/ ({size_px}px WebP + PNG)")
+        print(f"  • {output_dir}/{size_name}/ ({size_px}px {'AVIF + ' if avif else ''}WebP + PNG)")
     print(f"  • {output_dir}/full/ (originals, background removed)")
+    print(f"  • {output_dir}/{RESPONSIVE_NAME} (formats, widths and bytes per image)")
 
 
 def main():
-    if len(sys.argv) < 3:
+    avif = '--avif' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--avif']
+    if len(args) < 2:
         print(__doc__)
-        print("\nUsage: python optimize_with_bg_removal.py <input_dir> <output_dir>")
+        print("\nUsage: python optimize_with_bg_removal.py <input_dir> <output_dir> [sizes] [--avif]")
         print("\nExample:")
         print("  python optimize_with_bg_removal.py ./raw-icons ./public/icons")
         sys.exit(1)
 
-    input_dir = sys.argv[1]
-    output_dir = sys.argv[2]
+    if avif and not features.check('avif'):
+        print("Error: --avif needs a Pillow build with AVIF support")
+        sys.exit(1)
+
+    input_dir = args[0]
+    output_dir = args[1]
 
     # Optional: custom sizes from command line
     sizes = DEFAULT_SIZES
-    if len(sys.argv) > 3:
+    if len(args) > 2:
         # Parse sizes like "32,64,128"
-        size_list = [int(s) for s in sys.argv[3].split(',')]
+        size_list = [int(s) for s in args[2].split(',')]
         size_names = ['sm', 'md', 'lg', 'xl']
         sizes = {size_names[i]: px for i, px in enumerate(size_list) if i < len(size_names)}
 
@@ -165,7 +219,7 @@ def main():
         print(f"Error: Input directory not found: {input_dir}")
         sys.exit(1)
 
-    optimize_with_bg_removal(input_dir, output_dir, sizes)
+    optimize_with_bg_removal(input_dir, output_dir, sizes, avif=avif)
 
 
 if __name__ == '__main__':
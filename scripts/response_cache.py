@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite cache for water-data API responses.
+
+Responses are keyed by (station, parameter codes, service, start date,
+end date) and stored as JSON. Each service has its own time-to-live:
+historical daily and instantaneous values never change, so they are kept
+forever, while windows touching the last few (provisional) days expire
+and are refetched. Offline replay ignores expiry and serves whatever was
+recorded, however old.
+
+Usage:
+    cache = ResponseCache('scripts/.cache/water_responses.sqlite3')
+    data = cache.fetch('07069305', '00060,00065', 'dv', '2011-06-24', '2011-06-26',
+                       lambda: fetch_daily_values(client, '07069305', '2011-06-24', '2011-06-26'))
+
+    # Any window, stored and served as whole months of {date: value}
+    data = cache.fetch_months('07069305', '00060,00065', 'dv', '2011-06-24', '2011-07-02',
+                              lambda start, end: fetch_daily_values(client, '07069305', start, end))
+
+    # Offline replay: serve only from the cache, raise CacheMiss otherwise
+    cache = ResponseCache(path, offline=True)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Seconds to keep a cached response per service (None = forever)
+DEFAULT_TTLS = {
+    'dv': None,
+    'iv': None,
+}
+
+# Windows ending this close to today hold provisional data
+PROVISIONAL_DAYS = 7
+PROVISIONAL_TTL = 6 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    station TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    service TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (station, parameters, service, start_date, end_date)
+)
+"""
+
+
+def month_windows(start_date: str, end_date: str) -> list[tuple[str, str]]:
+    """(first day, last day) of every calendar month overlapping [start_date, end_date]."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    months = []
+    first = start.replace(day=1)
+    while first <= end:
+        following = (first + timedelta(days=32)).replace(day=1)
+        months.append((first.isoformat(), (following - timedelta(days=1)).isoformat()))
+        first = following
+    return months
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+class ResponseCache:
+    """
+    On-disk response cache shared by the worker threads of one run.
+
+    Args:
+        path: SQLite database file (parent directories are created)
+        ttls: Dict of {service: seconds or None}, merged over DEFAULT_TTLS
+        offline: Never call the loader; serve stale entries and raise CacheMiss on a miss
+    """
+
+    def __init__(self, path: str, ttls: dict = None, offline: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.stats = {}  # {service: {'hits': n, 'misses': n}}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def ttl_for(self, service: str, end_date: str) -> float | None:
+        """Effective TTL for a window: provisional recent data always expires."""
+        ttl = self.ttls.get(service)
+        try:
+            recent = date.fromisoformat(end_date) >= date.today() - timedelta(days=PROVISIONAL_DAYS)
+        except ValueError:
+            recent = False
+        if recent:
+            return PROVISIONAL_TTL if ttl is None else min(ttl, PROVISIONAL_TTL)
+        return ttl
+
+    def get(self, station: str, parameters: str, service: str, start_date: str, end_date: str):
+        """Return the cached payload, or None if absent or (when online) expired."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fetched_at, payload FROM responses '
+                'WHERE station = ? AND parameters = ? AND service = ? AND start_date = ? AND end_date = ?',
+                (station, parameters, service, start_date, end_date)
+            ).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, payload = row
+        ttl = self.ttl_for(service, end_date)
+        if not self.offline and ttl is not None and time.time() - fetched_at > ttl:
+            return None
+        return json.loads(payload)
+
+    def put(self, station: str, parameters: str, service: str, start_date: str, end_date: str, payload):
+        """Store a payload, replacing any previous entry for the same key."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (station, parameters, service, start_date, end_date, time.time(), json.dumps(payload))
+            )
+            self._conn.commit()
+
+    def _count(self, service: str, hit: bool):
+        # fetch() runs on run_tasks worker threads
+        with self._lock:
+            stats = self.stats.setdefault(service, {'hits': 0, 'misses': 0})
+            if hit:
+                self.hits += 1
+                stats['hits'] += 1
+            else:
+                self.misses += 1
+                stats['misses'] += 1
+
+    def fetch(self, station: str, parameters: str, service: str, start_date: str, end_date: str, loader):
+        """
+        Return the cached payload for a key, calling loader() and storing its result on a miss.
+
+        Raises:
+            CacheMiss: In offline mode when the key is not cached
+        """
+        payload = self.get(station, parameters, service, start_date, end_date)
+        self._count(service, hit=payload is not None)
+        if payload is not None:
+            return payload
+
+        if self.offline:
+            raise CacheMiss(f"{service} {station} {parameters} {start_date} → {end_date} not in cache")
+
+        payload = loader()
+        self.put(station, parameters, service, start_date, end_date, payload)
+        return payload
+
+    def fetch_months(self, station: str, parameters: str, service: str, start_date: str, end_date: str, loader):
+        """
+        Return {date: value} for a window, cached as whole calendar months.
+
+        Cached months are served as they are; each run of consecutive
+        missing months is loaded with one loader(start, end) call (the end
+        clamped to today), split by month and stored, including months
+        with no readings.
+
+        Args:
+            loader: Callable (start_date, end_date) -> {ISO date: value}
+
+        Raises:
+            CacheMiss: In offline mode when any month of the window is not cached
+        """
+        months = month_windows(start_date, end_date)
+        payloads = {}
+        for month in months:
+            payloads[month] = self.get(station, parameters, service, *month)
+            self._count(service, hit=payloads[month] is not None)
+
+        missing = [month for month in months if payloads[month] is None]
+        if missing and self.offline:
+            raise CacheMiss(f"{service} {station} {parameters} {missing[0][0][:7]} not in cache")
+
+        runs = []
+        for month in missing:
+            if runs and date.fromisoformat(month[0]) - date.fromisoformat(runs[-1][-1][1]) == timedelta(days=1):
+                runs[-1].append(month)
+            else:
+                runs.append([month])
+        for run in runs:
+            loaded = loader(run[0][0], min(run[-1][1], date.today().isoformat()))
+            for month in run:
+                payloads[month] = {day: value for day, value in loaded.items() if month[0] <= day <= month[1]}
+                self.put(station, parameters, service, *month, payloads[month])
+
+        return {
+            day: value
+            for payload in payloads.values()
+            for day, value in payload.items()
+            if start_date <= day <= end_date
+        }
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Responsive image manifest: every format and width generated for each asset.
+
+Written as responsive.json next to the sized folders by the image
+optimizers, from the outputs their build manifest (build_manifest.py)
+records for every tool in the directory, so the app can build
+<picture>/srcset markup instead of hard-coding /icons/sm/... paths:
+
+    {
+      "version": 1,
+      "formats": {"avif": "image/avif", "webp": "image/webp", "png": "image/png"},
+      "assets": {
+        "largemouth-bass-icon": {
+          "width": 1024, "height": 1024,
+          "original": "/icons/full/largemouth-bass-icon.png",
+          "sources": {
+            "avif": [{"src": "/icons/sm/largemouth-bass-icon.avif", "width": 32, "height": 32, "bytes": 612}, ...],
+            "webp": [...],
+            "png": [...]
+          }
+        }
+      }
+    }
+
+"formats" and each asset's "sources" are in order of preference, and every
+format's sources are sorted by width. Byte sizes are per file, since a
+preferred format is not always the smallest at tiny widths. See
+src/utils/responsiveImages.ts for the reader.
+
+Usage:
+    write_responsive_manifest(build_manifest)                 # URL from the path under public/
+    write_responsive_manifest(build_manifest, '/images/blog')
+"""
+
+import json
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from build_manifest import BuildManifest
+
+RESPONSIVE_NAME = 'responsive.json'
+RESPONSIVE_VERSION = 1
+
+# Formats in order of preference, with their MIME types
+FORMATS = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'png': 'image/png',
+}
+ORIGINALS_DIR = 'full'
+
+
+def default_base_url(output_dir) -> str:
+    """URL an output directory is served at: its path under public/, else /<its name>."""
+    parts = Path(output_dir).resolve().parts
+    if 'public' in parts:
+        return '/' + '/'.join(parts[len(parts) - parts[::-1].index('public'):])
+    return '/' + parts[-1]
+
+
+def build_responsive_manifest(manifest: BuildManifest, base_url: str | None = None) -> dict:
+    """
+    Describe every asset built into manifest's directory.
+
+    Args:
+        manifest: Build manifest of the output directory (all tools are included)
+        base_url: URL the directory is served at (default: default_base_url)
+
+    Returns:
+        The responsive manifest (see module docstring)
+    """
+    output_dir = manifest.output_dir
+    base_url = (base_url or default_base_url(output_dir)).rstrip('/')
+
+    assets = {}
+    for source, outputs in manifest.all_outputs().items():
+        asset = {'width': 0, 'height': 0}
+        sources = {}
+        for output in outputs:
+            path = output_dir / output
+            format = path.suffix.lower().lstrip('.')
+            if format not in FORMATS or not path.exists():
+                continue
+            with Image.open(path) as img:
+                width, height = img.size
+            if Path(output).parts[0] == ORIGINALS_DIR:
+                asset.update(width=width, height=height, original=f'{base_url}/{output}')
+                continue
+            sources.setdefault(format, []).append({
+                'src': f'{base_url}/{output}',
+                'width': width,
+                'height': height,
+                'bytes': path.stat().st_size,
+            })
+        if not sources:
+            continue
+        if 'original' not in asset:
+            largest = max((entry for entries in sources.values() for entry in entries), key=lambda e: e['width'])
+            asset.update(width=largest['width'], height=largest['height'])
+        asset['sources'] = {
+            format: sorted(sources[format], key=lambda entry: entry['width'])
+            for format in FORMATS if format in sources
+        }
+        assets[Path(source).stem] = asset
+
+    return {'version': RESPONSIVE_VERSION, 'formats': FORMATS, 'assets': dict(sorted(assets.items()))}
+
+
+def write_responsive_manifest(manifest: BuildManifest, base_url: str | None = None) -> Path:
+    """Write responsive.json into manifest's output directory; returns its path."""
+    data = build_responsive_manifest(manifest, base_url)
+    path = manifest.output_dir / RESPONSIVE_NAME
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(data, indent=2) + '\n')
+    os.replace(tmp, path)
+    return path
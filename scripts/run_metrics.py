@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Run-level metrics for the backfill scripts.
+
+Collects wall-clock time per phase and, per (service, station), request
+counts, latency percentiles, response bytes, retries, errors and empty
+results, plus response-cache hits. Reports are written as JSON and,
+optionally, in the Prometheus text exposition format (for node_exporter's
+textfile collector or a quick diff between runs).
+
+Usage:
+    metrics = RunMetrics()
+    with metrics.phase('parse'):
+        entries = parse_sample_data(content)
+    metrics.record_request('dv', '07069305', latency=0.41, nbytes=5120, retries=0, empty=False)
+    metrics.write_json('report.json')
+    metrics.write_prometheus('report.prom', prefix='water_backfill')
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """Thread-safe collector shared by a run's worker threads."""
+
+    def __init__(self):
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.requests = {}
+        self.cache = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; repeated phases (e.g. one per batch) accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def record_request(
+        self,
+        service: str,
+        station: str,
+        latency: float,
+        nbytes: int = 0,
+        retries: int = 0,
+        empty: bool = False,
+        error: bool = False
+    ):
+        """Record one HTTP request (latency = send until body fully consumed)."""
+        with self._lock:
+            stats = self.requests.setdefault((service, station), {
+                'latencies': [], 'bytes': 0, 'retries': 0, 'empty': 0, 'errors': 0,
+            })
+            stats['latencies'].append(latency)
+            stats['bytes'] += nbytes
+            stats['retries'] += retries
+            stats['empty'] += int(empty)
+            stats['errors'] += int(error)
+
+    def record_cache(self, service: str, hits: int, misses: int):
+        with self._lock:
+            stats = self.cache.setdefault(service, {'hits': 0, 'misses': 0})
+            stats['hits'] += hits
+            stats['misses'] += misses
+
+    def summary(self) -> dict:
+        """JSON-serializable report."""
+        with self._lock:
+            stations = []
+            for (service, station), stats in sorted(self.requests.items()):
+                latencies = sorted(stats['latencies'])
+                count = len(latencies)
+                stations.append({
+                    'service': service,
+                    'station': station,
+                    'requests': count,
+                    'latency_seconds': {f'p{int(q * 100)}': round(percentile(latencies, q), 4) for q in QUANTILES},
+                    'latency_seconds_max': round(latencies[-1], 4) if latencies else 0.0,
+                    'latency_seconds_sum': round(sum(latencies), 4),
+                    'bytes': stats['bytes'],
+                    'retries': stats['retries'],
+                    'errors': stats['errors'],
+                    'empty_results': stats['empty'],
+                    'empty_rate': round(stats['empty'] / count, 4) if count else 0.0,
+                })
+
+            services = {}
+            for entry in stations:
+                totals = services.setdefault(entry['service'], {'requests': 0, 'bytes': 0, 'retries': 0, 'errors': 0})
+                for key in totals:
+                    totals[key] += entry[key]
+            for service, counts in self.cache.items():
+                services.setdefault(service, {'requests': 0, 'bytes': 0, 'retries': 0, 'errors': 0})
+                services[service]['cache_hits'] = counts['hits']
+                services[service]['cache_misses'] = counts['misses']
+
+            return {
+                'started': self.started,
+                'total_seconds': round(time.perf_counter() - self._start, 4),
+                'phases_seconds': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+                'services': services,
+                'stations': stations,
+            }
+
+    def write_json(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.summary(), indent=2) + '\n')
+
+    def write_prometheus(self, path: str, prefix: str = 'backfill'):
+        """Write the report in the Prometheus text exposition format."""
+        report = self.summary()
+        lines = []
+
+        def sample(name: str, labels: dict, value: float):
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f'{prefix}_{name}{{{label_text}}} {value}' if label_text else f'{prefix}_{name} {value}')
+
+        def metric(
+            name: str,
+            kind: str,
+            help_text: str,
+            samples: list[tuple[dict, float]],
+            suffixed: list[tuple[str, dict, float]] = ()
+        ):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for labels, value in samples:
+                sample(name, labels, value)
+            # e.g. a summary's _sum and _count samples
+            for suffix, labels, value in suffixed:
+                sample(f'{name}_{suffix}', labels, value)
+
+        metric('run_seconds', 'gauge', 'Wall-clock seconds for the whole run',
+               [({}, report['total_seconds'])])
+        metric('phase_seconds', 'gauge', 'Wall-clock seconds spent per phase',
+               [({'phase': name}, seconds) for name, seconds in report['phases_seconds'].items()])
+
+        stations = report['stations']
+        labels = [{'service': s['service'], 'station': s['station']} for s in stations]
+        metric('requests_total', 'counter', 'HTTP requests per service and station',
+               [(label, s['requests']) for label, s in zip(labels, stations)])
+        metric('request_latency_seconds', 'summary', 'Request latency percentiles',
+               [({**label, 'quantile': str(q)}, s['latency_seconds'][f'p{int(q * 100)}'])
+                for label, s in zip(labels, stations) for q in QUANTILES],
+               [sample for label, s in zip(labels, stations)
+                for sample in (('sum', label, s['latency_seconds_sum']), ('count', label, s['requests']))])
+        metric('response_bytes_total', 'counter', 'Response bytes read',
+               [(label, s['bytes']) for label, s in zip(labels, stations)])
+        metric('retries_total', 'counter', 'Request retries',
+               [(label, s['retries']) for label, s in zip(labels, stations)])
+        metric('errors_total', 'counter', 'Failed requests',
+               [(label, s['errors']) for label, s in zip(labels, stations)])
+        metric('empty_results_total', 'counter', 'Requests that returned no readings',
+               [(label, s['empty_results']) for label, s in zip(labels, stations)])
+        metric('cache_hits_total', 'counter', 'Response cache hits',
+               [({'service': service}, totals.get('cache_hits', 0)) for service, totals in report['services'].items()])
+        metric('cache_misses_total', 'counter', 'Response cache misses',
+               [({'service': service}, totals.get('cache_misses', 0)) for service, totals in report['services'].items()])
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text('\n'.join(lines) + '\n')
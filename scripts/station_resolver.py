@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Resolve journal streams to USGS stations using the app's own catalogs.
+
+Loads src/data/usgsStations.ts and src/data/arkansasStreams.ts once and
+builds a token inverted index over station names. Each station name is
+split into its stream part ("Spring River") and its locality ("Spring
+Street Bridge at Hardy"); a streamName is matched against stream parts and
+the entry's riverStretch breaks ties between stations on the same stream.
+The compiled index is cached on disk and rebuilt only when either TS
+source changes; resolutions are memoized for O(1) repeat lookups.
+
+Usage:
+    resolver = StationResolver.load()
+    station = resolver.resolve('Spring River', 'Hardy low water bridge')
+
+    python scripts/station_resolver.py "Eleven Point River" "Ravenden to Imboden"
+"""
+
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from ts_literal import parse_export
+
+DATA_DIR = Path(__file__).parent.parent / 'src' / 'data'
+STATIONS_PATH = DATA_DIR / 'usgsStations.ts'
+STREAMS_PATH = DATA_DIR / 'arkansasStreams.ts'
+INDEX_PATH = Path(__file__).parent / '.cache' / 'station_index.json'
+
+# Bump when the index layout or tokenizer changes
+INDEX_VERSION = 1
+
+# Words that separate a station's stream from its locality
+LOCALITY_SPLIT = re.compile(r'\s+(?:at|near|nr\.?|below|above|blw\.?|abv\.?|bl\.?|ab\.?)\s+', re.IGNORECASE)
+STATE_SUFFIX = re.compile(r',?\s*(?:AR|ARK|Ark|Arkansas|MO|Mo|OK|Okla|LA|La|TX|Tex)\.?\s*$')
+TOKEN = re.compile(r"[a-z0-9']+")
+
+# Abbreviations used in USGS station names
+ABBREVIATIONS = {
+    'cr': 'creek', 'ck': 'creek', 'br': 'branch', 'fk': 'fork', 'trib': 'tributary',
+    'r': 'river', 'riv': 'river', 'n': 'north', 's': 'south', 'e': 'east', 'w': 'west',
+    'mtn': 'mountain', 'saint': 'st', 'hwy': 'highway', 'byu': 'bayou',
+}
+
+# Whole-name aliases (journal/catalog name -> name used by USGS)
+STREAM_ALIASES = {
+    'buffalo national river': 'buffalo river',
+    'ar river': 'arkansas river',
+    "l'anguille river": 'languille river',
+}
+
+# Tokens that carry no locality information
+STOPWORDS = {'at', 'near', 'nr', 'the', 'of', 'and', 'to', 'below', 'above', 'bridge', 'highway', 'ar'}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with USGS abbreviations expanded."""
+    tokens = TOKEN.findall(text.lower().replace('.', ' '))
+    return [ABBREVIATIONS.get(token, token) for token in tokens]
+
+
+def normalize_stream(name: str) -> str:
+    """Canonical form of a stream name for exact matching."""
+    normalized = ' '.join(tokenize(name))
+    return STREAM_ALIASES.get(normalized, normalized)
+
+
+def split_station_name(name: str) -> tuple[str, str]:
+    """Split 'Spring River at Spring Street Bridge at Hardy, AR' into (stream, locality)."""
+    name = STATE_SUFFIX.sub('', name.strip())
+    parts = LOCALITY_SPLIT.split(name, maxsplit=1)
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def build_index(stations_path: Path = STATIONS_PATH, streams_path: Path = STREAMS_PATH) -> dict:
+    """
+    Compile the station catalog into a JSON-serializable index.
+
+    Returns:
+        Dict with 'stations' (number, name, basin, flags, locality tokens),
+        'streams' (canonical catalog names), 'by_stream' (normalized stream
+        part -> station ids) and 'tokens' (stream-part token -> station ids)
+    """
+    stations = parse_export(stations_path.read_text(), 'usgsStations')
+    streams = parse_export(streams_path.read_text(), 'allArkansasStreams')
+
+    compiled = []
+    by_stream = {}
+    tokens = {}
+    for i, station in enumerate(stations):
+        name = station.get('stationName')
+        stream_part, locality = split_station_name(name)
+        parameters = station.get('parameters', {})
+        compiled.append({
+            'stationNumber': station.get('stationNumber'),
+            'stationName': name,
+            'riverBasin': station.get('riverBasin'),
+            'discharge': bool(parameters.get('discharge')),
+            'gageHeight': bool(parameters.get('gageHeight')),
+            'locality': sorted(set(tokenize(locality)) - STOPWORDS),
+        })
+        by_stream.setdefault(normalize_stream(stream_part), []).append(i)
+        for token in set(tokenize(stream_part)):
+            tokens.setdefault(token, []).append(i)
+
+    return {
+        'version': INDEX_VERSION,
+        'stations': compiled,
+        'streams': list(streams),
+        'by_stream': by_stream,
+        'tokens': tokens,
+    }
+
+
+class StationResolver:
+    """
+    Stream/stretch -> USGS station lookups over a compiled index.
+
+    Args:
+        index: Output of build_index()
+        defaults: Optional {streamName: stationNumber} preferred when the
+            river stretch does not single out a station
+    """
+
+    def __init__(self, index: dict, defaults: dict[str, str] = None):
+        self.stations = index['stations']
+        self.by_stream = index['by_stream']
+        self.tokens = {token: set(ids) for token, ids in index['tokens'].items()}
+        self.streams = {normalize_stream(name): name for name in index['streams']}
+        self.defaults = {normalize_stream(name): number for name, number in (defaults or {}).items()}
+        self._memo = {}
+
+    @classmethod
+    def load(
+        cls,
+        defaults: dict[str, str] = None,
+        index_path: Path = INDEX_PATH,
+        stations_path: Path = STATIONS_PATH,
+        streams_path: Path = STREAMS_PATH
+    ) -> 'StationResolver':
+        """Load the cached index, rebuilding it when either TS source has changed."""
+        sources = {
+            'stations': file_digest(stations_path),
+            'streams': file_digest(streams_path),
+        }
+
+        index = None
+        if index_path.exists():
+            try:
+                cached = json.loads(index_path.read_text())
+                if cached.get('version') == INDEX_VERSION and cached.get('sources') == sources:
+                    index = cached
+            except json.JSONDecodeError:
+                pass
+
+        if index is None:
+            index = build_index(stations_path, streams_path)
+            index['sources'] = sources
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            index_path.write_text(json.dumps(index))
+
+        return cls(index, defaults)
+
+    def candidates(self, stream_name: str) -> list[int]:
+        """Station ids whose stream part is the stream, else ones containing all its tokens."""
+        normalized = normalize_stream(stream_name)
+        exact = self.by_stream.get(normalized)
+        if exact:
+            return exact
+
+        postings = [self.tokens.get(token, set()) for token in normalized.split()]
+        if not postings:
+            return []
+        return sorted(set.intersection(*postings))
+
+    def resolve(
+        self,
+        stream_name: str,
+        river_stretch: str = '',
+        basin: str = None,
+        require_discharge: bool = True,
+        require_gage_height: bool = False
+    ) -> str | None:
+        """
+        Best station number for a stream, or None if the catalog has no match.
+
+        Ranking: more riverStretch tokens shared with the station's
+        locality, then the configured default for the stream, then
+        stations reporting gage height, then catalog order.
+        """
+        key = (stream_name, river_stretch, basin, require_discharge, require_gage_height)
+        if key in self._memo:
+            return self._memo[key]
+
+        stretch_tokens = set(tokenize(river_stretch)) - STOPWORDS
+        default = self.defaults.get(normalize_stream(stream_name))
+
+        best = None
+        best_score = None
+        for i in self.candidates(stream_name):
+            station = self.stations[i]
+            if require_discharge and not station['discharge']:
+                continue
+            if require_gage_height and not station['gageHeight']:
+                continue
+            if basin and station['riverBasin'] != basin:
+                continue
+            score = (
+                len(stretch_tokens.intersection(station['locality'])),
+                station['stationNumber'] == default,
+                station['gageHeight'],
+                -i,
+            )
+            if best_score is None or score > best_score:
+                best, best_score = station['stationNumber'], score
+
+        self._memo[key] = best
+        return best
+
+    def is_known_stream(self, stream_name: str) -> bool:
+        """Whether the stream appears in arkansasStreams.ts."""
+        return normalize_stream(stream_name) in self.streams
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    resolver = StationResolver.load()
+    stream_name = sys.argv[1]
+    river_stretch = sys.argv[2] if len(sys.argv) > 2 else ''
+
+    station_number = resolver.resolve(stream_name, river_stretch)
+    if station_number is None:
+        print(f"No discharge station found for {stream_name!r}")
+        sys.exit(1)
+
+    station = next(s for s in resolver.stations if s['stationNumber'] == station_number)
+    print(f"{station['stationName']} ({station_number})")
+    if not resolver.is_known_stream(stream_name):
+        print(f"Note: {stream_name!r} is not in arkansasStreams.ts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Single-pass lexer/parser for the TypeScript object-literal subset used in src/data.
+
+Handles exported arrays and objects of literals - strings ('...', "...",
+and `...` without ${} interpolation), numbers, true/false/null/undefined,
+nested objects and arrays, comments and trailing `as const`. Every parsed
+value remembers its [start, end) character offsets in the source, so edits
+are applied as in-place splices and the rest of the file is left untouched.
+
+Usage:
+    content = Path('src/data/sampleData.ts').read_text()
+    entries = parse_export(content, 'sampleEntries')
+    date = entries[0].get('date')
+
+    edits = [entries[0].edit('flowRate', '512')]
+    new_content = splice(content, edits)
+"""
+
+import gc
+import re
+
+# Whitespace and comments between tokens
+_SKIP = r'\s*(?:(?://[^\n]*|/\*.*?\*/)\s*)*'
+
+# String bodies use the unrolled `normal* (special normal*)*` form, so long
+# notes are consumed in character-class runs rather than one char at a time
+_SQ = r"'[^'\\\n]*(?:\\.[^'\\\n]*)*'"
+_DQ = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+_TPL = r'`[^`\\$]*(?:(?:\\.|\$(?!\{))[^`\\$]*)*`'
+_IDENT = r'[A-Za-z_$][\w$]*'
+_NUM = r'-?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+
+TOKEN = re.compile(
+    _SKIP + rf'(?:(?P<str>{_SQ}|{_DQ})|(?P<tpl>{_TPL})|(?P<num>{_NUM})|(?P<ident>{_IDENT})|(?P<punct>[{{}}\[\](),:;=<>|.]))',
+    re.DOTALL
+)
+
+# Fast path for the common `key: 'string',` property - one match per field
+STRING_FIELD = re.compile(
+    _SKIP + rf'(?P<key>{_IDENT})' + _SKIP + ':' + _SKIP + rf'(?P<str>{_SQ}|{_DQ})' + _SKIP + r'(?P<sep>[,}])',
+    re.DOTALL
+)
+
+ESCAPE = re.compile(r'\\(u\{[0-9A-Fa-f]+\}|u[0-9A-Fa-f]{4}|x[0-9A-Fa-f]{2}|\r\n|.)', re.DOTALL)
+SIMPLE_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+    '\n': '', '\r\n': '', '\u2028': '', '\u2029': '',
+}
+KEYWORDS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+
+class TSSyntaxError(ValueError):
+    """Raised when the source leaves the supported literal subset."""
+
+    def __init__(self, message: str, content: str, pos: int):
+        line = content.count('\n', 0, pos) + 1
+        super().__init__(f"{message} at line {line} (offset {pos})")
+        self.pos = pos
+
+
+class Value:
+    """A parsed literal and its [start, end) span in the source."""
+
+    __slots__ = ('value', 'start', 'end', 'quote')
+
+    def __init__(self, value, start: int, end: int, quote: str = ''):
+        self.value = value
+        self.start = start
+        self.end = end
+        self.quote = quote
+
+    def __repr__(self):
+        return f"Value({self.value!r}, {self.start}, {self.end})"
+
+
+class ObjectLiteral:
+    """A parsed `{ ... }` literal: ordered fields, each a Value with offsets."""
+
+    __slots__ = ('fields', 'start', 'end')
+
+    def __init__(self, fields: dict, start: int, end: int):
+        self.fields = fields
+        self.start = start
+        self.end = end
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def __repr__(self):
+        return f"ObjectLiteral({list(self.fields)}, {self.start}, {self.end})"
+
+    def get(self, name: str, default=''):
+        """Decoded value of a field (nested literals unwrapped), or default."""
+        field = self.fields.get(name)
+        return default if field is None else to_python(field.value)
+
+    def edit(self, name: str, value) -> tuple[int, int, str]:
+        """
+        Splice edit replacing a field's value, keeping its original quote style.
+
+        Raises:
+            KeyError: If the field does not exist
+        """
+        field = self.fields[name]
+        return field.start, field.end, encode(value, field.quote or "'")
+
+
+def to_python(value):
+    """Convert parsed literals (ObjectLiteral / list of Value) to plain Python data."""
+    if isinstance(value, ObjectLiteral):
+        return {name: to_python(field.value) for name, field in value.fields.items()}
+    if isinstance(value, list):
+        return [to_python(item.value) for item in value]
+    return value
+
+
+def decode_string(raw: str) -> str:
+    """Decode a quoted string literal (quotes included) to its Python value."""
+    body = raw[1:-1]
+    if '\\' not in body:
+        return body
+    return ESCAPE.sub(_unescape, body)
+
+
+def _unescape(match) -> str:
+    esc = match.group(1)
+    if esc in SIMPLE_ESCAPES:
+        return SIMPLE_ESCAPES[esc]
+    if esc[0] == 'u' and len(esc) > 1:
+        return chr(int(esc[2:-1] if esc[1] == '{' else esc[1:], 16))
+    if esc[0] == 'x' and len(esc) == 3:
+        return chr(int(esc[1:], 16))
+    return esc
+
+
+def encode(value, quote: str = "'") -> str:
+    """Encode a Python value as a TypeScript literal."""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+
+    text = str(value).replace('\\', '\\\\').replace(quote, '\\' + quote)
+    if quote == '`':
+        text = text.replace('${', '\\${')
+    else:
+        text = text.replace('\n', '\\n').replace('\r', '\\r')
+    text = text.replace('\t', '\\t').replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+    return quote + text + quote
+
+
+def splice(content: str, edits: list[tuple[int, int, str]]) -> str:
+    """
+    Apply (start, end, replacement) edits in one pass.
+
+    Raises:
+        ValueError: If two edits overlap
+    """
+    parts = []
+    pos = 0
+    for start, end, text in sorted(edits):
+        if start < pos:
+            raise ValueError(f"Overlapping edits at offset {start}")
+        parts.append(content[pos:start])
+        parts.append(text)
+        pos = end
+    parts.append(content[pos:])
+    return ''.join(parts)
+
+
+class Parser:
+    """Recursive-descent parser over TOKEN matches, starting at a given offset."""
+
+    def __init__(self, content: str, pos: int = 0):
+        self.content = content
+        self.pos = pos
+
+    def error(self, message: str, pos: int = None):
+        raise TSSyntaxError(message, self.content, self.pos if pos is None else pos)
+
+    def next_token(self):
+        match = TOKEN.match(self.content, self.pos)
+        if match is None:
+            self.error("Unexpected input")
+        self.pos = match.end()
+        return match
+
+    def peek_token(self):
+        return TOKEN.match(self.content, self.pos)
+
+    def expect(self, punct: str):
+        match = self.next_token()
+        if match.group('punct') != punct:
+            self.error(f"Expected '{punct}', found {match.group(match.lastgroup)!r}", match.start(match.lastgroup))
+        return match
+
+    def skip_type_assertion(self):
+        """Consume a trailing `as const` / `as Type` after a value."""
+        match = self.peek_token()
+        if match is not None and match.group('ident') == 'as':
+            self.pos = match.end()
+            self.next_token()
+
+    def parse_value(self) -> Value:
+        match = self.next_token()
+        kind = match.lastgroup
+        text = match.group(kind)
+        start = match.start(kind)
+
+        if kind == 'str':
+            value = Value(decode_string(text), start, match.end(), text[0])
+        elif kind == 'tpl':
+            value = Value(decode_string(text), start, match.end(), '`')
+        elif kind == 'num':
+            value = Value(float(text) if any(c in text for c in '.eE') else int(text), start, match.end())
+        elif kind == 'ident':
+            if text not in KEYWORDS:
+                self.error(f"Unsupported identifier {text!r}", start)
+            value = Value(KEYWORDS[text], start, match.end())
+        elif text == '{':
+            obj = self.parse_object(start)
+            value = Value(obj, start, obj.end)
+        elif text == '[':
+            value = self.parse_array(start)
+        else:
+            self.error(f"Unexpected {text!r}", start)
+
+        self.skip_type_assertion()
+        return value
+
+    def parse_object(self, start: int) -> ObjectLiteral:
+        """Parse object fields after an opening brace at `start`."""
+        content = self.content
+        fields = {}
+        match_field = STRING_FIELD.match
+        while True:
+            # Fast path: `key: 'string',` in a single regex match
+            match = match_field(content, self.pos)
+            if match is not None:
+                key, raw, sep = match.group(1, 2, 3)
+                body = raw[1:-1]
+                if '\\' in body:
+                    body = ESCAPE.sub(_unescape, body)
+                value_start, value_end = match.span(2)
+                fields[key] = Value(body, value_start, value_end, raw[0])
+                self.pos = match.end()
+                if sep == '}':
+                    return ObjectLiteral(fields, start, self.pos)
+                continue
+
+            match = self.next_token()
+            kind = match.lastgroup
+            text = match.group(kind)
+            if text == '}' and kind == 'punct':
+                return ObjectLiteral(fields, start, self.pos)
+            if kind == 'str':
+                key = decode_string(text)
+            elif kind in ('ident', 'num'):
+                key = text
+            else:
+                self.error(f"Expected property name, found {text!r}", match.start(kind))
+
+            self.expect(':')
+            fields[key] = self.parse_value()
+
+            match = self.next_token()
+            sep = match.group('punct')
+            if sep == '}':
+                return ObjectLiteral(fields, start, self.pos)
+            if sep != ',':
+                self.error(f"Expected ',' or '}}', found {match.group(match.lastgroup)!r}", match.start(match.lastgroup))
+
+    def parse_array(self, start: int) -> Value:
+        """Parse array items after an opening bracket at `start`."""
+        items = []
+        while True:
+            match = self.peek_token()
+            if match is not None and match.group('punct') == ']':
+                self.pos = match.end()
+                return Value(items, start, self.pos)
+
+            items.append(self.parse_value())
+
+            match = self.next_token()
+            sep = match.group('punct')
+            if sep == ']':
+                return Value(items, start, self.pos)
+            if sep != ',':
+                self.error(f"Expected ',' or ']', found {match.group(match.lastgroup)!r}", match.start(match.lastgroup))
+
+
+def parse_export(content: str, name: str):
+    """
+    Parse the literal assigned to `export const <name>` (type annotation allowed).
+
+    Returns:
+        list[ObjectLiteral] for an array of objects, an ObjectLiteral for an
+        object, or the plain decoded value otherwise
+
+    Raises:
+        ValueError: If the export is missing
+        TSSyntaxError: If its value leaves the supported subset
+    """
+    match = re.search(rf'export\s+const\s+{re.escape(name)}\b[^=]*=', content)
+    if not match:
+        raise ValueError(f"Could not find export const {name} in file")
+
+    # The parse tree is acyclic; pausing the cyclic GC avoids repeated
+    # collections while hundreds of thousands of Value objects are created
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        value = Parser(content, match.end()).parse_value()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if isinstance(value.value, list):
+        return [item.value if isinstance(item.value, ObjectLiteral) else to_python(item.value)
+                for item in value.value]
+    return value.value
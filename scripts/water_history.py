@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped store of USGS daily-value history per station.
+
+Downloads the full daily discharge and gage-height record for each station
+once and keeps every series as a raw little-endian float32 column indexed
+by day number, with NaN marking days without a value. Lookups are an O(1)
+index into a memory-mapped array, and `update` appends only the days since
+the last download.
+
+Layout:
+    <store>/<station>/meta.json   start day, length, columns
+    <store>/<station>/00060.f32   discharge (cfs)
+    <store>/<station>/00065.f32   gage height (ft)
+
+Usage:
+    python scripts/water_history.py download                 # stations used by sampleData.ts
+    python scripts/water_history.py download -s 07069305,07072000
+    python scripts/water_history.py update                   # append new days
+    python scripts/water_history.py lookup 07069305 2011-06-24
+"""
+
+import argparse
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from backfill_water_data import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    PARAM_DISCHARGE,
+    PARAM_GAGE_HEIGHT,
+    SAMPLE_DATA_PATH,
+    SERVICE_PARAMETERS,
+    USGS_BASE_URL,
+    extract_field,
+    fetch_readings,
+    get_station_for_stream,
+    parse_sample_data,
+)
+from http_pool import PooledClient
+
+STORE_PATH = Path(__file__).parent / '.cache' / 'water_history'
+
+# Earliest date requested when downloading a station's full record
+HISTORY_START = '1900-01-01'
+
+COLUMNS = {
+    PARAM_DISCHARGE: 'discharge',
+    PARAM_GAGE_HEIGHT: 'gage_height',
+}
+DTYPE = np.dtype('<f4')
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_number(iso_date: str) -> int:
+    """Days since 1970-01-01."""
+    return date.fromisoformat(iso_date).toordinal() - EPOCH_ORDINAL
+
+
+def day_to_iso(day: int) -> str:
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def format_value(value: float) -> str:
+    """Shortest decimal string that round-trips the stored float32 ('3.12', '1230')."""
+    return np.format_float_positional(np.float32(value), trim='-')
+
+
+def fetch_columns(client: PooledClient, station_id: str, start_date: str, end_date: str) -> tuple[int, dict]:
+    """
+    Fetch daily values for a window into dense columns.
+
+    Returns:
+        (first_day, {parameter_code: float32 array}) - arrays share one
+        length and start at first_day; first_day is None if nothing came back
+    """
+    params = {
+        'sites': station_id,
+        'startDT': start_date,
+        'endDT': end_date,
+        'parameterCd': SERVICE_PARAMETERS['dv'],
+        'format': 'json',
+    }
+    days = {code: [] for code in COLUMNS}
+    values = {code: [] for code in COLUMNS}
+    for var_code, dt, value in fetch_readings(client, 'dv', params):
+        if var_code in COLUMNS:
+            try:
+                values[var_code].append(float(value))
+            except ValueError:
+                continue
+            days[var_code].append(day_number(dt[:10]))
+
+    all_days = [d for code in COLUMNS for d in days[code]]
+    if not all_days:
+        return None, {}
+
+    first_day = min(all_days)
+    length = max(all_days) - first_day + 1
+    columns = {}
+    for code in COLUMNS:
+        column = np.full(length, np.nan, dtype=DTYPE)
+        if days[code]:
+            column[np.asarray(days[code]) - first_day] = values[code]
+        columns[code] = column
+    return first_day, columns
+
+
+class HistoryStore:
+    """Read and append per-station daily columns under a store directory."""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = Path(path)
+        self._meta = {}
+        self._columns = {}
+
+    def stations(self) -> list[str]:
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if (p / 'meta.json').exists())
+
+    def meta(self, station_id: str) -> dict | None:
+        if station_id not in self._meta:
+            meta_path = self.path / station_id / 'meta.json'
+            self._meta[station_id] = json.loads(meta_path.read_text()) if meta_path.exists() else None
+        return self._meta[station_id]
+
+    def column(self, station_id: str, code: str) -> np.ndarray:
+        """Memory-mapped column for a station/parameter (empty if not stored)."""
+        key = (station_id, code)
+        if key not in self._columns:
+            meta = self.meta(station_id)
+            path = self.path / station_id / f'{code}.f32'
+            if meta is None or meta['length'] == 0 or not path.exists():
+                self._columns[key] = np.empty(0, dtype=DTYPE)
+            else:
+                self._columns[key] = np.memmap(path, dtype=DTYPE, mode='r', shape=(meta['length'],))
+        return self._columns[key]
+
+    def lookup(self, station_id: str, iso_date: str) -> dict:
+        """
+        Daily values for one date as strings, None where missing.
+
+        Returns:
+            Dict of {'discharge': str|None, 'gage_height': str|None}
+        """
+        result = {name: None for name in COLUMNS.values()}
+        meta = self.meta(station_id) if station_id else None
+        if meta is None:
+            return result
+        try:
+            offset = day_number(iso_date) - meta['start_day']
+        except ValueError:
+            return result
+        if not 0 <= offset < meta['length']:
+            return result
+
+        for code, name in COLUMNS.items():
+            column = self.column(station_id, code)
+            if offset < len(column) and not np.isnan(column[offset]):
+                result[name] = format_value(column[offset])
+        return result
+
+    def write(self, station_id: str, first_day: int, columns: dict, append: bool = False):
+        """
+        Write (or append) columns for a station.
+
+        When appending, columns must start after the stored end; the gap, if
+        any, is filled with NaN.
+        """
+        station_dir = self.path / station_id
+        station_dir.mkdir(parents=True, exist_ok=True)
+        meta = self.meta(station_id) if append else None
+
+        if meta is None:
+            meta = {'station': station_id, 'start_day': first_day, 'length': 0, 'columns': {}}
+            mode = 'wb'
+            gap = 0
+        else:
+            mode = 'ab'
+            gap = first_day - (meta['start_day'] + meta['length'])
+            if gap < 0:
+                raise ValueError(f"Append for {station_id} overlaps stored days")
+
+        length = len(next(iter(columns.values())))
+        for code in COLUMNS:
+            column = columns.get(code, np.full(length, np.nan, dtype=DTYPE))
+            with open(station_dir / f'{code}.f32', mode) as f:
+                if mode == 'ab':
+                    # Drop any tail written after the last committed meta.json
+                    f.truncate(meta['length'] * DTYPE.itemsize)
+                    np.full(gap, np.nan, dtype=DTYPE).tofile(f)
+                column.astype(DTYPE).tofile(f)
+            meta['columns'][code] = COLUMNS[code]
+
+        meta['length'] += gap + length
+        meta['updated'] = date.today().isoformat()
+
+        tmp_path = station_dir / 'meta.json.tmp'
+        tmp_path.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_path, station_dir / 'meta.json')
+
+        self._meta[station_id] = meta
+        for code in COLUMNS:
+            self._columns.pop((station_id, code), None)
+
+
+def journal_stations() -> list[str]:
+    """Stations the journal's entries resolve to."""
+    entries = parse_sample_data(SAMPLE_DATA_PATH.read_text())
+    stations = {
+        get_station_for_stream(extract_field(entry, 'streamName'), extract_field(entry, 'riverStretch'))
+        for entry in entries
+    }
+    return sorted(station for station in stations if station)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download and query per-station USGS daily-value history')
+    parser.add_argument('command', choices=['download', 'update', 'lookup'])
+    parser.add_argument('args', nargs='*', help='lookup: STATION DATE')
+    parser.add_argument('--store', default=str(STORE_PATH), help='History store directory')
+    parser.add_argument('--stations', '-s', help='Comma-separated station IDs (default: stations used by sampleData.ts)')
+    parser.add_argument('--concurrency', '-j', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE)
+    parser.add_argument('--base-url', default=USGS_BASE_URL)
+    args = parser.parse_args()
+
+    store = HistoryStore(args.store)
+
+    if args.command == 'lookup':
+        if len(args.args) != 2:
+            parser.error('lookup needs STATION DATE')
+        station_id, iso_date = args.args
+        values = store.lookup(station_id, iso_date)
+        print(f"{station_id} {iso_date}: discharge={values['discharge']} cfs, gage height={values['gage_height']} ft")
+        return
+
+    today = date.today()
+    if args.command == 'download':
+        stations = args.stations.split(',') if args.stations else journal_stations()
+        tasks = [(station_id, HISTORY_START, today.isoformat(), False) for station_id in stations]
+    else:
+        tasks = []
+        for station_id in store.stations():
+            meta = store.meta(station_id)
+            next_day = date.fromordinal(meta['start_day'] + meta['length'] + EPOCH_ORDINAL)
+            if next_day <= today:
+                tasks.append((station_id, next_day.isoformat(), today.isoformat(), True))
+
+    print(f"Fetching daily-value history for {len(tasks)} stations...")
+    with PooledClient(args.base_url, concurrency=args.concurrency, rate=args.rate) as client:
+        results = client.map(lambda task: fetch_columns(client, *task[:3]), tasks)
+
+    for (station_id, start_date, end_date, append), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"  ❌ {station_id}: {result}")
+            continue
+        first_day, columns = result
+        if first_day is None:
+            print(f"  • {station_id}: no new values since {start_date}")
+            continue
+        store.write(station_id, first_day, columns, append=append)
+        meta = store.meta(station_id)
+        print(f"  • {station_id}: {day_to_iso(meta['start_day'])} → "
+              f"{day_to_iso(meta['start_day'] + meta['length'] - 1)} ({meta['length']} days)")
+
+    print("\n✨ Done!")
+
+
+if __name__ == '__main__':
+    main()
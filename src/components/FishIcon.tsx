@@ -1,4 +1,5 @@
 import { getFishIconPath, getIconPxSize, IconSize } from '../utils/fishIcons';
+import { OptimizedIcon } from './OptimizedIcon';
 
 interface FishIconProps {
   species: string;
@@ -19,15 +20,5 @@ export function FishIcon({
 
   const pxSize = getIconPxSize(size);
 
-  return (
-    <img
-      src={iconPath}
-      alt={species}
-      width={pxSize}
-      height={pxSize}
-      className={className}
-      style={{ objectFit: 'contain' }}
-      loading="lazy"
-    />
-  );
+  return <OptimizedIcon src={iconPath} alt={species} pxSize={pxSize} className={className} />;
 }
@@ -1,4 +1,5 @@
 import { getLureIconPath, getIconPxSize, IconSize } from '../utils/fishIcons';
+import { OptimizedIcon } from './OptimizedIcon';
 
 interface LureIconProps {
   bait: string;
@@ -19,15 +20,5 @@ export function LureIcon({
 
   const pxSize = getIconPxSize(size);
 
-  return (
-    <img
-      src={iconPath}
-      alt={bait}
-      width={pxSize}
-      height={pxSize}
-      className={className}
-      style={{ objectFit: 'contain' }}
-      loading="lazy"
-    />
-  );
+  return <OptimizedIcon src={iconPath} alt={bait} pxSize={pxSize} className={className} />;
 }
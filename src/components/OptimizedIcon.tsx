@@ -0,0 +1,43 @@
+import { useResponsiveManifest } from '../hooks/useResponsiveManifest';
+import { responsiveImages } from '../utils/responsiveImages';
+
+// Folder the icon optimizer writes responsive.json into
+const ICON_BASE_URL = '/icons';
+
+interface OptimizedIconProps {
+  src: string;
+  alt: string;
+  pxSize: number;
+  className?: string;
+}
+
+// An icon from optimize_icons.py: a <picture> with every generated format and
+// width (AVIF first when present), or the plain src until responsive.json loads
+export function OptimizedIcon({ src, alt, pxSize, className }: OptimizedIconProps) {
+  const manifest = useResponsiveManifest(ICON_BASE_URL);
+  const name = src.split('/').pop()?.replace(/\.[^.]+$/, '') ?? '';
+  const asset = manifest?.assets[name];
+
+  const img = (
+    <img
+      src={src}
+      alt={alt}
+      width={pxSize}
+      height={pxSize}
+      className={className}
+      style={{ objectFit: 'contain' }}
+      loading="lazy"
+    />
+  );
+
+  if (!manifest || !asset) return img;
+
+  return (
+    <picture>
+      {responsiveImages.pictureSources(manifest, asset).map(source => (
+        <source key={source.type} type={source.type} srcSet={source.srcSet} sizes={`${pxSize}px`} />
+      ))}
+      {img}
+    </picture>
+  );
+}
@@ -40,6 +40,7 @@ import { keyframes } from '@mui/material';
 import { LayoutGrid, List as ListIcon, Search, Trash2, MapPin, Calendar, Fish, Wind, Droplets, Anchor, FileText, X, ArrowUpDown, Users, Navigation, ChevronDown, ChevronLeft, ChevronRight, Edit2, Save, Camera } from 'lucide-react';
 import { FormData } from '../../types';
 import { useJournal } from '../../context/JournalContext';
+import { journalShards } from '../../utils/journalShards';
 import { journalPalette } from '../../theme/journalTheme';
 import { FishIcon } from '../FishIcon';
 import { LureIcon } from '../LureIcon';
@@ -213,8 +214,33 @@ export default function JournalEntryList() {
     setEditFormData(null);
   };
 
+  // Entries seeded from the journal summary fetch their shard once opened (or paged to)
+  React.useEffect(() => {
+    if (!selectedEntry || !journalShards.isSummaryEntry(selectedEntry)) return;
+    let cancelled = false;
+    const index = selectedEntryIndex;
+
+    journalShards.loadFullEntry(selectedEntry)
+      .then(entry => {
+        if (cancelled) return;
+        if (index !== null) {
+          dispatch({ type: 'UPDATE_ENTRY', payload: { index, entry } });
+        }
+        setSelectedEntry(entry);
+      })
+      .catch(error => {
+        if (!cancelled) {
+          setSnackbar({ open: true, message: error instanceof Error ? error.message : 'Failed to load entry', severity: 'error' });
+        }
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedEntry, selectedEntryIndex, dispatch]);
+
   const handleStartEdit = () => {
-    if (selectedEntry) {
+    // Editing a summary-seeded entry before its shard arrives would save the notes excerpt
+    if (selectedEntry && !journalShards.isSummaryEntry(selectedEntry)) {
       setEditFormData({ ...selectedEntry });
       setIsEditing(true);
     }
@@ -1,13 +1,26 @@
 import React, { createContext, useContext, useReducer, ReactNode, useEffect } from 'react';
 import { FormData } from '../types';
-import { sampleEntries } from '../data/sampleData';
 import { storageUtils } from '../utils/storage';
+import { journalShards } from '../utils/journalShards';
 
 // Increment this when sample data changes to force a refresh
 const SAMPLE_DATA_VERSION = 4;
 
 type PageFlipStyle = '3d' | 'classic';
 
+// Sample entries from the exported journal summary (npm run export:journal);
+// each entry's shard is only fetched when it is opened. Without an export,
+// falls back to sampleData.ts, which is split out of the startup bundle
+const loadSampleEntries = async (): Promise<FormData[]> => {
+  try {
+    const summary = await journalShards.loadSummary();
+    return summary.map(journalShards.summaryEntry);
+  } catch {
+    const { sampleEntries } = await import('../data/sampleData');
+    return sampleEntries;
+  }
+};
+
 interface JournalState {
   entries: FormData[];
   error: string | null;
@@ -36,7 +49,7 @@ const initialState: JournalState = {
 const JournalContext = createContext<{
   state: JournalState;
   dispatch: React.Dispatch<JournalAction>;
-  exportEntries: () => void;
+  exportEntries: () => Promise<void>;
   importEntries: (file: File) => Promise<void>;
   clearEntries: () => void;
   toggleDarkMode: () => void;
@@ -132,9 +145,9 @@ function journalReducer(state: JournalState, action: JournalAction): JournalStat
 export function JournalProvider({ children }: { children: ReactNode }) {
   const [state, dispatch] = useReducer(journalReducer, initialState);
 
-  const exportEntries = () => {
+  const exportEntries = async () => {
     try {
-      storageUtils.exportEntries();
+      storageUtils.exportEntries(await journalShards.loadFullEntries(state.entries));
     } catch (error) {
       dispatch({ 
         type: 'SET_ERROR', 
@@ -175,32 +188,45 @@ export function JournalProvider({ children }: { children: ReactNode }) {
     dispatch({ type: 'TOGGLE_PAGE_FLIP_STYLE' });
   };
 
-  // Load entries from localStorage on mount, with version check
+  // Load entries from localStorage on mount, with version check; sample
+  // entries are only fetched when they are actually needed
   useEffect(() => {
-    try {
-      const storedVersion = localStorage.getItem('sampleDataVersion');
-      const currentVersion = SAMPLE_DATA_VERSION.toString();
-
-      // If version changed or no version stored, reload sample data
-      if (storedVersion !== currentVersion) {
-        localStorage.setItem('sampleDataVersion', currentVersion);
-        storageUtils.saveEntries(sampleEntries);
-        dispatch({ type: 'LOAD_ENTRIES', payload: sampleEntries });
-        return;
+    let cancelled = false;
+
+    const load = async () => {
+      try {
+        const storedVersion = localStorage.getItem('sampleDataVersion');
+        const currentVersion = SAMPLE_DATA_VERSION.toString();
+
+        // If version changed or no version stored, reload sample data
+        if (storedVersion !== currentVersion) {
+          const sampleEntries = await loadSampleEntries();
+          if (cancelled) return;
+          localStorage.setItem('sampleDataVersion', currentVersion);
+          storageUtils.saveEntries(sampleEntries);
+          dispatch({ type: 'LOAD_ENTRIES', payload: sampleEntries });
+          return;
+        }
+
+        const entries = storageUtils.loadEntries();
+        const payload = entries.length === 0 ? await loadSampleEntries() : entries;
+        if (!cancelled) {
+          dispatch({ type: 'LOAD_ENTRIES', payload });
+        }
+      } catch (error) {
+        if (!cancelled) {
+          dispatch({
+            type: 'SET_ERROR',
+            payload: error instanceof Error ? error.message : 'Failed to load entries'
+          });
+        }
       }
+    };
 
-      const entries = storageUtils.loadEntries();
-      if (entries.length === 0) {
-        dispatch({ type: 'LOAD_ENTRIES', payload: sampleEntries });
-      } else {
-        dispatch({ type: 'LOAD_ENTRIES', payload: entries });
-      }
-    } catch (error) {
-      dispatch({
-        type: 'SET_ERROR',
-        payload: error instanceof Error ? error.message : 'Failed to load entries'
-      });
-    }
+    load();
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
   return (
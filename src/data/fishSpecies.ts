@@ -8,6 +8,8 @@ export const fishSpecies = {
     'Striped Bass',
     'Hybrid Striped Bass',
     'Walleye',
+    'Sauger',
+    'Saugeye',
     'Rainbow Trout',
     'Brown Trout',
     'Cutthroat Trout',
@@ -23,6 +25,8 @@ export const fishSpecies = {
     'Green Sunfish',
     'Redear Sunfish',
     'Rock Bass',
+    'Shadow Bass',
+    'Longear Sunfish',
     'Warmouth',
     'Yellow Perch',
   ] as const,
@@ -0,0 +1,32 @@
+import { useEffect, useState } from 'react';
+import { ResponsiveManifest, responsiveImages } from '../utils/responsiveImages';
+
+// Settled manifests per folder (null = missing), so icons mounted later render <picture> right away
+const settled = new Map<string, ResponsiveManifest | null>();
+
+// The folder's responsive.json, or null until it has loaded (or when it doesn't exist)
+export function useResponsiveManifest(baseUrl: string): ResponsiveManifest | null {
+  const [manifest, setManifest] = useState<ResponsiveManifest | null>(() => settled.get(baseUrl) ?? null);
+
+  useEffect(() => {
+    if (settled.has(baseUrl)) {
+      setManifest(settled.get(baseUrl) ?? null);
+      return;
+    }
+    let cancelled = false;
+    responsiveImages.loadManifest(baseUrl)
+      .then(loaded => {
+        settled.set(baseUrl, loaded);
+        if (!cancelled) setManifest(loaded);
+      })
+      .catch(() => {
+        // No optimizer output here yet: keep the plain <img> paths
+        settled.set(baseUrl, null);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [baseUrl]);
+
+  return manifest;
+}
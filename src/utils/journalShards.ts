@@ -0,0 +1,154 @@
+import { FormData } from '../types';
+
+// Written by scripts/export_shards.py (npm run export:journal)
+const SHARD_BASE_URL = '/data/journal/';
+
+export interface ShardFile {
+  file: string;
+  hash: string;
+  bytes: number;
+}
+
+export interface JournalShard extends ShardFile {
+  name: string;
+  entries: number;
+  firstDate: string;
+  lastDate: string;
+}
+
+export interface JournalManifest {
+  version: number;
+  entries: number;
+  summary: ShardFile;
+  shards: JournalShard[];
+}
+
+// One row of the summary shard: enough for lists and stats, notes cut to an excerpt
+export interface EntrySummary {
+  key: string;
+  date: string;
+  stream: string;
+  stretch: string;
+  species: string;
+  count: string;
+  bait: string;
+  weather: string;
+  windSpeed: string;
+  windDirection: string;
+  flow: string;
+  waterTemp: string;
+  clarity: string;
+  excerpt: string;
+  shard: string;
+}
+
+export type ShardEntry = FormData & { key: string };
+
+// A journal entry seeded from its summary row; the rest is in its shard
+export type SummaryEntry = FormData & { shardKey: string; shard: string };
+
+const withoutKey = (entry: ShardEntry): FormData => {
+  const formData: FormData & { key?: string } = { ...entry };
+  delete formData.key;
+  return formData;
+};
+
+const fetchJson = async <T>(file: string): Promise<T> => {
+  const response = await fetch(`${SHARD_BASE_URL}${file}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${file}: ${response.status}`);
+  }
+  return response.json();
+};
+
+let manifestPromise: Promise<JournalManifest> | null = null;
+const shardPromises = new Map<string, Promise<ShardEntry[]>>();
+
+export const journalShards = {
+  // The manifest is small and unhashed; every other file is named by its content hash
+  loadManifest: (): Promise<JournalManifest> => {
+    if (!manifestPromise) {
+      manifestPromise = fetchJson<JournalManifest>('manifest.json').catch(error => {
+        manifestPromise = null;
+        throw error;
+      });
+    }
+    return manifestPromise;
+  },
+
+  // Everything the app needs at startup
+  loadSummary: async (): Promise<EntrySummary[]> => {
+    const manifest = await journalShards.loadManifest();
+    return fetchJson<EntrySummary[]>(manifest.summary.file);
+  },
+
+  // Full entries (notes included) of one shard, fetched once
+  loadShard: async (name: string): Promise<ShardEntry[]> => {
+    const manifest = await journalShards.loadManifest();
+    const shard = manifest.shards.find(s => s.name === name);
+    if (!shard) {
+      throw new Error(`Unknown journal shard: ${name}`);
+    }
+    let promise = shardPromises.get(shard.file);
+    if (!promise) {
+      promise = fetchJson<ShardEntry[]>(shard.file).catch(error => {
+        shardPromises.delete(shard.file);
+        throw error;
+      });
+      shardPromises.set(shard.file, promise);
+    }
+    return promise;
+  },
+
+  // The full entry behind a summary row
+  loadEntry: async (summary: Pick<EntrySummary, 'key' | 'shard'>): Promise<ShardEntry | undefined> => {
+    const entries = await journalShards.loadShard(summary.shard);
+    return entries.find(entry => entry.key === summary.key);
+  },
+
+  // What the journal holds until an entry is opened: no pictures, notes cut to the excerpt
+  summaryEntry: (summary: EntrySummary): SummaryEntry => ({
+    date: summary.date,
+    streamName: summary.stream,
+    riverStretch: summary.stretch,
+    tripMembers: '',
+    windVelocity: summary.windSpeed,
+    windDirection: summary.windDirection,
+    weatherConditions: summary.weather,
+    waterClarity: summary.clarity,
+    usgsGauge: '',
+    flowRate: summary.flow,
+    riverDepth: '',
+    waterTemperature: summary.waterTemp,
+    fishSpecies: summary.species,
+    numberCaught: summary.count,
+    baitUsed: summary.bait,
+    notes: summary.excerpt,
+    pictures: [],
+    wifesMood: '',
+    airTempHigh: '',
+    airTempLow: '',
+    barometricPressure: '',
+    moonPhase: '',
+    precipitation: '',
+    shardKey: summary.key,
+    shard: summary.shard,
+  }),
+
+  isSummaryEntry: (entry: FormData): entry is SummaryEntry => 'shardKey' in entry,
+
+  // The complete entry (notes, pictures, weather) for one opened from the summary
+  loadFullEntry: async (entry: SummaryEntry): Promise<FormData> => {
+    const full = await journalShards.loadEntry({ key: entry.shardKey, shard: entry.shard });
+    if (!full) {
+      throw new Error(`Journal entry ${entry.shardKey} is missing from shard ${entry.shard}`);
+    }
+    return withoutKey(full);
+  },
+
+  // Entries with every summary-seeded one completed, for exporting the whole journal
+  loadFullEntries: (entries: FormData[]): Promise<FormData[]> =>
+    Promise.all(entries.map(entry =>
+      journalShards.isSummaryEntry(entry) ? journalShards.loadFullEntry(entry) : entry
+    )),
+};
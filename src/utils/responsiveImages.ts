@@ -0,0 +1,83 @@
+// Written next to the sized folders by optimize_icons.py and scripts/optimize_images.py
+// (see scripts/responsive_manifest.py), e.g. /icons/responsive.json
+const MANIFEST_NAME = 'responsive.json';
+
+export type ImageFormat = 'avif' | 'webp' | 'png';
+
+export interface ImageSource {
+  src: string;
+  width: number;
+  height: number;
+  bytes: number;
+}
+
+export interface ResponsiveAsset {
+  // Intrinsic dimensions of the original
+  width: number;
+  height: number;
+  original?: string;
+  // In order of preference; each list is sorted by width
+  sources: Partial<Record<ImageFormat, ImageSource[]>>;
+}
+
+export interface ResponsiveManifest {
+  version: number;
+  // Format -> MIME type, in order of preference
+  formats: Record<ImageFormat, string>;
+  assets: Record<string, ResponsiveAsset>;
+}
+
+const manifestPromises = new Map<string, Promise<ResponsiveManifest>>();
+
+export const responsiveImages = {
+  // One fetch per image folder, e.g. loadManifest('/icons')
+  loadManifest: (baseUrl: string): Promise<ResponsiveManifest> => {
+    let promise = manifestPromises.get(baseUrl);
+    if (!promise) {
+      promise = fetch(`${baseUrl.replace(/\/$/, '')}/${MANIFEST_NAME}`)
+        .then(response => {
+          if (!response.ok) {
+            throw new Error(`Failed to load ${baseUrl}/${MANIFEST_NAME}: ${response.status}`);
+          }
+          return response.json() as Promise<ResponsiveManifest>;
+        })
+        .catch(error => {
+          manifestPromises.delete(baseUrl);
+          throw error;
+        });
+      manifestPromises.set(baseUrl, promise);
+    }
+    return promise;
+  },
+
+  // "a.avif 32w, b.avif 64w" for an <img>/<source> srcset
+  srcSet: (sources: ImageSource[]): string =>
+    sources.map(source => `${source.src} ${source.width}w`).join(', '),
+
+  // <source type srcSet> entries for a <picture>, preferred format first
+  pictureSources: (
+    manifest: ResponsiveManifest,
+    asset: ResponsiveAsset
+  ): { type: string; srcSet: string }[] =>
+    (Object.keys(asset.sources) as ImageFormat[]).map(format => ({
+      type: manifest.formats[format],
+      srcSet: responsiveImages.srcSet(asset.sources[format] ?? []),
+    })),
+
+  // Fewest bytes at least minWidth wide (or the widest available) among the formats the browser supports
+  smallestSource: (
+    asset: ResponsiveAsset,
+    minWidth: number,
+    supported: ImageFormat[] = ['webp', 'png']
+  ): ImageSource | undefined => {
+    const candidates = supported.flatMap(format => {
+      const sources = asset.sources[format] ?? [];
+      const wideEnough = sources.filter(source => source.width >= minWidth);
+      return wideEnough.length ? wideEnough : sources.slice(-1);
+    });
+    const widest = Math.max(0, ...candidates.map(source => Math.min(source.width, minWidth)));
+    return candidates
+      .filter(source => Math.min(source.width, minWidth) === widest)
+      .sort((a, b) => a.bytes - b.bytes)[0];
+  },
+};
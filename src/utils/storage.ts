@@ -25,9 +25,8 @@ export const storageUtils = {
   },
 
   // Export entries as JSON file
-  exportEntries: (): void => {
+  exportEntries: (entries: FormData[] = storageUtils.loadEntries()): void => {
     try {
-      const entries = storageUtils.loadEntries();
       const dataStr = JSON.stringify(entries, null, 2);
       const dataUri = `data:application/json;charset=utf-8,${encodeURIComponent(dataStr)}`;
       
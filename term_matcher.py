@@ -0,0 +1,318 @@
+"""
+Aho-Corasick matcher for the diary's species, lure and weather vocabularies.
+
+All terms are compiled once into a single automaton, so finding every
+vocabulary term in a text is one left-to-right pass whose cost depends on
+the text length (plus the matches found), not on how many terms there are.
+Matching is case-insensitive and, by default, respects word boundaries:
+"Spot" does not match inside "Spotted" or "spotlight". Overlapping hits are
+resolved leftmost-longest, so "Smallmouth Bass" counts once as itself and
+not also as "Smallmouth".
+
+Every spelling resolves to a canonical label: species to the names in
+src/data/fishSpecies.ts ("Smallie", "Brownie" → "Smallmouth Bass"), lures
+to one entry of the lure list ("BSR", "PSR" → "Shad Rap"). species_caught()
+reads the counts written in front of species mentions off the same matches.
+
+Usage:
+    matcher = diary_matcher()
+    for match in matcher.find(text):
+        print(match.start, match.end, match.category, match.label)
+    matcher.count(text)    # {'species': Counter({'Smallmouth Bass': 40, ...}), 'lure': ..., 'weather': ...}
+    species_caught(text, matcher.find(text))    # [{'species': 'Smallmouth Bass', 'count': 40}, ...]
+"""
+
+import re
+from collections import Counter, deque
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+# Canonical species names live in the app's species list; every name there
+# is matched as written (plus plural), and these aliases resolve to one of them
+FISH_SPECIES_PATH = Path(__file__).parent / "src" / "data" / "fishSpecies.ts"
+
+SPECIES_ALIASES = {
+    "Smallmouth": "Smallmouth Bass", "Smallie": "Smallmouth Bass",
+    "Brownie": "Smallmouth Bass", "Brown Bass": "Smallmouth Bass",    # Ozark names
+    "Spot": "Spotted Bass",
+    "Largemouth": "Largemouth Bass", "Black Bass": "Largemouth Bass", "Black": "Largemouth Bass",
+    "Rainbow": "Rainbow Trout", "Trout": "Rainbow Trout",              # Spring River's stocked trout
+    "Eyes": "Walleye",
+    "Rocker": "Rock Bass", "Goggle Eye": "Rock Bass",
+    "Bream": "Bluegill", "Longear": "Longear Sunfish",
+    "Catfish": "Channel Catfish", "Carp": "Common Carp",
+    "Striper": "Striped Bass", "Hybrid": "Hybrid Striped Bass", "Hybrid Striper": "Hybrid Striped Bass",
+}
+# Aliases that are also everyday words ("a good spot", "black water", "my
+# eyes"): species_caught() only takes them with a number in front ("6 eyes")
+COUNT_ONLY_ALIASES = {"Black", "Eyes", "Spot", "Trout"}
+
+# Lure spellings and the canonical lure each one names
+LURES = {
+    "Shad Rap": "Shad Rap", "BSR": "Shad Rap", "PSR": "Shad Rap",    # blue / perch Shad Rap
+    "Flicker Shad": "Flicker Shad",
+    "Crankbait": "Crankbait", "Square Bill": "Crankbait", "Cranker": "Crankbait",
+    "BCW": "BCW",
+    "Jig": "Jig", "Hair Jig": "Hair Jig",
+    "Jig and Pig": "Jig and Pig", "Jig and Peed": "Jig and Pig", "Jig Peed": "Jig and Pig",
+    "GGO": "Jig and Pig",                                              # Gord Green Orange jig and peed
+    "Centipede": "Centipede", "Tube": "Tube",
+    "Nightcrawler": "Nightcrawler", "Crawler": "Nightcrawler", "Worm": "Nightcrawler",
+    "Plastic Worm": "Plastic Worm",
+    "Spoon": "Spoon", "Minnow": "Minnow",
+}
+
+# Weather words and the condition each one reports
+WEATHER = {
+    "sunny": "Sunny",
+    "cloudy": "Cloudy", "clouds": "Cloudy", "overcast": "Cloudy",
+    "rain": "Rain", "rains": "Rain", "rained": "Rain", "raining": "Rain", "rainy": "Rain",
+    "wind": "Windy", "winds": "Windy", "windy": "Windy",
+    "cool": "Cool", "cooler": "Cool",
+    "warm": "Warm", "warmer": "Warm", "warmed": "Warm", "warming": "Warm",
+}
+
+SPECIES_NAME = re.compile(r"'([^']+)'")
+
+# A count right before a species mention: "40 Smallmouth", "3 good brownies",
+# "two walleyes"; at most two plain words may sit between them
+QUANTITY = re.compile(
+    r"(?<![\w.,/])(\d+|a|an|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)"
+    r"\s+((?:[A-Za-z]+\s+){0,2})$",
+    re.IGNORECASE,
+)
+NUMBER_WORDS = {
+    'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+SINGULAR_WORDS = {'a', 'an', 'one'}
+# Words that make the number a size ("3 lb. brownie") or a count of
+# something else ("47 fish including rockers")
+BREAK_WORDS = {
+    'lb', 'lbs', 'pound', 'pounds', 'oz', 'inch', 'inches', 'in', 'foot', 'feet', 'ft',
+    'fish', 'including', 'included', 'and', 'or', 'of', 'the', 'with', 'were', 'was',
+}
+QUANTITY_WINDOW = 40
+
+
+class TermMatch(NamedTuple):
+    start: int
+    end: int
+    category: str
+    label: str
+    text: str
+
+
+def with_plurals(terms: list[str] | dict[str, str]) -> dict[str, str]:
+    """Map each term and its plain '-s' plural to its label ('Smallies' → 'Smallie').
+
+    A list labels each term with itself; a dict gives the label per term.
+    """
+    if not isinstance(terms, dict):
+        terms = {term: term for term in terms}
+    vocabulary = {}
+    for term, label in terms.items():
+        vocabulary[term] = label
+        if not term.endswith('s'):
+            vocabulary.setdefault(term + 's', label)
+    return vocabulary
+
+
+def fish_species(path: Path = FISH_SPECIES_PATH) -> list[str]:
+    """Canonical species names from the fishSpecies object in fishSpecies.ts."""
+    source = path.read_text(encoding='utf-8')
+    block = source[source.index('export const fishSpecies'):]
+    block = block[:block.index('} as const;')]
+    return SPECIES_NAME.findall(block)
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text without changing its length, so offsets map back to the original."""
+    folded = text.lower()
+    if len(folded) != len(text):
+        folded = ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    return folded
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over categorized vocabularies.
+
+    Args:
+        vocabularies: Dict of {category: {term: label}}; every spelling of a
+            term maps to the label reported for it
+        word_boundaries: Only accept matches not embedded in a longer word
+    """
+
+    def __init__(self, vocabularies: dict[str, dict[str, str]], word_boundaries: bool = True):
+        self.word_boundaries = word_boundaries
+        self.categories = list(vocabularies)
+        # Label order per category, for stable output
+        self.label_order = {
+            category: list(dict.fromkeys(terms.values()))
+            for category, terms in vocabularies.items()
+        }
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for category, terms in vocabularies.items():
+            for term, label in terms.items():
+                self._add(fold_case(term), category, label)
+        self._link()
+
+    def _add(self, term: str, category: str, label: str):
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._output[state] += ((len(term), category, label),)
+
+    def _link(self):
+        """Fill failure links breadth-first and merge outputs along them."""
+        goto, fail, output = self._goto, self._fail, self._output
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[next_state] = goto[f].get(ch, 0)
+                output[next_state] += output[fail[next_state]]
+
+    def _at_boundary(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and text[start - 1].isalnum() and text[start].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum() and text[end - 1].isalnum():
+            return False
+        return True
+
+    def find(self, text: str) -> list[TermMatch]:
+        """Every non-overlapping vocabulary match in text, leftmost-longest, in order."""
+        folded = fold_case(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        check_boundaries = self.word_boundaries
+
+        hits = []
+        state = 0
+        for end, ch in enumerate(folded, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, category, label in output[state]:
+                start = end - length
+                if check_boundaries and not self._at_boundary(folded, start, end):
+                    continue
+                hits.append((start, -end, category, label))
+
+        matches = []
+        last_end = 0
+        for start, neg_end, category, label in sorted(hits):
+            if start >= last_end:
+                last_end = -neg_end
+                matches.append(TermMatch(start, last_end, category, label, text[start:last_end]))
+        return matches
+
+    def count(self, text: str) -> dict[str, Counter]:
+        """Match counts per label, grouped by category."""
+        return self.tally(self.find(text))
+
+    def tally(self, matches: list[TermMatch]) -> dict[str, Counter]:
+        counts = {category: Counter() for category in self.categories}
+        for match in matches:
+            counts[match.category][match.label] += 1
+        return counts
+
+    def labels(self, matches: list[TermMatch], category: str) -> list[str]:
+        """Distinct labels of one category among matches, in vocabulary order."""
+        found = {match.label for match in matches if match.category == category}
+        return [label for label in self.label_order[category] if label in found]
+
+
+@lru_cache(maxsize=None)
+def diary_matcher() -> TermMatcher:
+    """The shared matcher over the species, lure and weather vocabularies (built once)."""
+    species = fish_species()
+    unknown = sorted(set(SPECIES_ALIASES.values()) - set(species))
+    if unknown:
+        raise ValueError(f"Species aliases name species missing from {FISH_SPECIES_PATH.name}: {unknown}")
+    return TermMatcher({
+        'species': {**with_plurals(species), **with_plurals(SPECIES_ALIASES)},
+        'lure': with_plurals(LURES),
+        'weather': WEATHER,
+    })
+
+
+def mention_count(text: str, start: int) -> tuple[int, bool] | None:
+    """
+    Count written just before a species mention at text[start:].
+
+    Returns:
+        (count, singular) where singular marks an article ("a", "an", "one"
+        → (1, True)), or None when no count is written
+    """
+    match = QUANTITY.search(text, max(0, start - QUANTITY_WINDOW), start)
+    if match is None:
+        return None
+    if any(word.lower().rstrip('.') in BREAK_WORDS for word in match.group(2).split()):
+        return None
+    number = match.group(1).lower()
+    if number in SINGULAR_WORDS:
+        return 1, True
+    count = NUMBER_WORDS.get(number)
+    return (int(number) if count is None else count), False
+
+
+def species_caught(text: str, matches: list[TermMatch]) -> list[dict]:
+    """
+    Species mentioned in text with their counts, in order of first mention.
+
+    Counts written as numbers ("40 smallies", "two walleyes") add up across
+    mentions; a lone "a brownie" / "one brownie" counts 1 only when the species
+    has no numbered mention, since it usually refers back to fish already
+    counted. Species mentioned without a count have no "count" key. Names used
+    as lure colors ("brown/black jig", "yellow perch Shad Rap"), mentions
+    with a zero count ("0 walleye") and COUNT_ONLY_ALIASES without a number
+    are skipped.
+
+    Returns:
+        [{"species": canonical name, "count": n}, ...]
+    """
+    count_only = {term.lower() for term in with_plurals(sorted(COUNT_ONLY_ALIASES))}
+    counts = {}
+    singular = set()
+    for i, match in enumerate(matches):
+        if match.category != 'species':
+            continue
+        if text[match.start - 1:match.start] == '/' or text[match.end:match.end + 1] == '/':
+            continue
+        mention = mention_count(text, match.start)
+        count, is_singular = mention or (None, False)
+        if count == 0:
+            continue
+        if match.text.lower() in count_only and (count is None or is_singular):
+            continue
+        following = matches[i + 1] if i + 1 < len(matches) else None
+        if count is None and following and following.category == 'lure' and not text[match.end:following.start].strip():
+            continue
+        counts.setdefault(match.label, None)
+        if is_singular:
+            singular.add(match.label)
+        elif count is not None:
+            counts[match.label] = (counts[match.label] or 0) + count
+
+    caught = []
+    for species, count in counts.items():
+        if count is None and species in singular:
+            count = 1
+        caught.append({"species": species, "count": count} if count is not None else {"species": species})
+    return caught
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from build_manifest import MANIFEST_NAME, BuildManifest, file_digest  # noqa: E402
+
+SETTINGS = {'sizes': {'sm': 32}, 'quality': 90}
+
+
+def write(path: Path, data: bytes = b'x') -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_current_until_bytes_settings_or_outputs_change(tmp_path):
+    source = write(tmp_path / 'src' / 'bass.png', b'bass')
+    output = write(tmp_path / 'out' / 'sm' / 'bass.webp')
+    digest = file_digest(source)
+
+    manifest = BuildManifest(tmp_path / 'out', 'optimize_images', SETTINGS)
+    assert not manifest.is_current('bass.png', digest)
+    manifest.record('bass.png', digest, [output])
+    manifest.save()
+
+    reloaded = BuildManifest(tmp_path / 'out', 'optimize_images', SETTINGS)
+    assert reloaded.is_current('bass.png', digest)
+    assert not reloaded.is_current('bass.png', file_digest(write(source, b'edited')))
+    assert not BuildManifest(tmp_path / 'out', 'optimize_images', {**SETTINGS, 'quality': 80}).is_current('bass.png', digest)
+    # Another tool sharing the directory has its own record
+    assert not BuildManifest(tmp_path / 'out', 'optimize_icons', SETTINGS).is_current('bass.png', digest)
+
+    output.unlink()
+    assert not reloaded.is_current('bass.png', digest)
+
+
+def test_params_are_kept_for_the_same_bytes_and_settings(tmp_path):
+    manifest = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    manifest.record('bass.png', 'abc', [write(tmp_path / 'sm' / 'bass.webp')], params={'sm': {'quality': 72}})
+    assert manifest.params('bass.png', 'abc') == {'sm': {'quality': 72}}
+    assert manifest.params('bass.png', 'def') is None
+    assert BuildManifest(tmp_path, 'optimize_images', {**SETTINGS, 'quality': 80}).params('bass.png', 'abc') is None
+
+
+def test_record_deletes_outputs_no_longer_produced(tmp_path):
+    webp = write(tmp_path / 'sm' / 'bass.webp')
+    png = write(tmp_path / 'sm' / 'bass.png')
+    manifest = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    manifest.record('bass.png', 'abc', [webp, png])
+
+    assert manifest.record('bass.png', 'def', [webp]) == [png]
+    assert webp.exists() and not png.exists()
+
+
+def test_prune_deletes_outputs_of_removed_sources(tmp_path):
+    bass = write(tmp_path / 'sm' / 'bass.webp')
+    gar = write(tmp_path / 'sm' / 'gar.webp')
+    manifest = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    manifest.record('bass.png', 'abc', [bass])
+    manifest.record('gar.png', 'def', [gar])
+
+    assert manifest.prune(['bass.png']) == [gar]
+    assert bass.exists() and not gar.exists()
+    assert list(manifest.sources) == ['bass.png']
+
+
+def test_outputs_shared_with_another_tool_are_kept(tmp_path):
+    shared = write(tmp_path / 'sm' / 'bass.webp')
+    own = write(tmp_path / 'sm' / 'bass.png')
+
+    images = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    images.record('bass.png', 'abc', [shared, own])
+    images.save()
+    icons = BuildManifest(tmp_path, 'optimize_icons', SETTINGS)
+    icons.record('bass.png', 'abc', [shared])
+    icons.save()
+
+    images = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    assert images.prune([]) == [own]
+    assert shared.exists()
+    images.save()
+
+    # Once the last tool listing it lets go, the shared output is deleted
+    icons = BuildManifest(tmp_path, 'optimize_icons', SETTINGS)
+    assert icons.prune([]) == [shared]
+    assert not shared.exists()
+
+
+def test_all_outputs_merges_tools(tmp_path):
+    webp = write(tmp_path / 'sm' / 'bass.webp')
+    avif = write(tmp_path / 'sm' / 'bass.avif')
+    images = BuildManifest(tmp_path, 'optimize_images', SETTINGS)
+    images.record('bass.png', 'abc', [webp])
+    images.save()
+    icons = BuildManifest(tmp_path, 'optimize_icons', SETTINGS)
+    icons.record('bass.png', 'abc', [avif, webp])
+    assert icons.all_outputs() == {'bass.png': ['sm/bass.avif', 'sm/bass.webp']}
+
+
+def test_unreadable_or_old_manifest_starts_fresh(tmp_path):
+    write(tmp_path / MANIFEST_NAME, b'{not json')
+    assert BuildManifest(tmp_path, 'optimize_images', SETTINGS).sources == {}
+    write(tmp_path / MANIFEST_NAME, b'{"version": 0, "tools": {"optimize_images": {"a": {}}}}')
+    assert BuildManifest(tmp_path, 'optimize_images', SETTINGS).sources == {}
@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from journal_index import JournalIndex, build, decode_varints, encode_varints, parse_query  # noqa: E402
+
+
+def doc(key, date, text, source='journal', title='Spring River'):
+    return {'key': key, 'source': source, 'date': date, 'title': title, 'text': text}
+
+
+DOCS = [
+    doc('journal:1994-10-07', '1994-10-07', 'Caught a walleye on a Shad Rap near the Trophy Hole.'),
+    doc('journal:2011-06-24', '2011-06-24', 'Smallmouth on a jig and pig, then a walleye at dusk.'),
+    doc('voiced:2015-03-01', '2015-03-01', 'The Trophy Hole gave up nothing but a sauger.', source='voiced'),
+]
+
+
+def keys(index, docs):
+    return [index.document(number)['key'] for number in docs]
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 2 ** 32, 2 ** 40 + 5], dtype=np.uint64)
+    assert decode_varints(encode_varints(values)).tolist() == values.tolist()
+    assert len(encode_varints(np.array([127, 128], dtype=np.uint64))) == 3
+
+
+def test_parse_query():
+    assert parse_query('a "b c" OR d') == [[['a'], ['b', 'c']], [['d']]]
+    assert parse_query('OR walleye OR') == [[['walleye']]]
+
+
+def test_words_phrases_and_or(tmp_path):
+    build(tmp_path, DOCS)
+    index = JournalIndex(tmp_path)
+
+    assert keys(index, index.search('walleye')) == ['journal:1994-10-07', 'journal:2011-06-24']
+    assert keys(index, index.search('"trophy hole"')) == ['journal:1994-10-07', 'voiced:2015-03-01']
+    assert keys(index, index.search('"hole trophy"')) == []
+    assert keys(index, index.search('"jig and pig"')) == ['journal:2011-06-24']
+    assert keys(index, index.search('walleye trophy')) == ['journal:1994-10-07']
+    assert keys(index, index.search('sauger OR smallmouth')) == ['journal:2011-06-24', 'voiced:2015-03-01']
+    assert keys(index, index.search('muskie')) == []
+    index.close()
+
+
+def test_date_and_source_filters(tmp_path):
+    build(tmp_path, DOCS)
+    index = JournalIndex(tmp_path)
+
+    assert keys(index, index.search('trophy', start_date='2000-01-01')) == ['voiced:2015-03-01']
+    assert keys(index, index.search('walleye', end_date='2000-01-01')) == ['journal:1994-10-07']
+    assert keys(index, index.search('trophy', source='journal')) == ['journal:1994-10-07']
+    index.close()
+
+
+def test_incremental_build_only_indexes_changes(tmp_path):
+    assert build(tmp_path, DOCS) == {'added': 3, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    assert build(tmp_path, DOCS) == {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 3}
+    assert len(list(tmp_path.glob('seg-*.idx'))) == 1
+
+    edited = [
+        DOCS[0],
+        doc('journal:2011-06-24', '2011-06-24', 'Smallmouth on a crawdad, no walleye today... a muskie!'),
+        doc('journal:2020-05-01', '2020-05-01', 'First muskie on the Eleven Point.'),
+    ]
+    assert build(tmp_path, edited) == {'added': 1, 'changed': 1, 'removed': 1, 'unchanged': 1}
+    assert len(list(tmp_path.glob('seg-*.idx'))) == 2
+
+    index = JournalIndex(tmp_path)
+    # The superseded text and the removed document no longer match
+    assert keys(index, index.search('"jig and pig"')) == []
+    assert keys(index, index.search('sauger')) == []
+    assert keys(index, index.search('muskie')) == ['journal:2011-06-24', 'journal:2020-05-01']
+    assert index.document(index.search('crawdad')[0])['text'] == edited[1]['text']
+    index.close()
+
+
+def test_rebuild_compacts_into_one_segment(tmp_path):
+    build(tmp_path, DOCS)
+    build(tmp_path, DOCS[:2] + [doc('journal:2020-05-01', '2020-05-01', 'muskie')])
+    assert build(tmp_path, DOCS, rebuild=True)['added'] == 3
+    assert [path.name for path in tmp_path.glob('seg-*.idx')] == ['seg-0001.idx']
+
+    index = JournalIndex(tmp_path)
+    assert len(index.deleted) == 0
+    assert keys(index, index.search('sauger')) == ['voiced:2015-03-01']
+    index.close()
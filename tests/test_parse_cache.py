@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import parse_cache  # noqa: E402
+from parse_cache import ParseCache  # noqa: E402
+from parse_diary import iter_entries  # noqa: E402
+
+LINES = [
+    "6/24/2011 – Teal/Manis – Spring River, caught 3 smallmouth on a crawdad\n",
+    "10/7/1994 – Westfall – Eleven Point River, 2 rainbow trout\n",
+]
+
+
+def parse(cache, lines=LINES):
+    return list(iter_entries(lines, cache=cache))
+
+
+def test_rerun_hits_the_cache(tmp_path):
+    path = tmp_path / 'parse.sqlite3'
+    cache = ParseCache(path)
+    first = parse(cache)
+    assert len(cache.changed_ids) == 2
+    cache.commit()
+    cache.close()
+
+    cache = ParseCache(path)
+    assert parse(cache) == first
+    assert cache.hits == 2
+    assert cache.changed_ids == []
+
+
+def test_edited_line_is_parsed_again(tmp_path):
+    path = tmp_path / 'parse.sqlite3'
+    cache = ParseCache(path)
+    parse(cache)
+    cache.commit()
+
+    edited = [LINES[0], LINES[1].replace("2 rainbow", "4 rainbow")]
+    cache = ParseCache(path)
+    entries = parse(cache, edited)
+    assert cache.hits == 1
+    assert cache.changed_ids == [entries[1]["id"]]
+    assert cache.changed_entries == [
+        {"id": entries[1]["id"], "date": "1994-10-07", "endDate": "1994-10-07", "streamName": "Eleven Point River"}
+    ]
+
+
+def test_parser_change_invalidates_records(tmp_path, monkeypatch):
+    path = tmp_path / 'parse.sqlite3'
+    cache = ParseCache(path)
+    parse(cache)
+    cache.commit()
+
+    monkeypatch.setattr(parse_cache, 'parser_fingerprint', lambda: 'another-parser')
+    cache = ParseCache(path)
+    parse(cache)
+    assert cache.hits == 0
+    assert len(cache.changed_ids) == 2
+
+
+def test_new_entries_are_written_in_batches(tmp_path):
+    path = tmp_path / 'parse.sqlite3'
+    cache = ParseCache(path, batch_size=1)
+    entries = parse(cache)
+    assert cache.pending == {}
+    # Flushed rows are read back before commit, without counting as hits
+    assert cache.get(entries[0]["id"]) == entries[0]
+    assert cache.hits == 0
+
+    cache.commit()
+    cache.close()
+    assert ParseCache(path, readonly=True).get(entries[1]["id"]) == entries[1]
+
+
+def test_uncommitted_batches_are_not_stored(tmp_path):
+    path = tmp_path / 'parse.sqlite3'
+    cache = ParseCache(path, batch_size=1)
+    entries = parse(cache)
+    cache.close()
+    assert ParseCache(path).get(entries[0]["id"]) is None
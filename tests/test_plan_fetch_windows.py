@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from backfill_water_data import plan_fetch_windows, plan_station_windows  # noqa: E402
+
+
+def test_close_dates_share_a_window():
+    dates = ['2011-06-24', '2011-06-26', '2011-07-05']
+    assert plan_fetch_windows(dates, max_gap_days=14) == [('2011-06-24', '2011-07-05')]
+
+
+def test_gap_larger_than_threshold_splits():
+    dates = ['2011-06-24', '2011-07-09', '2011-07-10']
+    assert plan_fetch_windows(dates, max_gap_days=14) == [
+        ('2011-06-24', '2011-06-24'),
+        ('2011-07-09', '2011-07-10'),
+    ]
+    # A gap of exactly max_gap_days is bridged
+    assert plan_fetch_windows(['2011-06-24', '2011-07-08'], max_gap_days=14) == [('2011-06-24', '2011-07-08')]
+
+
+def test_unsorted_repeated_and_invalid_dates():
+    dates = ['2012-01-03', None, '2011-12-30', 'not a date', '2012-01-03', '2011-02-30']
+    assert plan_fetch_windows(dates, max_gap_days=7) == [('2011-12-30', '2012-01-03')]
+
+
+def test_zero_gap_gives_one_window_per_run_of_days():
+    dates = ['2011-06-24', '2011-06-25', '2011-06-27']
+    assert plan_fetch_windows(dates, max_gap_days=1) == [('2011-06-24', '2011-06-25'), ('2011-06-27', '2011-06-27')]
+    assert plan_fetch_windows(dates, max_gap_days=0) == [
+        ('2011-06-24', '2011-06-24'), ('2011-06-25', '2011-06-25'), ('2011-06-27', '2011-06-27'),
+    ]
+
+
+def test_empty():
+    assert plan_fetch_windows([]) == []
+
+
+def test_station_windows_group_by_station_and_skip_unresolved():
+    entries = [
+        ('2011-06-24', '07069305'),
+        ('2011-06-26', '07069305'),
+        ('2011-06-25', '07072000'),
+        ('2011-06-25', None),
+        ('2015-03-01', '07069305'),
+    ]
+    assert plan_station_windows(entries, max_gap_days=14) == {
+        '07069305': [('2011-06-24', '2011-06-26'), ('2015-03-01', '2015-03-01')],
+        '07072000': [('2011-06-25', '2011-06-25')],
+    }
@@ -0,0 +1,114 @@
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from response_cache import PROVISIONAL_DAYS, CacheMiss, ResponseCache, month_windows  # noqa: E402
+
+KEY = ('07069305', '00065', 'iv', '2011-06-24', '2011-06-24')
+
+
+def backdate(cache: ResponseCache, seconds: float):
+    cache._conn.execute('UPDATE responses SET fetched_at = fetched_at - ?', (seconds,))
+    cache._conn.commit()
+
+
+def test_offline_replay_serves_stale_rows(tmp_path):
+    path = tmp_path / 'responses.sqlite3'
+    cache = ResponseCache(path)
+    cache.put(*KEY, {'value': 1})
+    backdate(cache, 30 * 24 * 60 * 60)
+    cache.close()
+
+    offline = ResponseCache(path, offline=True)
+    assert offline.fetch(*KEY, loader=lambda: pytest.fail('offline cache called the loader')) == {'value': 1}
+    assert offline.hits == 1
+
+
+def test_offline_replay_serves_expired_provisional_rows(tmp_path):
+    recent = time.strftime('%Y-%m-%d')
+    key = ('07069305', '00065', 'iv', recent, recent)
+    cache = ResponseCache(tmp_path / 'responses.sqlite3')
+    cache.put(*key, {'value': 2})
+    backdate(cache, 2 * 24 * 60 * 60)
+
+    assert cache.get(*key) is None
+    cache.offline = True
+    assert cache.get(*key) == {'value': 2}
+
+
+def test_historical_iv_does_not_expire_online(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite3')
+    cache.put(*KEY, {'value': 3})
+    backdate(cache, (PROVISIONAL_DAYS + 30) * 24 * 60 * 60)
+    assert cache.get(*KEY) == {'value': 3}
+
+
+def test_offline_miss_raises(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite3', offline=True)
+    with pytest.raises(CacheMiss):
+        cache.fetch(*KEY, loader=dict)
+    assert cache.misses == 1
+    assert cache.stats == {'iv': {'hits': 0, 'misses': 1}}
+
+
+def test_month_windows_cover_the_window():
+    assert month_windows('2011-06-24', '2011-08-02') == [
+        ('2011-06-01', '2011-06-30'), ('2011-07-01', '2011-07-31'), ('2011-08-01', '2011-08-31'),
+    ]
+    assert month_windows('2012-02-10', '2012-02-10') == [('2012-02-01', '2012-02-29')]
+
+
+def daily_loader(calls):
+    def load(start, end):
+        calls.append((start, end))
+        day = date.fromisoformat(start)
+        values = {}
+        while day <= date.fromisoformat(end):
+            values[day.isoformat()] = day.day
+            day += timedelta(days=1)
+        return values
+    return load
+
+
+def test_fetch_months_loads_consecutive_missing_months_once(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite3')
+    calls = []
+    data = cache.fetch_months('07069305', '00065', 'iv', '2011-06-24', '2011-07-02', daily_loader(calls))
+
+    assert calls == [('2011-06-01', '2011-07-31')]
+    assert sorted(data) == [f'2011-06-{d}' for d in range(24, 31)] + ['2011-07-01', '2011-07-02']
+    assert cache.stats == {'iv': {'hits': 0, 'misses': 2}}
+
+
+def test_replanned_windows_hit_cached_months(tmp_path):
+    path = tmp_path / 'responses.sqlite3'
+    cache = ResponseCache(path)
+    cache.fetch_months('07069305', '00065', 'iv', '2011-06-24', '2011-07-02', daily_loader([]))
+    cache.close()
+
+    # A different window inside the same months (another batch or --max-gap-days) replays offline
+    offline = ResponseCache(path, offline=True)
+    data = offline.fetch_months(
+        '07069305', '00065', 'iv', '2011-06-02', '2011-07-20',
+        lambda start, end: pytest.fail('offline cache called the loader')
+    )
+    assert len(data) == 49
+    assert offline.hits == 2
+
+    with pytest.raises(CacheMiss):
+        offline.fetch_months('07069305', '00065', 'iv', '2011-07-20', '2011-08-02', dict)
+
+
+def test_fetch_months_only_loads_the_missing_month(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite3')
+    cache.fetch_months('07069305', '00065', 'iv', '2011-06-24', '2011-06-26', daily_loader([]))
+    calls = []
+    data = cache.fetch_months('07069305', '00065', 'iv', '2011-06-24', '2011-07-02', daily_loader(calls))
+
+    assert calls == [('2011-07-01', '2011-07-31')]
+    assert data['2011-06-25'] == 25 and data['2011-07-02'] == 2
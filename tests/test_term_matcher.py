@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from term_matcher import diary_matcher, mention_count, species_caught  # noqa: E402
+
+
+def caught(text: str) -> list[dict]:
+    return species_caught(text, diary_matcher().find(text))
+
+
+@pytest.mark.parametrize('text', [
+    'Threw a black and white Shad Rap all morning',
+    'Found a good spot below the riffle',
+    'Sun was in my eyes all afternoon',
+    'Black water after the rain',
+    'Parked at the trout lot',
+])
+def test_everyday_words_are_not_catches(text):
+    assert caught(text) == []
+
+
+def test_count_only_aliases_need_a_number():
+    assert caught('6 eyes and 2 spots, then 3 trout') == [
+        {'species': 'Walleye', 'count': 6},
+        {'species': 'Spotted Bass', 'count': 2},
+        {'species': 'Rainbow Trout', 'count': 3},
+    ]
+    assert caught('Caught a spot') == []
+
+
+def test_zero_count_is_not_a_catch():
+    assert mention_count('0 walleye', 2) == (0, False)
+    assert caught('0 walleye today') == []
+    assert caught('0 walleye, 4 smallies') == [{'species': 'Smallmouth Bass', 'count': 4}]
+
+
+def test_singular_counts_only_without_numbered_mentions():
+    assert mention_count('a brownie', 2) == (1, True)
+    assert caught('Caught a walleye') == [{'species': 'Walleye', 'count': 1}]
+    assert caught('40 smallies and a brownie') == [{'species': 'Smallmouth Bass', 'count': 40}]
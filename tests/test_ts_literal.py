@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from ts_literal import TSSyntaxError, encode, parse_export, splice, to_python  # noqa: E402
+
+SOURCE = """import { FormData } from '../types';
+
+// Sample trips
+export const sampleEntries: FormData[] = [
+{
+    date: '2011-06-24',
+    streamName: "Spring River", // double-quoted
+    notes: 'It\\'s a \\"good\\" day\\nsecond line',
+    tags: ['a', "b"],
+    count: 3,
+    depth: -1.5e2,
+    kept: true,
+    gauge: null,
+    /* block comment */
+    photo: { id: 'p1', url: `/photos/x.jpg` },
+    flowRate: '',
+  },
+  { date: '2011-07-02', flowRate: '410', },
+] as const;
+"""
+
+
+def test_parses_literals_and_offsets():
+    entries = parse_export(SOURCE, 'sampleEntries')
+    first = entries[0]
+
+    assert first.get('streamName') == 'Spring River'
+    assert first.get('notes') == 'It\'s a "good" day\nsecond line'
+    assert first.get('tags') == ['a', 'b']
+    assert (first.get('count'), first.get('depth'), first.get('kept'), first.get('gauge')) == (3, -150.0, True, None)
+    assert first.get('photo') == {'id': 'p1', 'url': '/photos/x.jpg'}
+    assert first.get('missing', 'default') == 'default'
+
+    field = first.fields['date']
+    assert SOURCE[field.start:field.end] == "'2011-06-24'"
+    assert SOURCE[first.start:first.end].startswith('{') and SOURCE[first.start:first.end].endswith('}')
+
+
+def test_splice_only_touches_edited_fields():
+    entries = parse_export(SOURCE, 'sampleEntries')
+    edits = [
+        entries[0].edit('flowRate', '512'),
+        entries[0].edit('streamName', 'Eleven "Point" River'),
+        entries[1].edit('flowRate', "it's"),
+    ]
+    updated = splice(SOURCE, edits)
+
+    reparsed = parse_export(updated, 'sampleEntries')
+    assert reparsed[0].get('flowRate') == '512'
+    assert reparsed[0].get('streamName') == 'Eleven "Point" River'
+    assert reparsed[1].get('flowRate') == "it's"
+    assert to_python(reparsed[0].fields['photo'].value) == entries[0].get('photo')
+
+    # Quote styles are kept and everything around the edits is byte-identical
+    assert 'streamName: "Eleven \\"Point\\" River", // double-quoted' in updated
+    first_edit = min(start for start, _, _ in edits)
+    assert updated[:first_edit] == SOURCE[:first_edit]
+    assert updated.endswith(SOURCE[entries[1].fields['flowRate'].end:])
+
+
+def test_round_trip_without_edits_is_identity():
+    assert splice(SOURCE, []) == SOURCE
+
+
+@pytest.mark.parametrize('value', ['plain', "it's", 'a\\b', 'line\nbreak', 'tab\there', ' '])
+def test_encode_round_trips(value):
+    for quote in ("'", '"', '`'):
+        source = f"export const x = {encode(value, quote)};"
+        assert parse_export(source, 'x') == value
+
+
+def test_overlapping_edits_are_rejected():
+    with pytest.raises(ValueError):
+        splice('abcdef', [(0, 3, 'x'), (2, 4, 'y')])
+
+
+def test_interpolated_template_is_a_syntax_error():
+    with pytest.raises(TSSyntaxError):
+        parse_export('export const x = `a ${b}`;', 'x')
+
+
+def test_missing_export():
+    with pytest.raises(ValueError):
+        parse_export(SOURCE, 'otherEntries')
+
+
+def test_sample_data_parses():
+    entries = parse_export((ROOT / 'src' / 'data' / 'sampleData.ts').read_text(), 'sampleEntries')
+    assert entries and all(entry.get('date') for entry in entries)